@@ -1,17 +1,22 @@
 from ast import literal_eval
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import os
 
 from scipy import stats
 import pandas as pd
+import h5py
 import numpy as np
 import logging
 
+from PyDSS.NetworkModifier import ParameterBatch
 from PyDSS.pyLogger import getLoggerTag
+from PyDSS.pydss_fs_interface import SCENARIO_STORES_DIRNAME
+from PyDSS.storage_backends import StorageBackend, link_hdf_groups, open_store
 from PyDSS.utils import utils
 
 class MonteCarloSim:
 
-    def __init__(self, SimulationSettings, dssPaths, dssObjects, dssObjectsByClass):
+    def __init__(self, SimulationSettings, dssPaths, dssObjects, dssObjectsByClass, dssInstance):
         if SimulationSettings["Logging"]["Pre-configured logging"]:
             LoggerTag = __name__
         else:
@@ -21,6 +26,9 @@ class MonteCarloSim:
         self.__dssObjects = dssObjects
         self.__Settings = SimulationSettings
         self.__dssObjectsByClass = dssObjectsByClass
+        self.__seed = SimulationSettings['MonteCarlo']['Random Seed']
+        self.__baseline = None
+        self.__batch = ParameterBatch(dssInstance)
 
         try:
             MCfile = os.path.join(self.__Settings['Project']['Active Scenario'], 'Monte_Carlo', 'MonteCarloSettings.toml')
@@ -33,33 +41,173 @@ class MonteCarloSim:
             raise
         return
 
-    def Create_Scenario(self):
+    def _get_elements(self, Properties):
+        Elements = self.__dssObjectsByClass[Properties['Class']]
+        ElmNames = list(Elements.keys())
+        if Properties['useWildCard']:
+            ElmNames = [x for x in ElmNames if Properties['Wildcard'] in x]
+        return Elements, ElmNames
+
+    def _save_baseline(self):
+        self.__baseline = []
+        for Properties in self.__MCsettingsDict.values():
+            if Properties['Class'] in self.__dssObjectsByClass:
+                Elements, ElmNames = self._get_elements(Properties)
+                for ElmName in ElmNames:
+                    Value = Elements[ElmName].GetParameter(Properties['Property'])
+                    self.__baseline.append((ElmName, Properties['Property'], Value))
+
+    def _add_baseline_edits(self):
+        for FullName, Property, Value in self.__baseline:
+            self.__batch.add(FullName, Property, Value)
+
+    def Restore_Baseline(self):
+        """Restore the parameter values that existed before the first scenario."""
+        self._add_baseline_edits()
+        self.__batch.apply()
+
+    def get_random_state(self, sample_number):
+        """Return the random number generator for a sample. The same seed and
+        sample number always produce the same values, independent of which
+        process runs the sample.
+
+        Parameters
+        ----------
+        sample_number : int
+
+        Returns
+        -------
+        np.random.RandomState
+
+        """
+        seed = np.random.SeedSequence([self.__seed, sample_number]).generate_state(1)[0]
+        return np.random.RandomState(seed)
+
+    def Create_Scenario(self, sample_number):
+        """Apply sampled parameter values to the baseline circuit. All edits
+        are applied as one batch.
+
+        Parameters
+        ----------
+        sample_number : int
+            Selects the random seed for the sample.
+
+        """
+        if self.__baseline is None:
+            self._save_baseline()
+        else:
+            # Sampled values replace the baseline values in the batch.
+            self._add_baseline_edits()
+
+        random_state = self.get_random_state(sample_number)
         for key, Properties in self.__MCsettingsDict.items():
             if Properties['Class'] in self.__dssObjectsByClass:
-                Elements = self.__dssObjectsByClass[Properties['Class']]
-                ElmNames = list(Elements.keys())
-                if Properties['useWildCard']:
-                    ElmNames = [x for x in ElmNames if Properties['Wildcard'] in x]
+                Elements, ElmNames = self._get_elements(Properties)
                 NumElms = len(ElmNames)
                 distParams = literal_eval(Properties['Parameters'])
 
                 dist = getattr(stats, Properties['Distribution'].replace(' ', ''))
                 if not Properties['isList']:
-                    MCsamples = dist.rvs(*distParams, size=NumElms)
+                    MCsamples = dist.rvs(*distParams, size=NumElms, random_state=random_state)
                     if Properties['isInteger']:
                         MCsamples = [int(round(x)) for x in MCsamples]
                     for ElmName, Value in zip(ElmNames,MCsamples):
-                        Elements[ElmName].SetParameter(Properties['Property'], Value)
+                        self.__batch.add(ElmName, Properties['Property'], Value)
                 else:
-                    MCsamples = dist.rvs(*distParams, size=NumElms * Properties['ListLength'])
+                    MCsamples = dist.rvs(
+                        *distParams, size=NumElms * Properties['ListLength'], random_state=random_state
+                    )
                     if Properties['isInteger']:
                         MCsamples = [int(round(x)) for x in MCsamples]
                     MCsamples = np.reshape(MCsamples, (NumElms, Properties['ListLength']))
                     for ElmName, Value in zip(ElmNames, MCsamples):
                         Value = str(Value).replace('\n', '').replace('\r', '').replace('[ ', '[').replace(' ]', ']')
-                        Elements[ElmName].SetParameter(Properties['Property'], Value)
+                        self.__batch.add(ElmName, Properties['Property'], Value)
             else:
                 self.pyLogger.warning(Properties['Class'] + ' class not present in object dictionary.')
+
+        count = self.__batch.apply()
+        self.pyLogger.debug('Applied %s parameter edits for Monte Carlo sample %s', count, sample_number)
         return
 
 
+# Per-process state of Monte Carlo worker processes.
+_worker = {}
+
+
+def _initialize_worker(project, scenario, settings, store_dir, backend):
+    # Compile the circuit once per process. Samples start from its baseline.
+    from PyDSS import dssInstance
+    _worker["dss"] = dssInstance.OpenDSS(settings)
+    _worker["project"] = project
+    _worker["scenario"] = scenario
+    _worker["store_dir"] = store_dir
+    _worker["backend"] = backend
+
+
+def _run_sample(sample_number):
+    project = _worker["project"]
+    scenario = _worker["scenario"]
+    backend = _worker["backend"]
+    if backend == StorageBackend.HDF5:
+        filename = os.path.join(_worker["store_dir"], f"{scenario.name}_MC{sample_number}.h5")
+        mode = "w"
+    else:
+        # Memmap stores allow concurrent writers to separate datasets.
+        filename = _worker["store_dir"]
+        mode = "a"
+
+    with open_store(filename, backend, mode=mode) as store:
+        project.hdf_store = store
+        try:
+            _worker["dss"].RunMCsample(project, scenario, sample_number)
+        finally:
+            project.hdf_store = None
+    return filename
+
+
+def run_monte_carlo_in_parallel(project, scenario, settings, samples, num_workers):
+    """Run Monte Carlo samples in a pool of processes. Each process compiles
+    the circuit once and runs each of its samples from the baseline circuit.
+    The data of sample i is stored in Exports/<scenario>_MC<i>.
+
+    With HDF5 each sample is written to its own file in
+    SCENARIO_STORES_DIRNAME and linked into the open project store. Memmap
+    stores allow concurrent writers to separate datasets, so each process
+    writes to the project store.
+
+    Parameters
+    ----------
+    project : PyDssProject
+    scenario : PyDssScenario
+    settings : dict
+        Simulation settings
+    samples : int
+    num_workers : int
+
+    """
+    logger = logging.getLogger(__name__)
+    store = project.hdf_store
+    if isinstance(store, h5py.File):
+        backend = StorageBackend.HDF5
+        store_dir = os.path.join(project.project_path, SCENARIO_STORES_DIRNAME)
+        os.makedirs(store_dir, exist_ok=True)
+    else:
+        backend = StorageBackend.NUMPY_MEMMAP
+        store_dir = store.filename
+
+    logger.info("Running %s Monte Carlo samples with %s processes", samples, num_workers)
+    filenames = {}
+    with ProcessPoolExecutor(
+            max_workers=num_workers,
+            initializer=_initialize_worker,
+            initargs=(project, scenario, settings, store_dir, backend),
+        ) as executor:
+        futures = {executor.submit(_run_sample, i): i for i in range(samples)}
+        for future in as_completed(futures):
+            sample_number = futures[future]
+            filenames[sample_number] = future.result()
+            logger.info("Completed Monte Carlo sample %s", sample_number)
+
+    if backend == StorageBackend.HDF5:
+        link_hdf_groups(store, [filenames[i] for i in range(samples)])
@@ -1,8 +1,97 @@
 import PyDSS.dssElement as dE
+from PyDSS.dssObjectBase import invalidate_active_objects, invalidate_values
 from PyDSS.pyLogger import getLoggerTag
 import logging
 
 
+class ParameterBatch:
+    """Collects parameter edits and applies them together.
+
+    Properties with a setter in opendssdirect, such as Loads.kW, are set
+    directly. All other edits are sent as one multi-line command. Values are
+    not read back.
+
+    """
+
+    # (lowercase class, lowercase property) -> (opendssdirect module, setter)
+    DIRECT_SETTERS = {
+        ("load", "kw"): ("Loads", "kW"),
+        ("load", "kvar"): ("Loads", "kvar"),
+        ("load", "pf"): ("Loads", "PF"),
+        ("load", "kv"): ("Loads", "kV"),
+        ("pvsystem", "pmpp"): ("PVsystems", "Pmpp"),
+        ("pvsystem", "pf"): ("PVsystems", "pf"),
+        ("pvsystem", "pctpmpp"): ("PVsystems", "pctPmpp"),
+        ("pvsystem", "kva"): ("PVsystems", "kVARated"),
+        ("pvsystem", "kvar"): ("PVsystems", "kvar"),
+        ("pvsystem", "irradiance"): ("PVsystems", "Irradiance"),
+    }
+
+    def __init__(self, dss):
+        self._dss = dss
+        self._edits = {}  # (FullName, Param) -> Value
+
+    def __len__(self):
+        return len(self._edits)
+
+    def add(self, FullName, Param, Value):
+        """Add an edit. A later edit of the same parameter replaces an earlier one.
+
+        Parameters
+        ----------
+        FullName : str
+            Element name, such as Load.load1
+        Param : str
+        Value : object
+
+        """
+        self._edits[(FullName, Param)] = Value
+
+    def apply(self):
+        """Apply and clear all edits.
+
+        Returns
+        -------
+        int
+            Number of edits applied
+
+        """
+        commands = []
+        for (FullName, Param), Value in self._edits.items():
+            Class, Name = FullName.split('.', 1)
+            setter = self._get_direct_setter(Class, Param)
+            if setter is not None:
+                try:
+                    Value = float(Value)
+                except (TypeError, ValueError):
+                    setter = None
+            if setter is None:
+                commands.append(f'Edit {FullName} {Param}={Value}')
+            else:
+                module, func = setter
+                module.Name(Name)
+                func(Value)
+
+        if commands:
+            self._dss.utils.run_command('\n'.join(commands))
+        invalidate_active_objects(self._dss)
+        invalidate_values(self._dss)
+        count = len(self._edits)
+        self._edits.clear()
+        return count
+
+    def _get_direct_setter(self, Class, Param):
+        names = self.DIRECT_SETTERS.get((Class.lower(), Param.lower()))
+        if names is None:
+            return None
+        # Older versions of opendssdirect do not have every setter.
+        module = getattr(self._dss, names[0], None)
+        func = getattr(module, names[1], None)
+        if func is None:
+            return None
+        return module, func
+
+
 class Modifier():
 
     PV_defaultDict = {'phases':'1', 'kV':'2.2',  'irradiance':'1', 'Temperature':'30',
@@ -65,15 +154,22 @@ class Modifier():
                 tCMD = ' ' + PptyName + '=' + str(PptyVal)
                 Cmd += tCMD
         self.__dssCommand(Cmd)
-        self.pyLogger.info('Edited -> ' + Cmd)
+        invalidate_values(self.__dssInstance)
+        self.pyLogger.debug('Edited -> %s', Cmd)
         return
 
     def Edit_Elements(self, Class, Property=None, Value=None):
+        batch = self.create_batch()
         self.__dssInstance.Circuit.SetActiveClass(Class)
         Element = self.__dssInstance.ActiveClass.First()
         while Element:
             ElmName = self.__dssInstance.ActiveClass.Name()
-            self.__dssInstance.utils.run_command(Class + '.' + ElmName + '.' + Property + ' = ' + str(Value))
+            batch.add(Class + '.' + ElmName, Property, Value)
             Element = self.__dssInstance.ActiveClass.Next()
+        batch.apply()
+
+    def create_batch(self):
+        """Return a ParameterBatch for this circuit."""
+        return ParameterBatch(self.__dssInstance)
 
 
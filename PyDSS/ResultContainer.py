@@ -289,6 +289,9 @@ class ResultContainer:
     def FlushData(self):
         pass
 
+    def GetCurrentData(self):
+        return self.CurrentResults
+
     def max_num_bytes(self):
         return 0
 
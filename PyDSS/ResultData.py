@@ -4,18 +4,25 @@ import logging
 import os
 import pathlib
 
+import h5py
+import numpy as np
 import pandas as pd
 import opendssdirect as dss
 
 from PyDSS.pyLogger import getLoggerTag
+from PyDSS.bulk_value_reader import BulkValueReader
 from PyDSS.unitDefinations import unit_info
-from PyDSS.dataset_buffer import DatasetBuffer
+from PyDSS.compression import CompressionOptions
+from PyDSS.current_results import CurrentResults
+from PyDSS.dataset_buffer import DatasetBuffer, MiB
+from PyDSS.dataset_writer import DatasetWriterThread
 from PyDSS.exceptions import InvalidConfiguration, InvalidParameter
 from PyDSS.export_list_reader import ExportListReader, StoreValuesType
 from PyDSS.reports import Reports
 from PyDSS.utils.dataframe_utils import write_dataframe
-from PyDSS.utils.utils import dump_data
-from PyDSS.value_storage import ValueContainer, ValueByNumber, DatasetPropertyType
+from PyDSS.utils.utils import dump_data, make_human_readable_size
+from PyDSS.value_storage import ValueContainer, ValueByNumber, DatasetPropertyType, \
+    ElementClassValueContainer, get_class_dataset_path
 
 
 logger = logging.getLogger(__name__)
@@ -42,6 +49,7 @@ class ResultData:
         self._objects_by_class = dss_objects_by_class
         self.system_paths = system_paths
         self._elements = []
+        self._element_classes = []
         self._options = options
 
         self._dss_command = dss_command
@@ -53,12 +61,24 @@ class ResultData:
         self._mode_dataset = None
         self._simulation_mode = []
         self._hdf_store = None
+        self._timing = None
         self._scenario = options["Project"]["Active Scenario"]
         self._base_scenario = options["Project"]["Active Scenario"]
         self._export_format = options["Exports"]["Export Format"]
         self._export_compression = options["Exports"]["Export Compression"]
         self._export_iteration_order = options["Exports"]["Export Iteration Order"]
         self._max_chunk_bytes = options["Exports"]["HDF Max Chunk Bytes"]
+        self._buffer_memory_bytes = options["Exports"]["Export Buffer Memory MiB"] * MiB
+        self._storage_layout = options["Exports"]["Export Storage Layout"]
+        self._compression = CompressionOptions.from_settings(options)
+        self._single_precision = options["Exports"]["Export Float Precision"] == "float32"
+        self._use_background_writer = options["Exports"]["HDF Background Writer"]
+        self._writer_queue_size = options["Exports"]["HDF Writer Queue Size"]
+        self._writer = None
+        if options["Exports"]["Bulk Value Capture"]:
+            self._bulk_reader = BulkValueReader(dss_instance)
+        else:
+            self._bulk_reader = None
         self._export_dir = os.path.join(
             self.system_paths["Export"],
             options["Project"]["Active Scenario"],
@@ -67,7 +87,8 @@ class ResultData:
         self._export_relative_dir = f"Exports/" + options["Project"]["Active Scenario"]
         self._store_frequency = False
         self._store_mode = False
-        self.CurrentResults = {}
+        self._return_results = options["Project"]["Return Results"]
+        self.CurrentResults = CurrentResults()
         if options["Project"]["Simulation Type"] == "Dynamic" or \
                 options["Frequency"]["Enable frequency sweep"]:
             self._store_frequency = True
@@ -95,6 +116,7 @@ class ResultData:
 
     def _create_exports(self):
         elements = {}  # element name to ElementData
+        element_classes = {}  # (element class, storage name) to ElementClassData
         for elem_class in self._export_list.list_element_classes():
             if elem_class == "Buses":
                 objs = self._buses
@@ -102,36 +124,136 @@ class ResultData:
                 objs = self._objects_by_class[elem_class]
             else:
                 continue
-            for name, obj in objs.items():
+            props = list(self._export_list.iter_export_properties(elem_class=elem_class))
+            for name in objs:
+                # Element objects are created on first access. Skip elements
+                # that won't be stored.
+                name_props = [x for x in props if x.should_store_name(name)]
+                if not name_props:
+                    continue
+                obj = objs[name]
                 if not obj.Enabled:
                     continue
-                for prop in self._export_list.iter_export_properties(elem_class=elem_class):
+                for prop in name_props:
                     if prop.custom_function is None and not obj.IsValidAttribute(prop.name):
                         raise InvalidParameter(f"{name} / {prop.name} cannot be exported")
-                    if prop.should_store_name(name):
+                    if self._is_class_property(prop):
+                        key = (elem_class, prop.storage_name)
+                        if key not in element_classes:
+                            element_classes[key] = ElementClassData(
+                                prop,
+                                max_chunk_bytes=self._max_chunk_bytes,
+                                options=self._options,
+                                bulk_reader=self._bulk_reader,
+                                compression=self._compression,
+                                single_precision=self._single_precision,
+                            )
+                        element_classes[key].append_element(name, obj)
+                    else:
                         if name not in elements:
                             elements[name] = ElementData(
                                 name,
                                 obj,
                                 max_chunk_bytes=self._max_chunk_bytes,
-                                options=self._options
+                                options=self._options,
+                                compression=self._compression,
+                                single_precision=self._single_precision,
                             )
                         elements[name].append_property(prop)
-                        self._logger.debug("Store %s %s name=%s", elem_class, prop.name, name)
+                    self._logger.debug("Store %s %s name=%s", elem_class, prop.name, name)
 
         self._elements = elements.values()
+        self._element_classes = element_classes.values()
+        if self._buffer_memory_bytes > 0:
+            self._plan_chunk_sizes()
+
+    def _plan_chunk_sizes(self):
+        """Divide the export buffer memory budget across all datasets.
+
+        Each per-element dataset gets an equal share. A per-class dataset gets
+        one share per element in the class. Shares are clamped to the chunk
+        sizes recommended by h5py. The number of rows per chunk is derived
+        from the share when each dataset is created, once its row width is
+        known.
+
+        """
+        num_shares = sum(x.num_buffered_datasets for x in self._elements)
+        num_shares += sum(len(x.names) for x in self._element_classes)
+        if num_shares == 0:
+            return
+
+        share = self._buffer_memory_bytes / num_shares
+        element_chunk_bytes = DatasetBuffer.clamp_chunk_bytes(share)
+        total = 0
+        for element in self._elements:
+            element.set_max_chunk_bytes(element_chunk_bytes)
+            total += element_chunk_bytes * element.num_buffered_datasets
+        for element_class in self._element_classes:
+            chunk_bytes = DatasetBuffer.clamp_chunk_bytes(share * len(element_class.names))
+            element_class.set_max_chunk_bytes(chunk_bytes)
+            total += chunk_bytes
+            self._logger.debug(
+                "Chunk size for %s %s: %s",
+                element_class.prop.elem_class, element_class.prop.storage_name, chunk_bytes,
+            )
+
+        self._logger.info(
+            "Export buffer plan: budget=%s shares=%s element_chunk_bytes=%s estimated_total=%s",
+            make_human_readable_size(self._buffer_memory_bytes),
+            num_shares,
+            element_chunk_bytes,
+            make_human_readable_size(total),
+        )
+        if total > self._buffer_memory_bytes:
+            self._logger.warning(
+                "Export buffers exceed the budget because the minimum chunk size is %s bytes",
+                DatasetBuffer.clamp_chunk_bytes(0),
+            )
 
-    def InitializeDataStore(self, hdf_store, num_steps, MC_scenario_number=None):
+    def _is_class_property(self, prop):
+        """Return True if the property is stored in a per-class dataset."""
+        return self._storage_layout == "PerClass" and \
+            prop.store_values_type == StoreValuesType.ALL and \
+            prop.limits is None
+
+    def InitializeDataStore(self, hdf_store, num_steps, MC_scenario_number=None, checkpoint=None,
+                            timing=None):
+        """Create the datasets of the scenario.
+
+        Parameters
+        ----------
+        hdf_store : h5py.File
+        num_steps : int
+        MC_scenario_number : int | None
+        checkpoint : dict | None
+            State returned by GetCheckpointState. If set, continue the
+            datasets of an interrupted simulation.
+        timing : TimingStats | None
+            If set, add the time to read and store each property.
+
+        """
         if MC_scenario_number is not None:
             self._scenario = self._base_scenario + f"_MC{MC_scenario_number}"
         self._hdf_store = hdf_store
+        self._timing = timing
+        if checkpoint is None:
+            lengths = {}
+        else:
+            lengths = checkpoint["lengths"]
+            self._remove_datasets_after_checkpoint(lengths)
+        if self._use_background_writer:
+            assert self._writer is None
+            self._writer = DatasetWriterThread(self._writer_queue_size)
         self._time_dataset = DatasetBuffer(
             hdf_store=hdf_store,
             path=f"Exports/{self._scenario}/Timestamp",
             max_size=num_steps,
             dtype=float,
             columns=("Timestamp",),
-            max_chunk_bytes=self._max_chunk_bytes
+            max_chunk_bytes=self._max_chunk_bytes,
+            writer=self._writer,
+            compression=self._compression,
+            length=lengths.get(f"Exports/{self._scenario}/Timestamp"),
         )
         self._frequency_dataset = DatasetBuffer(
             hdf_store=hdf_store,
@@ -139,7 +261,10 @@ class ResultData:
             max_size=num_steps,
             dtype=float,
             columns=("Frequency",),
-            max_chunk_bytes=self._max_chunk_bytes
+            max_chunk_bytes=self._max_chunk_bytes,
+            writer=self._writer,
+            compression=self._compression,
+            length=lengths.get(f"Exports/{self._scenario}/Frequency"),
         )
         self._mode_dataset = DatasetBuffer(
             hdf_store=hdf_store,
@@ -147,23 +272,112 @@ class ResultData:
             max_size=num_steps,
             dtype="S10",
             columns=("Mode",),
-            max_chunk_bytes=self._max_chunk_bytes
+            max_chunk_bytes=self._max_chunk_bytes,
+            writer=self._writer,
+            compression=self._compression,
+            length=lengths.get(f"Exports/{self._scenario}/Mode"),
         )
 
         for element in self._elements:
-            element.initialize_data_store(hdf_store, self._scenario, num_steps)
+            element.initialize_data_store(
+                hdf_store, self._scenario, num_steps, writer=self._writer, resume_lengths=lengths
+            )
+        for element_class in self._element_classes:
+            element_class.initialize_data_store(
+                hdf_store, self._scenario, num_steps, writer=self._writer, resume_lengths=lengths
+            )
+        if checkpoint is not None:
+            for element in self._elements:
+                element.set_checkpoint_state(checkpoint["elements"][element.name])
+            for element_class in self._element_classes:
+                key = (element_class.prop.elem_class, element_class.prop.storage_name)
+                element_class.set_checkpoint_state(checkpoint["element_classes"][key])
+
+    def _remove_datasets_after_checkpoint(self, lengths):
+        # Datasets created after the checkpoint are created again.
+        group_name = f"Exports/{self._scenario}"
+        paths = []
+
+        def collect(name, obj):
+            path = f"{group_name}/{name}"
+            # Metadata datasets of a class dataset are kept with it.
+            kept_path = get_class_dataset_path(path) or path
+            if isinstance(obj, h5py.Dataset) and kept_path not in lengths:
+                paths.append(path)
+
+        self._hdf_store[group_name].visititems(collect)
+        for path in paths:
+            del self._hdf_store[path]
+        self._logger.info("Removed %s datasets created after the checkpoint", len(paths))
+
+    def GetCheckpointState(self):
+        """Write all buffered data to the store and return the state needed
+        to continue the datasets after an interruption.
+
+        Returns
+        -------
+        dict
+
+        """
+        self._flush_buffers()
+        if self._writer is not None:
+            self._writer.drain()
+        self._hdf_store.flush()
+
+        lengths = {}
+        for dataset in (self._time_dataset, self._frequency_dataset, self._mode_dataset):
+            lengths[dataset.path] = dataset.length
+        elements = {}
+        for element in self._elements:
+            lengths.update(element.get_dataset_lengths())
+            elements[element.name] = element.get_checkpoint_state()
+        element_classes = {}
+        for element_class in self._element_classes:
+            lengths.update(element_class.get_dataset_lengths())
+            key = (element_class.prop.elem_class, element_class.prop.storage_name)
+            element_classes[key] = element_class.get_checkpoint_state()
+
+        return {
+            "lengths": lengths,
+            "elements": elements,
+            "element_classes": element_classes,
+        }
 
     def UpdateResults(self):
         self.CurrentResults.clear()
+        if self._bulk_reader is not None:
+            self._bulk_reader.clear_cache()
 
         timestamp = self._dss_solver.GetDateTime().timestamp()
         self._time_dataset.write_value(timestamp)
         self._frequency_dataset.write_value(self._dss_solver.getFrequency())
         self._mode_dataset.write_value(self._dss_solver.getMode())
 
+        # Only collect current values if a caller can consume them.
+        current_results = self.CurrentResults if self._return_results else None
         for elem in self._elements:
-            data = elem.append_values(timestamp)
-            self.CurrentResults.update(data)
+            elem.append_values(timestamp, current_results, timing=self._timing)
+        for element_class in self._element_classes:
+            element_class.append_values(timestamp, current_results, timing=self._timing)
+        return self.CurrentResults
+
+    def GetCurrentData(self):
+        """Return the values read at the current time point. Values are only
+        collected if "Return Results" is enabled.
+
+        Returns
+        -------
+        CurrentResults
+            Mapping of column name to value; only valid until the next time point.
+
+        Raises
+        ------
+        InvalidConfiguration
+            Raised if "Return Results" is disabled.
+
+        """
+        if not self._return_results:
+            raise InvalidConfiguration('current data is only collected if "Return Results" is enabled')
         return self.CurrentResults
 
     def ExportResults(self, fileprefix=""):
@@ -190,11 +404,44 @@ class ResultData:
         self._logger.info("Exported metadata to %s", filename)
         self._hdf_store = None
 
+    def GetFlushStatistics(self):
+        """Return the number of dataset flushes and the seconds spent in them.
+
+        Returns
+        -------
+        tuple
+            (int, float)
+
+        """
+        buffers = [self._time_dataset, self._frequency_dataset, self._mode_dataset]
+        for element in self._elements:
+            buffers += element.dataset_buffers
+        for element_class in self._element_classes:
+            buffers += element_class.dataset_buffers
+        count = 0
+        seconds = 0.0
+        for buf in buffers:
+            buf_count, buf_seconds = buf.flush_statistics
+            count += buf_count
+            seconds += buf_seconds
+        return count, seconds
+
     def FlushData(self):
+        self._flush_buffers()
+        if self._writer is not None:
+            # This is the end of the simulation. Wait for all queued chunks to
+            # be written; anything written afterwards is synchronous.
+            writer = self._writer
+            self._writer = None
+            writer.shutdown()
+
+    def _flush_buffers(self):
         for dataset in (self._time_dataset, self._frequency_dataset, self._mode_dataset):
             dataset.flush_data()
         for element in self._elements:
             element.flush_data()
+        for element_class in self._element_classes:
+            element_class.flush_data()
 
     def _export_event_log(self, metadata):
         # TODO: move to a base class
@@ -426,9 +673,16 @@ class ResultData:
 
         return units
 
-    def max_num_bytes(self):
+    def max_num_bytes(self, full_precision=False):
         """Return the maximum number of bytes the container could hold.
 
+        Parameters
+        ----------
+        full_precision : bool
+            If True, return the number of bytes required with the default
+            64-bit dtypes. The difference with the default return value is the
+            savings from compact dtypes.
+
         Returns
         -------
         int
@@ -436,26 +690,36 @@ class ResultData:
         """
         total = 0
         for element in self._elements:
-            total += element.max_num_bytes()
+            total += element.max_num_bytes(full_precision=full_precision)
+        for element_class in self._element_classes:
+            total += element_class.max_num_bytes(full_precision=full_precision)
         return total
 
 
 class ElementData:
     """Stores all property data for an element."""
-    def __init__(self, name, obj, max_chunk_bytes, options, scenario=None, hdf_store=None):
+    def __init__(self, name, obj, max_chunk_bytes, options, scenario=None, hdf_store=None,
+                 compression=None, single_precision=False):
         self._properties = []
+        self._compression = compression
+        self._single_precision = single_precision
         self._name = name
         self._obj = obj
         self._data = {}  # Containers for properties per time point on disk.
         self._circular_buf = {}  # Keeps last n values in memory for averages.
         self._sums = {}  # Keeps running sums in memory.
         self._change_counts = {}  # Keeps change counts of properties.
+        self._labeled = set()  # Properties stored directly from raw values with a ValueSchema.
+        self._columns = {}  # Column names of each property, set at the first stored value.
+        self._timer_names = {}  # Timing statistics phase of each property.
         self._num_steps = None
         self._scenario = scenario
         self._hdf_store = hdf_store
         self._max_chunk_bytes = max_chunk_bytes
         self._options = options
         self._step_number = 1
+        self._writer = None
+        self._resume_lengths = None
 
         self._get_value_func_by_type = {
             StoreValuesType.ALL: self._get_value,
@@ -479,63 +743,141 @@ class ElementData:
     def _value_key(prop):
         return (prop.elem_class, prop.name)
 
-    def initialize_data_store(self, hdf_store, scenario, num_steps):
+    def initialize_data_store(self, hdf_store, scenario, num_steps, writer=None,
+                              resume_lengths=None):
         self._hdf_store = hdf_store
         self._num_steps = num_steps
         self._scenario = scenario
+        self._writer = writer
+        self._resume_lengths = resume_lengths
         # Reset these for MonteCarlo simulations.
         for key in self._data:
             self._data[key] = None
         self._step_number = 1
 
+    def get_checkpoint_state(self):
+        """Return the accumulated values needed to resume the simulation."""
+        return {
+            "circular_buf": self._circular_buf,
+            "sums": self._sums,
+            "change_counts": self._change_counts,
+            "step_number": self._step_number,
+        }
+
+    def set_checkpoint_state(self, state):
+        """Restore the state returned by get_checkpoint_state."""
+        self._circular_buf = state["circular_buf"]
+        self._sums = state["sums"]
+        self._change_counts = state["change_counts"]
+        self._step_number = state["step_number"]
+
+    def get_dataset_lengths(self):
+        """Return the number of flushed rows of each dataset by path."""
+        lengths = {}
+        for container in self._data.values():
+            if container is not None:
+                lengths.update(container.get_dataset_lengths())
+        return lengths
+
+    @property
+    def dataset_buffers(self):
+        """Return the DatasetBuffers that have been created."""
+        buffers = []
+        for container in self._data.values():
+            if container is not None:
+                buffers += container.dataset_buffers
+        return buffers
+
     def append_property(self, prop):
         self._properties.append(prop)
         key = self._prop_key(prop)
         self._data[key] = None
+        self._timer_names[key] = _get_timer_name(prop)
         if prop.store_values_type == StoreValuesType.SUM:
             self._sums[key] = None
         elif prop.store_values_type == StoreValuesType.MOVING_AVERAGE:
             self._circular_buf[key] = _CircularBufferHelper(prop)
         elif prop.store_values_type == StoreValuesType.CHANGE_COUNT:
             self._change_counts[key] = (None, 0)
+        elif _is_labeled_property(prop, self._obj):
+            self._labeled.add(key)
+
+    def append_values(self, timestamp, current_results=None, timing=None):
+        """Read and store the values for the current time point.
+
+        Parameters
+        ----------
+        timestamp : float
+        current_results : CurrentResults | None
+            If set, add the stored values.
+        timing : TimingStats | None
+            If set, add the time to read and store each property.
 
-    def append_values(self, timestamp):
-        curr_data = {}
+        """
         cached_values = {}
         for prop in self._properties:
             if not prop.should_sample_value(self._step_number):
                 continue
             prop_key = self._prop_key(prop)
-            value_key = self._value_key(prop)
-            # Don't re-read the same value multiple times.
-            if value_key in cached_values:
-                value = cached_values[value_key]
-            else:
-                value = self._get_value_func_by_type[prop.store_values_type](prop, prop_key, timestamp)
-                if value is not None:
-                    cached_values[value_key] = value
-            if not self._should_store_by_type[prop.store_values_type](prop, prop_key, value):
-                continue
-            if len(value.make_columns()) > 1:
-                for column, val in zip(value.make_columns(), value.value):
-                    curr_data[column] = val
+            if timing is None:
+                self._append_value(prop, prop_key, timestamp, current_results, cached_values)
             else:
-                curr_data[value.make_columns()[0]] = value.value
-            if self._data[prop_key] is None:
-                path = f"Exports/{self._scenario}/{prop.elem_class}/{self._name}/{prop.storage_name}"
-                self._data[prop_key] = ValueContainer(
-                    value,
-                    self._hdf_store,
-                    path,
-                    prop.get_max_size(self._num_steps),
-                    dataset_property_type=prop.get_dataset_property_type(),
-                    max_chunk_bytes=self._max_chunk_bytes,
-                    store_timestamp=prop.should_store_timestamp(),
-                )
-
-            self._data[prop_key].append(value, timestamp=timestamp)
+                with timing.timer(self._timer_names[prop_key]):
+                    self._append_value(prop, prop_key, timestamp, current_results, cached_values)
         self._step_number += 1
-        return curr_data
+
+    def _append_value(self, prop, prop_key, timestamp, current_results, cached_values):
+        if prop_key in self._labeled:
+            self._append_labeled_value(prop, prop_key, timestamp, current_results)
+            return
+        value_key = self._value_key(prop)
+        # Don't re-read the same value multiple times.
+        if value_key in cached_values:
+            value = cached_values[value_key]
+        else:
+            value = self._get_value_func_by_type[prop.store_values_type](prop, prop_key, timestamp)
+            if value is not None:
+                cached_values[value_key] = value
+        if not self._should_store_by_type[prop.store_values_type](prop, prop_key, value):
+            return
+        if self._data[prop_key] is None:
+            self._create_container(prop, prop_key, value)
+            self._columns[prop_key] = value.make_columns()
+
+        self._data[prop_key].append(value, timestamp=timestamp)
+        if current_results is not None:
+            values = value.value if isinstance(value.value, list) else (value.value,)
+            current_results.add(self._columns[prop_key], values)
+
+    def _append_labeled_value(self, prop, prop_key, timestamp, current_results):
+        # Copy the raw values into the buffer through the element's schema
+        # instead of creating a ValueByLabel at every time point.
+        raw_value = self._obj.GetVariable(prop.name)
+        schema = self._obj.GetValueSchema(prop.name, raw_value)
+        row = schema.to_array(raw_value)
+        if self._data[prop_key] is None:
+            self._create_container(prop, prop_key, schema.make_value(raw_value))
+        self._data[prop_key].append_row(row, timestamp=timestamp)
+        if current_results is not None:
+            current_results.add(schema.columns, row)
+
+    def _create_container(self, prop, prop_key, value):
+        path = f"Exports/{self._scenario}/{prop.elem_class}/{self._name}/{prop.storage_name}"
+        self._data[prop_key] = ValueContainer(
+            value,
+            self._hdf_store,
+            path,
+            prop.get_max_size(self._num_steps),
+            dataset_property_type=prop.get_dataset_property_type(),
+            max_chunk_bytes=self._max_chunk_bytes,
+            store_timestamp=prop.should_store_timestamp(),
+            writer=self._writer,
+            compression=self._compression,
+            float_scaleoffset=prop.scale_offset,
+            dtype=prop.dtype,
+            single_precision=self._single_precision,
+            resume_lengths=self._resume_lengths,
+        )
 
     def _get_value(self, prop, prop_key, timestamp):
         if prop.custom_function is None:
@@ -591,6 +933,7 @@ class ElementData:
                 1,
                 max_chunk_bytes=self._max_chunk_bytes,
                 dataset_property_type=DatasetPropertyType.NUMBER,
+                compression=self._compression,
             )
             container.append(value)
             container.flush_data()
@@ -606,6 +949,7 @@ class ElementData:
                 1,
                 max_chunk_bytes=self._max_chunk_bytes,
                 dataset_property_type=DatasetPropertyType.NUMBER,
+                compression=self._compression,
             )
             container.append(value)
             container.flush_data()
@@ -617,9 +961,19 @@ class ElementData:
                 continue
             container.flush_data()
 
-    def max_num_bytes(self):
+    def set_max_chunk_bytes(self, max_chunk_bytes):
+        """Set the chunk size of datasets created after this call."""
+        self._max_chunk_bytes = max_chunk_bytes
+
+    def max_num_bytes(self, full_precision=False):
         """Return the maximum number of bytes the element could store.
 
+        Parameters
+        ----------
+        full_precision : bool
+            If True, return the number of bytes required with the default
+            64-bit dtypes.
+
         Returns
         -------
         int
@@ -630,18 +984,225 @@ class ElementData:
             if container is None:
                 logger.debug("max_num_bytes is unknown; no value has been collected yet")
                 continue
-            total += container.max_num_bytes()
+            total += container.max_num_bytes(full_precision=full_precision)
         return total
 
     @property
     def name(self):
         return self._name
 
+    @property
+    def num_buffered_datasets(self):
+        """Return the number of datasets that keep a chunk in memory."""
+        return sum(
+            1 for x in self._properties
+            if x.store_values_type in (StoreValuesType.ALL, StoreValuesType.MOVING_AVERAGE)
+        )
+
     @property
     def properties(self):
         return self._properties[:]
 
 
+class ElementClassData:
+    """Stores one property for all elements of a class in a single dataset."""
+    def __init__(self, prop, max_chunk_bytes, options, scenario=None, hdf_store=None,
+                 bulk_reader=None, compression=None, single_precision=False):
+        self._prop = prop
+        self._compression = compression
+        self._single_precision = single_precision
+        self._names = []
+        self._objs = []
+        self._container = None
+        self._bulk_reader = bulk_reader
+        self._bulk_index = None  # Positions of this dataset's values in bulk arrays.
+        self._is_labeled = True
+        self._writer = None
+        self._num_steps = None
+        self._scenario = scenario
+        self._hdf_store = hdf_store
+        self._max_chunk_bytes = max_chunk_bytes
+        self._options = options
+        self._step_number = 1
+        self._resume_lengths = None
+        self._timer_name = _get_timer_name(prop)
+
+    def append_element(self, name, obj):
+        """Add an element whose values will be stored in the dataset."""
+        self._names.append(name)
+        self._objs.append(obj)
+        self._is_labeled = self._is_labeled and _is_labeled_property(self._prop, obj)
+
+    def initialize_data_store(self, hdf_store, scenario, num_steps, writer=None,
+                              resume_lengths=None):
+        self._hdf_store = hdf_store
+        self._num_steps = num_steps
+        self._scenario = scenario
+        self._writer = writer
+        self._resume_lengths = resume_lengths
+        # Reset these for MonteCarlo simulations.
+        self._container = None
+        self._bulk_index = None
+        self._step_number = 1
+
+    def get_checkpoint_state(self):
+        """Return the state needed to resume the simulation."""
+        return {"step_number": self._step_number}
+
+    def set_checkpoint_state(self, state):
+        """Restore the state returned by get_checkpoint_state."""
+        self._step_number = state["step_number"]
+
+    def get_dataset_lengths(self):
+        """Return the number of flushed rows of the dataset by path."""
+        if self._container is None:
+            return {}
+        return self._container.get_dataset_lengths()
+
+    @property
+    def dataset_buffers(self):
+        """Return the DatasetBuffers that have been created."""
+        if self._container is None:
+            return []
+        return self._container.dataset_buffers
+
+    def append_values(self, timestamp, current_results=None, timing=None):
+        """Read and store the values for the current time point.
+
+        Parameters
+        ----------
+        timestamp : float
+        current_results : CurrentResults | None
+            If set, add the stored values.
+        timing : TimingStats | None
+            If set, add the time to read and store the values.
+
+        """
+        if timing is None:
+            self._append_values(timestamp, current_results)
+        else:
+            with timing.timer(self._timer_name):
+                self._append_values(timestamp, current_results)
+
+    def _append_values(self, timestamp, current_results):
+        prop = self._prop
+        if not prop.should_sample_value(self._step_number):
+            self._step_number += 1
+            return
+
+        if self._bulk_index is not None:
+            row = self._bulk_reader.read(prop.elem_class, prop.name)[self._bulk_index]
+            self._container.append_row(row)
+        elif self._is_labeled:
+            row = self._append_labeled_values()
+        else:
+            values = []
+            for obj in self._objs:
+                if prop.custom_function is None:
+                    value = obj.GetValue(prop.name, convert=True)
+                else:
+                    value = prop.custom_function(obj, timestamp, self._step_number, self._options)
+                values.append(value)
+
+            if self._container is None:
+                self._create_container(values)
+            row = self._container.append(values)
+
+        if current_results is not None:
+            current_results.add(self._container.columns, row)
+        self._step_number += 1
+
+    def _append_labeled_values(self):
+        # Copy the raw values into the buffer through each element's schema
+        # instead of creating a ValueByLabel per element at every time point.
+        prop = self._prop
+        raw_values = []
+        schemas = []
+        for obj in self._objs:
+            raw_value = obj.GetVariable(prop.name)
+            raw_values.append(raw_value)
+            schemas.append(obj.GetValueSchema(prop.name, raw_value))
+
+        if self._container is None:
+            self._create_container([x.make_value(y) for x, y in zip(schemas, raw_values)])
+
+        row = np.concatenate([x.to_array(y) for x, y in zip(schemas, raw_values)])
+        self._container.append_row(row)
+        return row
+
+    def _create_container(self, values):
+        prop = self._prop
+        path = f"Exports/{self._scenario}/{prop.elem_class}/{prop.storage_name}"
+        self._container = ElementClassValueContainer(
+            self._names,
+            values,
+            self._hdf_store,
+            path,
+            prop.get_max_size(self._num_steps),
+            max_chunk_bytes=self._max_chunk_bytes,
+            writer=self._writer,
+            compression=self._compression,
+            float_scaleoffset=prop.scale_offset,
+            dtype=prop.dtype,
+            single_precision=self._single_precision,
+            resume_lengths=self._resume_lengths,
+        )
+        if self._bulk_reader is not None and prop.custom_function is None:
+            self._bulk_index = self._bulk_reader.create_index(
+                prop.elem_class, prop.name, self._names, values
+            )
+
+    def flush_data(self):
+        """Flush any outstanding data to disk."""
+        if self._container is not None:
+            self._container.flush_data()
+
+    def set_max_chunk_bytes(self, max_chunk_bytes):
+        """Set the chunk size of the dataset if it is created after this call."""
+        self._max_chunk_bytes = max_chunk_bytes
+
+    def max_num_bytes(self, full_precision=False):
+        """Return the maximum number of bytes the dataset could store.
+
+        Parameters
+        ----------
+        full_precision : bool
+            If True, return the number of bytes required with the default
+            64-bit dtypes.
+
+        Returns
+        -------
+        int
+
+        """
+        if self._container is None:
+            logger.debug("max_num_bytes is unknown; no value has been collected yet")
+            return 0
+        return self._container.max_num_bytes(full_precision=full_precision)
+
+    @property
+    def names(self):
+        return self._names[:]
+
+    @property
+    def prop(self):
+        return self._prop
+
+
+def _get_timer_name(prop):
+    return f"UpdateResults/{prop.elem_class}/{prop.storage_name}"
+
+
+def _is_labeled_property(prop, obj):
+    """Return True if the property's values can be stored directly from raw
+    values with the element's ValueSchema."""
+    return prop.store_values_type == StoreValuesType.ALL and \
+        prop.limits is None and \
+        prop.custom_function is None and \
+        prop.name in obj.VARIABLE_OUTPUTS_BY_LABEL and \
+        obj.inVariableDict(prop.name)
+
+
 class _CircularBufferHelper:
     def __init__(self, prop):
         self._buf = deque(maxlen=prop.window_size)
@@ -0,0 +1,247 @@
+"""Reads element property values in bulk from whole-circuit OpenDSS arrays."""
+
+import logging
+
+import numpy as np
+
+from PyDSS.dssElement import dssElement
+from PyDSS.dssObjectBase import invalidate_active_objects
+
+
+logger = logging.getLogger(__name__)
+
+
+class BulkValueReader:
+    """Reads the values of one property for all elements of a class with a
+    small number of OpenDSS calls instead of one activation and call per
+    element.
+
+    Bus voltages come from the node arrays of the circuit
+    (AllBusVolts, AllBusMagPu, AllBusVmag). Element losses come from
+    AllElementLosses. Other labeled element properties, like Currents or
+    Powers, are read by iterating over the OpenDSS class with ActiveClass,
+    which avoids activating each element by name.
+
+    Arrays are read at most once per time point. Call clear_cache at the start
+    of every time point.
+
+    """
+
+    # Maps bus property to the node arrays that make up its values.
+    _BUS_PROPERTIES = {
+        "puVmagAngle": ("magpu", "angle"),
+        "VMagAngle": ("vmag", "angle"),
+        "Voltages": ("volts",),
+    }
+    _ELEMENT_LOSSES = "Losses"
+    # OpenDSS reports AllElementLosses in kW while CktElement.Losses is in W.
+    _LOSSES_SCALE = 1000.0
+    _RTOL = 1e-6
+    _ATOL = 1e-6
+
+    def __init__(self, dss_instance):
+        self._dss = dss_instance
+        self._node_positions = None
+        self._element_positions = None
+        self._class_names = {}  # (element class, property) to OpenDSS class
+        self._cache = {}
+
+    def clear_cache(self):
+        """Discard the arrays read at the previous time point."""
+        self._cache.clear()
+
+    @classmethod
+    def is_supported(cls, elem_class, prop):
+        """Return True if the property can be read in bulk.
+
+        Parameters
+        ----------
+        elem_class : str
+        prop : str
+
+        Returns
+        -------
+        bool
+
+        """
+        if elem_class == "Buses":
+            return prop in cls._BUS_PROPERTIES
+        if elem_class == "Circuits":
+            return False
+        return prop == cls._ELEMENT_LOSSES or prop in dssElement.VARIABLE_OUTPUTS_BY_LABEL
+
+    def create_index(self, elem_class, prop, names, values):
+        """Return the positions of the elements' values in the array returned
+        by read. The bulk values are compared with values that were read
+        element-by-element, and bulk reads are rejected if they differ.
+
+        Parameters
+        ----------
+        elem_class : str
+        prop : str
+        names : list
+            Element names in storage order
+        values : list
+            list of ValueStorageBase read for each element at this time point
+
+        Returns
+        -------
+        np.ndarray | None
+            None if the property cannot be read in bulk.
+
+        """
+        if not names or not self.is_supported(elem_class, prop):
+            return None
+
+        try:
+            if elem_class == "Buses":
+                index = self._create_bus_index(prop, names)
+            elif prop == self._ELEMENT_LOSSES:
+                index = self._create_losses_index(names)
+            else:
+                index = self._create_class_index(elem_class, prop, names)
+            actual = self.read(elem_class, prop)
+        except (AttributeError, KeyError) as exc:
+            # Older versions of opendssdirect may not provide all arrays.
+            logger.warning("Cannot read %s %s in bulk: %s", elem_class, prop, exc)
+            return None
+
+        expected = []
+        for value in values:
+            if isinstance(value.value, list):
+                expected += value.value
+            else:
+                expected.append(value.value)
+        if len(index) != len(expected) or \
+                not np.allclose(actual[index], expected, rtol=self._RTOL, atol=self._ATOL):
+            logger.warning(
+                "Bulk values for %s %s do not match element values; reading by element",
+                elem_class, prop,
+            )
+            return None
+
+        logger.debug("Read %s %s in bulk for %s elements", elem_class, prop, len(names))
+        return index
+
+    def read(self, elem_class, prop):
+        """Return the values of the property for all elements of the class.
+
+        Parameters
+        ----------
+        elem_class : str
+        prop : str
+
+        Returns
+        -------
+        np.ndarray
+
+        """
+        key = (elem_class, prop)
+        array = self._cache.get(key)
+        if array is not None:
+            return array
+
+        if elem_class == "Buses":
+            arrays = [self._read_node_array(x) for x in self._BUS_PROPERTIES[prop]]
+            if len(arrays) == 1:
+                array = arrays[0]
+            else:
+                # Interleave the pairs to match ValueByLabel: mag1, ang1, mag2, ...
+                array = np.column_stack(arrays).ravel()
+        elif prop == self._ELEMENT_LOSSES:
+            losses = np.array(self._dss.Circuit.AllElementLosses(), dtype=np.float64)
+            array = (losses * self._LOSSES_SCALE).view(np.complex128)
+        else:
+            array, _ = self._read_class_property(self._class_names[key], prop, with_ranges=False)
+
+        self._cache[key] = array
+        return array
+
+    def _create_bus_index(self, prop, names):
+        if self._node_positions is None:
+            self._node_positions = {
+                x.lower(): i for i, x in enumerate(self._dss.Circuit.AllNodeNames())
+            }
+
+        num_arrays = len(self._BUS_PROPERTIES[prop])
+        index = []
+        for name in names:
+            self._dss.Circuit.SetActiveBus(name)
+            for node in self._dss.Bus.Nodes():
+                position = self._node_positions[f"{name}.{node}".lower()]
+                index += [position * num_arrays + i for i in range(num_arrays)]
+        invalidate_active_objects(self._dss)
+
+        return np.array(index, dtype=np.int64)
+
+    def _create_losses_index(self, names):
+        if self._element_positions is None:
+            self._element_positions = {
+                x.lower(): i for i, x in enumerate(self._dss.Circuit.AllElementNames())
+            }
+
+        return np.array(
+            [self._element_positions[x.lower()] for x in names], dtype=np.int64
+        )
+
+    def _create_class_index(self, elem_class, prop, names):
+        dss_class = names[0].split(".", 1)[0]
+        self._class_names[(elem_class, prop)] = dss_class
+        _, ranges = self._read_class_property(dss_class, prop, with_ranges=True)
+        index = []
+        for name in names:
+            start, length = ranges[name.lower()]
+            index += range(start, start + length)
+
+        return np.array(index, dtype=np.int64)
+
+    def _read_class_property(self, dss_class, prop, with_ranges):
+        """Read the property for every element of an OpenDSS class.
+
+        Returns
+        -------
+        tuple
+            np.ndarray of values, dict mapping lowercase element name to
+            (start, length) of its values if with_ranges is True
+
+        """
+        is_complex = dssElement.VARIABLE_OUTPUTS_BY_LABEL[prop]["is_complex"]
+        width = 2 if is_complex else 1
+        func = getattr(self._dss.CktElement, prop)
+        values = []
+        ranges = {}
+        self._dss.Circuit.SetActiveClass(dss_class)
+        flag = self._dss.ActiveClass.First()
+        while flag > 0:
+            data = func()
+            if with_ranges:
+                name = self._dss.CktElement.Name().lower()
+                ranges[name] = (len(values) // width, len(data) // width)
+            values += data
+            flag = self._dss.ActiveClass.Next()
+        invalidate_active_objects(self._dss)
+
+        array = np.array(values, dtype=np.float64)
+        if is_complex:
+            array = array.view(np.complex128)
+        return array, ranges
+
+    def _read_node_array(self, name):
+        array = self._cache.get(name)
+        if array is not None:
+            return array
+
+        circuit = self._dss.Circuit
+        if name == "volts":
+            array = np.array(circuit.AllBusVolts(), dtype=np.float64).view(np.complex128)
+        elif name == "magpu":
+            array = np.array(circuit.AllBusMagPu(), dtype=np.float64)
+        elif name == "vmag":
+            array = np.array(circuit.AllBusVmag(), dtype=np.float64)
+        elif name == "angle":
+            array = np.angle(self._read_node_array("volts"), deg=True)
+        else:
+            assert False, name
+
+        self._cache[name] = array
+        return array
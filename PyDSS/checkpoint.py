@@ -0,0 +1,121 @@
+"""Saves and loads checkpoints from which a simulation can be resumed."""
+
+import copy
+import datetime
+import logging
+import os
+import pickle
+
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_FILENAME = "checkpoint.pkl"
+
+_PLAIN_TYPES = (
+    type(None), bool, int, float, complex, str, bytes, np.generic,
+    datetime.datetime, datetime.timedelta,
+)
+
+
+def is_plain_value(value):
+    """Return True if the value is data that can be stored in a checkpoint,
+    as opposed to a reference to an OpenDSS object, function, or module.
+
+    Parameters
+    ----------
+    value : object
+
+    Returns
+    -------
+    bool
+
+    """
+    if isinstance(value, _PLAIN_TYPES):
+        return True
+    if isinstance(value, np.ndarray):
+        return value.dtype != object
+    if isinstance(value, (list, tuple, set)):
+        return all(is_plain_value(x) for x in value)
+    if isinstance(value, dict):
+        return all(is_plain_value(x) and is_plain_value(y) for x, y in value.items())
+    return False
+
+
+def get_object_state(obj):
+    """Return a copy of the attributes of an object that hold plain data,
+    such as the timers and counters of a controller.
+
+    Parameters
+    ----------
+    obj : object
+
+    Returns
+    -------
+    dict
+
+    """
+    return {x: copy.deepcopy(y) for x, y in vars(obj).items() if is_plain_value(y)}
+
+
+def set_object_state(obj, state):
+    """Set attributes returned by get_object_state.
+
+    Parameters
+    ----------
+    obj : object
+    state : dict
+
+    """
+    for name, value in state.items():
+        setattr(obj, name, copy.deepcopy(value))
+
+
+def save_checkpoint(filename, checkpoint):
+    """Write a checkpoint. The previous checkpoint is only replaced once the
+    new one is completely written.
+
+    Parameters
+    ----------
+    filename : str
+    checkpoint : dict
+
+    """
+    tmp_filename = filename + ".tmp"
+    with open(tmp_filename, "wb") as f_out:
+        pickle.dump(checkpoint, f_out, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_filename, filename)
+    logger.debug("Saved checkpoint %s", filename)
+
+
+def load_checkpoint(filename):
+    """Read a checkpoint.
+
+    Parameters
+    ----------
+    filename : str
+
+    Returns
+    -------
+    dict | None
+        None if the file does not exist
+
+    """
+    if not os.path.exists(filename):
+        return None
+    with open(filename, "rb") as f_in:
+        return pickle.load(f_in)
+
+
+def remove_checkpoint(filename):
+    """Remove a checkpoint if it exists.
+
+    Parameters
+    ----------
+    filename : str
+
+    """
+    if os.path.exists(filename):
+        os.remove(filename)
+        logger.debug("Removed checkpoint %s", filename)
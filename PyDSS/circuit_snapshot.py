@@ -0,0 +1,71 @@
+"""Contains CircuitSnapshot"""
+
+import logging
+
+from PyDSS.NetworkModifier import ParameterBatch
+from PyDSS.exceptions import InvalidConfiguration
+
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitSnapshot:
+    """Captures the property values of all circuit elements so that a compiled
+    circuit can be returned to that state without recompiling it.
+
+    Only property values are restored. Elements must not be added or removed
+    after the snapshot is taken. The solution mode and time belong to the
+    solver, which must be reset separately.
+
+    """
+
+    def __init__(self, dss):
+        self._dss = dss
+        self._element_names = tuple(dss.Circuit.AllElementNames())
+        self._values = {x: self._read_properties(x) for x in self._element_names}
+        logger.debug("Captured the properties of %s elements", len(self._values))
+
+    def __getstate__(self):
+        # The OpenDSS module is not pickled. Call attach after unpickling.
+        state = self.__dict__.copy()
+        state["_dss"] = None
+        return state
+
+    def attach(self, dss):
+        """Attach an unpickled snapshot to an OpenDSS instance."""
+        self._dss = dss
+
+    def _read_properties(self, name):
+        self._dss.Circuit.SetActiveElement(name)
+        names = self._dss.Element.AllPropertyNames()
+        return {x: self._dss.Properties.Value(x) for x in names}
+
+    def restore(self):
+        """Restore the captured property values. Only properties that changed
+        are edited.
+
+        Returns
+        -------
+        int
+            Number of properties that were edited
+
+        Raises
+        ------
+        InvalidConfiguration
+            Raised if elements were added or removed after the snapshot.
+
+        """
+        if tuple(self._dss.Circuit.AllElementNames()) != self._element_names:
+            raise InvalidConfiguration("circuit elements changed after the snapshot")
+
+        batch = ParameterBatch(self._dss)
+        for name, values in self._values.items():
+            current = self._read_properties(name)
+            for prop, value in values.items():
+                # Empty values cannot be set with an edit command.
+                if value != "" and current.get(prop) != value:
+                    batch.add(name, prop, value)
+
+        count = batch.apply()
+        logger.debug("Restored %s properties", count)
+        return count
@@ -0,0 +1,89 @@
+"""
+CLI to compare compression codecs on the exported data of a PyDSS project
+"""
+
+import logging
+import os
+import sys
+
+import click
+
+from PyDSS.compression import CompressionCodec, CompressionOptions, \
+    benchmark_compression, list_available_codecs
+from PyDSS.pydss_project import PyDssProject
+from PyDSS.loggers import setup_logging
+from PyDSS.storage_backends import StorageBackend
+from PyDSS.utils.utils import get_cli_string, make_human_readable_size
+
+
+logger = logging.getLogger(__name__)
+
+
+@click.argument(
+    "project-path",
+)
+@click.option(
+    "-c", "--codec",
+    multiple=True,
+    type=click.Choice([x.value for x in CompressionCodec]),
+    help="Codec to benchmark. Can be specified multiple times. Default is all available codecs.",
+)
+@click.option(
+    "-l", "--level",
+    default=4,
+    show_default=True,
+    help="Compression level for codecs that support levels.",
+)
+@click.option(
+    "--shuffle/--no-shuffle",
+    default=True,
+    show_default=True,
+    help="Apply the shuffle filter.",
+)
+@click.option(
+    "-o", "--output-dir",
+    help="Directory for temporary files. Default is the system temp directory.",
+)
+@click.option(
+    "--verbose",
+    is_flag=True,
+    default=False,
+    show_default=True,
+    help="Enable verbose log output."
+)
+@click.command(name="benchmark-compression")
+def benchmark_compression_codecs(project_path, codec=None, level=4, shuffle=True, output_dir=None,
+                                 verbose=False):
+    """Rewrite the exported data of a project with each codec and report
+    write throughput and file size."""
+    if not os.path.exists(project_path):
+        print(f"project-path={project_path} does not exist")
+        sys.exit(1)
+
+    setup_logging(
+        "PyDSS",
+        filename=None,
+        console_level=logging.DEBUG if verbose else logging.WARNING,
+    )
+    logger.info("CLI: [%s]", get_cli_string())
+
+    project = PyDssProject.load_project(project_path)
+    store_filename, backend = project.get_store_info()
+    if backend != StorageBackend.HDF5:
+        print(f"Compression only applies to the {StorageBackend.HDF5.value} storage backend")
+        sys.exit(1)
+
+    codecs = [CompressionCodec(x) for x in codec] if codec else list_available_codecs()
+    options = [CompressionOptions(codec=x, level=level, shuffle=shuffle) for x in codecs]
+    results = benchmark_compression(store_filename, options, output_dir=output_dir)
+
+    template = "{:<20} {:>12} {:>14} {:>12} {:>8}"
+    print(template.format("Codec", "Seconds", "Write MiB/s", "Size", "Ratio"))
+    for result in results:
+        print(template.format(
+            result["codec"],
+            f"{result['seconds']:.3f}",
+            f"{result['throughput_mbps']:.1f}",
+            make_human_readable_size(result["size"]),
+            f"{result['ratio']:.2f}",
+        ))
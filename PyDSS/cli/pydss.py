@@ -7,6 +7,7 @@ import click
 
 from PyDSS.cli.create_project import create_project
 from PyDSS.cli.add_post_process import add_post_process
+from PyDSS.cli.benchmark_compression import benchmark_compression_codecs
 from PyDSS.cli.controllers import controllers
 from PyDSS.cli.convert import convert
 from PyDSS.cli.export import export
@@ -30,3 +31,4 @@ cli.add_command(run)
 cli.add_command(edit_scenario)
 cli.add_command(convert)
 cli.add_command(controllers)
+cli.add_command(benchmark_compression_codecs)
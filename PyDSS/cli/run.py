@@ -63,9 +63,24 @@ logger = logging.getLogger(__name__)
     show_default=True,
     help="Dry run for getting estimated space."
 )
+@click.option(
+    "-n", "--num-workers",
+    default=1,
+    type=click.IntRange(min=1),
+    show_default=True,
+    help="Number of processes to use to run scenarios in parallel."
+)
+@click.option(
+    "--resume",
+    is_flag=True,
+    default=False,
+    show_default=True,
+    help="Resume an interrupted simulation from its last checkpoints."
+)
 @click.command()
 
-def run(project_path, options=None, tar_project=False, zip_project=False, verbose=False, simulations_file=None, dry_run=False):
+def run(project_path, options=None, tar_project=False, zip_project=False, verbose=False, simulations_file=None, dry_run=False,
+        num_workers=1, resume=False):
     """Run a PyDSS simulation."""
     if not os.path.exists(project_path):
         print(f"project-path={project_path} does not exist")
@@ -106,7 +121,8 @@ def run(project_path, options=None, tar_project=False, zip_project=False, verbos
             sys.exit(1)
 
     project = PyDssProject.load_project(project_path, options=options, simulation_file=simulations_file)
-    project.run(tar_project=tar_project, zip_project=zip_project, dry_run=dry_run)
+    project.run(tar_project=tar_project, zip_project=zip_project, dry_run=dry_run,
+                num_workers=num_workers, resume=resume)
 
     if dry_run:
         print("="*30)
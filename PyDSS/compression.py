@@ -0,0 +1,199 @@
+"""Compression settings for exported datasets."""
+
+import enum
+import logging
+import os
+import tempfile
+import time
+
+import h5py
+
+from PyDSS.exceptions import InvalidConfiguration
+
+
+logger = logging.getLogger(__name__)
+
+
+class CompressionCodec(enum.Enum):
+    """Compression codecs for HDF datasets"""
+    NONE = "none"
+    GZIP = "gzip"
+    LZF = "lzf"
+    # These require the hdf5plugin package.
+    BLOSC = "blosc"
+    ZSTD = "zstd"
+    LZ4 = "lz4"
+
+
+_PLUGIN_CODECS = (CompressionCodec.BLOSC, CompressionCodec.ZSTD, CompressionCodec.LZ4)
+
+
+class CompressionOptions:
+    """Defines the compression filters applied to HDF datasets."""
+
+    def __init__(self, codec=CompressionCodec.GZIP, level=4, shuffle=True):
+        self._codec = CompressionCodec(codec)
+        self._level = level
+        self._shuffle = shuffle
+        # Fail early if the codec isn't available.
+        self._kwargs = self._make_dataset_kwargs()
+
+    def __str__(self):
+        if self._codec in (CompressionCodec.GZIP, CompressionCodec.BLOSC, CompressionCodec.ZSTD):
+            text = f"{self._codec.value}-{self._level}"
+        else:
+            text = self._codec.value
+        if self._shuffle and self._codec != CompressionCodec.NONE:
+            text += "+shuffle"
+        return text
+
+    @classmethod
+    def from_settings(cls, options):
+        """Create an instance from the [Exports] simulation settings.
+
+        Parameters
+        ----------
+        options : dict
+            Simulation settings
+
+        Returns
+        -------
+        CompressionOptions
+
+        """
+        exports = options["Exports"]
+        return cls(
+            codec=exports["HDF Compression"],
+            level=exports["HDF Compression Level"],
+            shuffle=exports["HDF Shuffle"],
+        )
+
+    def _make_dataset_kwargs(self):
+        if self._codec == CompressionCodec.NONE:
+            return {}
+        if self._codec == CompressionCodec.GZIP:
+            return {
+                "compression": "gzip",
+                "compression_opts": self._level,
+                "shuffle": self._shuffle,
+            }
+        if self._codec == CompressionCodec.LZF:
+            return {"compression": "lzf", "shuffle": self._shuffle}
+
+        assert self._codec in _PLUGIN_CODECS
+        try:
+            import hdf5plugin
+        except ImportError:
+            raise InvalidConfiguration(
+                f"compression codec {self._codec.value} requires the hdf5plugin package"
+            )
+
+        if self._codec == CompressionCodec.BLOSC:
+            # Blosc applies its own shuffle.
+            shuffle = hdf5plugin.Blosc.SHUFFLE if self._shuffle else hdf5plugin.Blosc.NOSHUFFLE
+            return dict(hdf5plugin.Blosc(cname="lz4", clevel=self._level, shuffle=shuffle))
+        if self._codec == CompressionCodec.ZSTD:
+            kwargs = dict(hdf5plugin.Zstd(clevel=self._level))
+        else:
+            kwargs = dict(hdf5plugin.LZ4())
+        kwargs["shuffle"] = self._shuffle
+        return kwargs
+
+    def get_dataset_kwargs(self):
+        """Return the keyword arguments to pass to h5py create_dataset.
+
+        Returns
+        -------
+        dict
+
+        """
+        return dict(self._kwargs)
+
+    @property
+    def codec(self):
+        return self._codec
+
+    @property
+    def level(self):
+        return self._level
+
+    @property
+    def shuffle(self):
+        return self._shuffle
+
+
+DEFAULT_COMPRESSION = CompressionOptions()
+
+
+def list_available_codecs():
+    """Return the codecs that can be used in this environment.
+
+    Returns
+    -------
+    list
+        list of CompressionCodec
+
+    """
+    codecs = []
+    for codec in CompressionCodec:
+        try:
+            CompressionOptions(codec=codec)
+        except InvalidConfiguration:
+            continue
+        codecs.append(codec)
+    return codecs
+
+
+def benchmark_compression(store_filename, compression_options, output_dir=None):
+    """Rewrite every dataset in an HDF store with each set of compression
+    options and measure write throughput and file size.
+
+    Parameters
+    ----------
+    store_filename : str
+    compression_options : list
+        list of CompressionOptions
+    output_dir : str | None
+        Directory for temporary files; defaults to the system temp directory.
+
+    Returns
+    -------
+    list
+        list of dicts with keys codec, seconds, throughput_mbps, size, ratio
+
+    """
+    if output_dir is None:
+        output_dir = tempfile.gettempdir()
+
+    datasets = []
+    with h5py.File(store_filename, "r") as store:
+        def collect(name, item):
+            if isinstance(item, h5py.Dataset):
+                datasets.append((name, item[:], item.chunks, dict(item.attrs)))
+        store.visititems(collect)
+
+    raw_bytes = sum(x[1].nbytes for x in datasets)
+    logger.info("Benchmarking %s datasets with %s bytes", len(datasets), raw_bytes)
+    results = []
+    for options in compression_options:
+        filename = os.path.join(output_dir, f"pydss_benchmark_{options.codec.value}.h5")
+        kwargs = options.get_dataset_kwargs()
+        start = time.time()
+        with h5py.File(filename, "w") as store:
+            for name, data, chunks, attrs in datasets:
+                dataset = store.create_dataset(name, data=data, chunks=chunks, **kwargs)
+                for key, val in attrs.items():
+                    dataset.attrs[key] = val
+        duration = time.time() - start
+        size = os.path.getsize(filename)
+        os.remove(filename)
+        results.append({
+            "codec": str(options),
+            "seconds": duration,
+            "throughput_mbps": raw_bytes / (1024 * 1024) / duration if duration > 0 else 0.0,
+            "size": size,
+            "ratio": raw_bytes / size if size > 0 else 0.0,
+        })
+        logger.info("Benchmarked %s: %s", options, results[-1])
+
+    return results
@@ -0,0 +1,69 @@
+"""Contains CurrentResults"""
+
+import collections.abc
+
+
+class CurrentResults(collections.abc.Mapping):
+    """Maps column names to the values read at the current time point.
+
+    Values are not copied into a dict. Each dataset adds its column names and
+    the row of values that it just wrote, usually a NumPy array. The column
+    index is built on first lookup and reused at later time points as long as
+    the same column lists are added in the same order.
+
+    The values are only valid until the next time point. Use dict() to keep a
+    copy.
+
+    """
+    def __init__(self):
+        self._segments = []  # list of (columns, values)
+        self._index = None
+        self._index_columns = []  # Column lists used to build the index
+
+    def __getitem__(self, column):
+        i, j = self._get_index()[column]
+        return self._segments[i][1][j]
+
+    def __iter__(self):
+        for columns, _ in self._segments:
+            yield from columns
+
+    def __len__(self):
+        return sum(len(x[0]) for x in self._segments)
+
+    def __contains__(self, column):
+        return column in self._get_index()
+
+    def add(self, columns, values):
+        """Add the values of one dataset.
+
+        Parameters
+        ----------
+        columns : list
+            Column names. The list must not be modified afterwards.
+        values : np.ndarray | list | tuple
+            Values in column order
+
+        """
+        self._segments.append((columns, values))
+
+    def clear(self):
+        """Remove all values. The column index is kept for reuse."""
+        self._segments.clear()
+
+    def _get_index(self):
+        if self._index is None or not self._is_index_current():
+            self._index = {}
+            for i, (columns, _) in enumerate(self._segments):
+                for j, column in enumerate(columns):
+                    self._index[column] = (i, j)
+            self._index_columns = [x[0] for x in self._segments]
+        return self._index
+
+    def _is_index_current(self):
+        if len(self._index_columns) != len(self._segments):
+            return False
+        for columns, segment in zip(self._index_columns, self._segments):
+            if columns is not segment[0]:
+                return False
+        return True
@@ -1,10 +1,13 @@
 """Contains DatasetBuffer"""
 
 import logging
+import time
 
 import numpy as np
 import pandas as pd
 
+from PyDSS.compression import DEFAULT_COMPRESSION
+
 
 KiB = 1024
 MiB = KiB * KiB
@@ -12,12 +15,14 @@ GiB = MiB * MiB
 
 # The optimal number of chunks to store in memory will vary widely.
 # The h5py docs recommend keeping chunk byte sizes between 10 KiB - 1 MiB.
-# This attempts to support a higher-end PyDSS case. Might need to provide
-# customization capabilities.
+# This attempts to support a higher-end PyDSS case. Users can override it with
+# "HDF Max Chunk Bytes" or divide a total budget with "Export Buffer Memory MiB".
 # Each element property will have one "chunk" of data in memory.
 # Storing 50,000 element properties with a 32 KiB buffer in each of 36
 # parallel processes would require 54 GiB of RAM.
 DEFAULT_MAX_CHUNK_BYTES = 32 * KiB
+MIN_CHUNK_BYTES = 16 * KiB
+MAX_CHUNK_BYTES = MiB
 
 logger = logging.getLogger(__name__)
 
@@ -25,7 +30,12 @@ logger = logging.getLogger(__name__)
 class DatasetBuffer:
     """Provides a write buffer to an HDF dataset to increase performance.
     Users must call flush_data before the object goes out of scope to ensure
-    that all data is flushed.
+    that all data is flushed. If a DatasetWriterThread is passed, flushed data
+    is written asynchronously and is only guaranteed to be on disk after the
+    writer is drained. If length is passed, rows are appended to an existing
+    dataset that contains length rows. If store_columns is False, the caller
+    stores the column names, such as for datasets whose column names exceed
+    the 64 KiB limit of HDF5 attributes.
 
     """
     # TODO add support for context manager, though PyDSS wouldn't be able to
@@ -34,12 +44,30 @@ class DatasetBuffer:
 
     def __init__(
             self, hdf_store, path, max_size, dtype, columns, scaleoffset=None,
-            max_chunk_bytes=None, attributes=None
+            max_chunk_bytes=None, attributes=None, writer=None, compression=None,
+            length=None, store_columns=True,
         ):
         if max_chunk_bytes is None:
             max_chunk_bytes = DEFAULT_MAX_CHUNK_BYTES
+        if compression is None:
+            compression = DEFAULT_COMPRESSION
         self._buf_index = 0
         self._hdf_store = hdf_store
+        self._writer = writer
+        self._path = path
+        self._num_flushes = 0
+        self._flush_seconds = 0.0
+        if length is not None:
+            # Continue a dataset of a resumed simulation. Rows after length
+            # are overwritten.
+            self._dataset = self._hdf_store[path]
+            self._dataset.attrs["length"] = length
+            self._dataset_index = length
+            self._max_size = self._dataset.shape[0]
+            self._chunk_size = self._dataset.chunks[0]
+            self._buf = np.empty(self._dataset.chunks, dtype=self._dataset.dtype)
+            return
+
         self._max_size = max_size
         num_columns = len(columns)
         self._chunk_size = self.compute_chunk_count(
@@ -60,14 +88,12 @@ class DatasetBuffer:
             shape=shape,
             chunks=chunks,
             dtype=dtype,
-            compression="gzip",
-            compression_opts=4,
-            shuffle=True,
             scaleoffset=scaleoffset,
+            **compression.get_dataset_kwargs(),
         )
-        self._dataset.attrs["columns"] = columns
+        if store_columns:
+            self._dataset.attrs["columns"] = columns
         self._dataset_index = 0
-        self._path = path
         self._buf = np.empty(chunks, dtype=dtype)
 
         if attributes is not None:
@@ -84,11 +110,59 @@ class DatasetBuffer:
         if length == 0:
             return
 
+        start = time.perf_counter()
         new_index = self._dataset_index + length
-        self._dataset[self._dataset_index:new_index] = self._buf[0:length]
+        if self._writer is None:
+            self._dataset[self._dataset_index:new_index] = self._buf[0:length]
+            self._dataset.attrs["length"] = new_index
+        else:
+            # Hand the filled buffer to the writer thread and continue with a
+            # new one so that the data is not modified before it is written.
+            self._writer.submit(self._dataset, self._dataset_index, self._buf[0:length])
+            self._buf = np.empty_like(self._buf)
         self._buf_index = 0
         self._dataset_index = new_index
-        self._dataset.attrs["length"] = new_index
+        self._num_flushes += 1
+        self._flush_seconds += time.perf_counter() - start
+
+    @property
+    def flush_statistics(self):
+        """Return the number of flushes and the seconds spent in them. With a
+        DatasetWriterThread this only includes the time to queue the data.
+
+        Returns
+        -------
+        tuple
+            (int, float)
+
+        """
+        return self._num_flushes, self._flush_seconds
+
+    @property
+    def length(self):
+        """Return the number of rows that have been flushed.
+
+        Returns
+        -------
+        int
+
+        """
+        return self._dataset_index
+
+    @property
+    def path(self):
+        return self._path
+
+    @property
+    def dtype(self):
+        """Return the dtype of the dataset.
+
+        Returns
+        -------
+        np.dtype
+
+        """
+        return self._buf.dtype
 
     def max_num_bytes(self):
         """Return the maximum number of bytes the container could hold.
@@ -117,17 +191,37 @@ class DatasetBuffer:
         ):
         tmp = np.empty((1, num_columns), dtype=dtype)
         size_one_row = tmp.size * tmp.itemsize
-        chunk_count = min(int(max_chunk_bytes / size_one_row), max_size)
+        # Rows wider than max_chunk_bytes still need one row per chunk.
+        chunk_count = min(max(int(max_chunk_bytes / size_one_row), 1), max_size)
         logger.debug("chunk_count=%s", chunk_count)
         return chunk_count
 
     @staticmethod
-    def to_dataframe(dataset):
+    def clamp_chunk_bytes(num_bytes):
+        """Limit a chunk size to the range recommended by h5py.
+
+        Parameters
+        ----------
+        num_bytes : int
+
+        Returns
+        -------
+        int
+
+        """
+        return int(min(max(num_bytes, MIN_CHUNK_BYTES), MAX_CHUNK_BYTES))
+
+    @staticmethod
+    def to_dataframe(dataset, column_range=None, columns=None):
         """Create a pandas DataFrame from a dataset created with this class.
 
         Parameters
         ----------
         dataset : h5py.Dataset
+        column_range : tuple | None
+            If set, only read the columns (start, length).
+        columns : list | None
+            Column names of the dataset. Defaults to the columns attribute.
 
         Returns
         -------
@@ -140,7 +234,19 @@ class DatasetBuffer:
             # This can be removed once projects with the older format aren't
             # supported.
             length = len(dataset)
-        return pd.DataFrame(dataset[:length], columns=dataset.attrs["columns"])
+        if columns is None:
+            columns = dataset.attrs["columns"]
+        if column_range is None:
+            return pd.DataFrame(dataset[:length], columns=columns)
+
+        start, num_columns = column_range
+        end = start + num_columns
+        columns = columns[start:end]
+        if len(dataset.shape) == 1:
+            data = dataset[:length]
+        else:
+            data = dataset[:length, start:end]
+        return pd.DataFrame(data, columns=columns)
 
     @staticmethod
     def to_datetime(dataset):
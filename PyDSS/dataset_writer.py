@@ -0,0 +1,82 @@
+"""Contains DatasetWriterThread"""
+
+import logging
+import queue
+import threading
+
+
+logger = logging.getLogger(__name__)
+
+
+class DatasetWriterThread:
+    """Writes DatasetBuffer chunks to HDF datasets in a background thread so
+    that compression overlaps with the simulation.
+
+    The queue is bounded. Submitting a chunk blocks when the queue is full,
+    which limits the memory held by pending chunks. Users must call shutdown
+    to guarantee that all chunks are written.
+
+    """
+    _STOP = None
+
+    def __init__(self, max_queue_size):
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._exception = None
+        self._thread = threading.Thread(
+            target=self._run, name="PyDSSDatasetWriter", daemon=True
+        )
+        self._thread.start()
+        logger.debug("Started dataset writer thread with queue size %s", max_queue_size)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is self._STOP:
+                    return
+                if self._exception is None:
+                    dataset, start, data = item
+                    end = start + len(data)
+                    dataset[start:end] = data
+                    dataset.attrs["length"] = end
+            except Exception as exc:  # pylint: disable=broad-except
+                # Re-raised in the simulation thread by submit or shutdown.
+                logger.exception("Failed to write dataset chunk")
+                self._exception = exc
+            finally:
+                self._queue.task_done()
+
+    def _check_exception(self):
+        if self._exception is not None:
+            raise self._exception
+
+    def submit(self, dataset, start, data):
+        """Queue a chunk of data to be written to a dataset.
+
+        Parameters
+        ----------
+        dataset : h5py.Dataset
+        start : int
+            Row index in the dataset of the first row of data
+        data : np.ndarray
+            Ownership passes to the writer; the caller must not modify it.
+
+        """
+        self._check_exception()
+        self._queue.put((dataset, start, data))
+
+    def drain(self):
+        """Block until all queued chunks have been written."""
+        self._queue.join()
+        self._check_exception()
+
+    def shutdown(self):
+        """Write all queued chunks and stop the thread."""
+        self._queue.put(self._STOP)
+        self._thread.join()
+        self._check_exception()
+        logger.debug("Stopped dataset writer thread")
+
+    @property
+    def is_alive(self):
+        return self._thread.is_alive()
@@ -43,6 +43,11 @@ class dssBus(dssObjectBase):
     }
     VARIABLE_OUTPUTS_COMPLEX = ()
 
+    __slots__ = ("_Index", "XY", "_Nodes", "_NumTerminals", "_NumConductors", "Distance")
+
+    # The variable table is the same for every bus.
+    _VARIABLE_TABLE = None
+
     def __init__(self, dssInstance):
         name = dssInstance.Bus.Name()
         super(dssBus, self).__init__(dssInstance, name, name)
@@ -54,12 +59,16 @@ class dssBus(dssObjectBase):
         self._NumTerminals = 1
         self._NumConductors = len(dssInstance.Bus.Nodes())
         self.Distance = dssInstance.Bus.Distance()
-        BusVarDict = dssInstance.Bus.__dict__
-        for key in BusVarDict.keys():
-            try:
-                self._Variables[key] = getattr(dssInstance.Bus, key)
-            except:
-                self._Variables[key] = None
+        if dssBus._VARIABLE_TABLE is None:
+            Variables = {}
+            BusVarDict = dssInstance.Bus.__dict__
+            for key in BusVarDict.keys():
+                try:
+                    Variables[key] = getattr(dssInstance.Bus, key)
+                except:
+                    Variables[key] = None
+            dssBus._VARIABLE_TABLE = Variables
+        self._Variables = dssBus._VARIABLE_TABLE
         if self.GetVariable('X') is not None:
             self.XY = [self.GetVariable('X'), self.GetVariable('Y')]
         else:
@@ -78,4 +87,7 @@ class dssBus(dssObjectBase):
         return self._Nodes[:]
 
     def SetActiveObject(self):
+        if self._ActiveObjects.bus is self:
+            return
         self._dssInstance.Circuit.SetActiveBus(self._Name)
+        self._ActiveObjects.bus = self
@@ -10,6 +10,8 @@ class dssCircuit(dssObjectBase):
         "TotalPower",
     )
 
+    __slots__ = ()
+
     def __init__(self, dssInstance):
         name = dssInstance.Circuit.Name()
         fullName = "Circuit." + name
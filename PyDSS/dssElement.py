@@ -48,7 +48,15 @@ class dssElement(dssObjectBase):
 
     _MAX_CONDUCTORS = 4
 
-    def __init__(self, dssInstance):
+    __slots__ = ("_NumTerminals", "_NumConductors", "_NumPhases", "_Nodes", "_Parameters",
+                 "Bus", "BusCount", "_sBus", "_Buses")
+
+    # Parameter and variable tables by element class. They are the same for
+    # every element of a class and are never modified.
+    _PARAMETER_TABLES = {}
+    _VARIABLE_TABLES = {}
+
+    def __init__(self, dssInstance, buses=None):
         fullName = dssInstance.Element.Name()
         if dssInstance.CktElement.Name() != fullName:
             raise Exception(f"name mismatch {dssInstance.CktElement.Name()} {fullName}")
@@ -56,10 +64,10 @@ class dssElement(dssObjectBase):
         self._Class, name = fullName.split('.', 1)
         super(dssElement, self).__init__(dssInstance, name, fullName)
         self._Enabled = dssInstance.CktElement.Enabled()
+        self._Buses = buses
         if not self._Enabled:
             return
 
-        self._Parameters = {}
         self._NumTerminals = dssInstance.CktElement.NumTerminals()
         self._NumConductors = dssInstance.CktElement.NumConductors()
 
@@ -75,26 +83,46 @@ class dssElement(dssObjectBase):
 
         self._dssInstance = dssInstance
 
-        PropertiesNames = self._dssInstance.Element.AllPropertyNames()
-        AS = range(len(PropertiesNames))
-        for i, PptName in zip(AS, PropertiesNames):
-            self._Parameters[PptName] = str(i)
-
-        CktElmVarDict = dssInstance.CktElement.__dict__
-        for VarName in dssInstance.CktElement.AllVariableNames():
-            CktElmVarDict[VarName] = None
+        self._Parameters = self._PARAMETER_TABLES.get(self._Class)
+        if self._Parameters is None:
+            PropertiesNames = self._dssInstance.Element.AllPropertyNames()
+            self._Parameters = {PptName: str(i) for i, PptName in enumerate(PropertiesNames)}
+            self._PARAMETER_TABLES[self._Class] = self._Parameters
+
+        self._Variables = self._VARIABLE_TABLES.get(self._Class)
+        if self._Variables is None:
+            self._Variables = {}
+            CktElmVarDict = dssInstance.CktElement.__dict__
+            for VarName in dssInstance.CktElement.AllVariableNames():
+                CktElmVarDict[VarName] = None
+
+            for key in CktElmVarDict.keys():
+                try:
+                    self._Variables[key] = getattr(dssInstance.CktElement, key)
+                except:
+                    self._Variables[key] = None
+            self._VARIABLE_TABLES[self._Class] = self._Variables
 
-        for key in CktElmVarDict.keys():
-            try:
-                self._Variables[key] = getattr(dssInstance.CktElement, key)
-            except:
-                self._Variables[key] = None
         self.Bus = dssInstance.CktElement.BusNames()
         self.BusCount = len(self.Bus)
-        self.sBus = []
-        for BusName in self.Bus:
-            self._dssInstance.Circuit.SetActiveBus(BusName)
-            self.sBus.append(dssBus(self._dssInstance))
+        self._sBus = None
+
+    @property
+    def sBus(self):
+        """Return the dssBus of each connected bus."""
+        if self._sBus is None:
+            self._sBus = [self._GetBus(x) for x in self.Bus]
+        return self._sBus
+
+    def _GetBus(self, BusName):
+        # Share the objects in the circuit's bus dictionary when possible.
+        # Element bus names can include nodes, such as bus1.1.2.
+        name = BusName.split('.', 1)[0].lower()
+        if self._Buses is not None and name in self._Buses:
+            return self._Buses[name]
+        self._dssInstance.Circuit.SetActiveBus(BusName)
+        self._ActiveObjects.bus = None
+        return dssBus(self._dssInstance)
 
     def GetInfo(self):
         return self._Class, self._Name
@@ -138,25 +166,32 @@ class dssElement(dssObjectBase):
 
 
     def SetActiveObject(self):
+        if self._ActiveObjects.element is self:
+            return
         self._dssInstance.Circuit.SetActiveElement(self._FullName)
         if self._dssInstance.CktElement.Name() != self._dssInstance.Element.Name():
             raise InvalidParameter('Object is not a circuit element')
+        self._ActiveObjects.element = self
 
     def SetParameter(self, Param, Value):
         self._dssInstance.utils.run_command(self._FullName + '.' + Param + ' = ' + str(Value))
+        self._ActiveObjects.invalidate()
+        self._Values.invalidate()
         return self.GetParameter(Param)
 
     def GetParameter(self, Param):
-        self._dssInstance.Circuit.SetActiveElement(self._FullName)
-        if self._dssInstance.Element.Name() == (self._FullName):
-            x = self._dssInstance.Properties.Value(Param)
-            try:
-                return float(x)
-            except:
-                return x
-        else:
-            print('Could not set ' + self._FullName + ' as active element.')
-            return None
+        if self._ActiveObjects.element is not self:
+            self._dssInstance.Circuit.SetActiveElement(self._FullName)
+            if self._dssInstance.Element.Name() != self._FullName:
+                print('Could not set ' + self._FullName + ' as active element.')
+                return None
+            self._ActiveObjects.element = self
+
+        x = self._dssInstance.Properties.Value(Param)
+        try:
+            return float(x)
+        except:
+            return x
 
     @property
     def Conductors(self):
@@ -3,9 +3,14 @@ from PyDSS.dssTransformer import dssTransformer
 from PyDSS.dssElement import dssElement
 
 
-def create_dss_element(element_class, element_name, dss_instance):
-    """Instantiate the correct class for the given element_class and element_name."""
+def create_dss_element(element_class, element_name, dss_instance, buses=None):
+    """Instantiate the correct class for the given element_class and element_name.
+
+    buses is the circuit's bus dictionary. Elements reference its dssBus
+    objects instead of creating their own.
+
+    """
     if element_class == "Transformer":
-        return dssTransformer(dss_instance)
+        return dssTransformer(dss_instance, buses=buses)
     else:
-        return dssElement(dss_instance)
+        return dssElement(dss_instance, buses=buses)
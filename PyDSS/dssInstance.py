@@ -1,23 +1,35 @@
 from PyDSS.ResultContainer import ResultContainer as RC
 from PyDSS.ResultData import ResultData
+from PyDSS.circuit_snapshot import CircuitSnapshot
+from PyDSS.checkpoint import (
+    CHECKPOINT_FILENAME, get_object_state, load_checkpoint, remove_checkpoint, save_checkpoint,
+    set_object_state,
+)
 from PyDSS.pyContrReader import pyContrReader as pcr
 from PyDSS.pyPlotReader import pyPlotReader as ppr
 from PyDSS.dssElementFactory import create_dss_element
 from PyDSS.dssCircuit import dssCircuit
 from PyDSS.NetworkModifier import Modifier
 from PyDSS.dssBus import dssBus
+from PyDSS.dssObjectBase import invalidate_active_objects, invalidate_solution
+from PyDSS.object_registry import LazyObjectRegistry
 from PyDSS import SolveMode
 from PyDSS import pyLogger
 from PyDSS import helics_interface as HI
 from PyDSS.utils.utils import make_human_readable_size
+from PyDSS.utils.timing_utils import NULL_TIMER, ProgressReporter, TimingStats
 from PyDSS.ProfileManager.ProfileStore import ProfileManager
 from PyDSS.exceptions import InvalidParameter, InvalidConfiguration
 
 from PyDSS.pyPostprocessor import pyPostprocess
 import PyDSS.pyControllers as pyControllers
+from PyDSS.pyControllers.ControllerActiveSet import ControllerActiveSet
+from PyDSS.pyControllers.PvControllerFleet import create_pv_controller_fleets
+from PyDSS.modes.adaptive_stepper import AdaptiveStepper
 import PyDSS.pyPlots as pyPlots
 import numpy as np
 import logging
+import multiprocessing
 import json
 import time
 import os
@@ -30,15 +42,59 @@ from opendssdirect.utils import run_command
 CONTROLLER_PRIORITIES = 3
 
 class OpenDSS:
-    def __init__(self):
+    def __init__(self, params, partition=None):
         import opendssdirect as dss
         self._dssInstance = dss
+        self._CircuitSnapshot = None
+        # FeederPartition of a worker process that solves part of the circuit
+        self._Partition = partition
+        self.init(params)
 
     def init(self, params):
+        self._SetOptions(params)
+        self._CompileCircuit(params)
+        self._InitializeScenario(params)
+
+    def ReuseCircuit(self, params):
+        """Prepare the compiled circuit for a different scenario. The circuit
+        is restored to the state it had after compilation. It is recompiled if
+        that is not possible.
+
+        """
+        self._CloseLoggers()
+        self._SetOptions(params)
+        try:
+            if self._CircuitSnapshot is None:
+                raise InvalidConfiguration("no circuit snapshot exists")
+            count = self._CircuitSnapshot.restore()
+        except InvalidConfiguration as exc:
+            self._Logger.warning('Cannot reuse the compiled circuit (%s); recompiling.', exc)
+            self._CompileCircuit(params)
+        else:
+            self._Logger.info('Reused the compiled circuit; restored %s properties.', count)
+            self._dssSolver = SolveMode.GetSolver(SimulationSettings=params, dssInstance=self._dssInstance)
+            # The solution is from the end of the previous scenario.
+            self._dssSolver.reSolve()
+        self._InitializeScenario(params)
+
+    @staticmethod
+    def GetCircuitKey(params):
+        """Return the settings that determine the compiled circuit. A compiled
+        circuit can be reused for scenarios with the same key.
+
+        """
+        project = params['Project']
+        return (
+            project['Project Path'],
+            project['Active Project'],
+            project['DSS File'],
+            project['DSS File Absolute Path'],
+            params['Frequency']['Fundamental frequency'],
+            params['Frequency']['Neglect shunt admittance'],
+        )
+
+    def _SetOptions(self, params):
         self._TempResultList = []
-        self._dssBuses = {}
-        self._dssObjects = {}
-        self._dssObjectsByClass = {}
         self._DelFlag = 0
         self._pyPlotObjects = {}
         self.BokehSessionID = None
@@ -83,6 +139,10 @@ class OpenDSS:
         for key, path in self._dssPath.items():
             assert (os.path.exists(path)), '{} path: {} does not exist!'.format(key, path)
 
+    def _CompileCircuit(self, params):
+        self._dssBuses = {}
+        self._dssObjects = {}
+        self._dssObjectsByClass = {}
         self._dssInstance.Basic.ClearAll()
         self._dssInstance.utils.run_command('Log=NO')
 
@@ -115,12 +175,17 @@ class OpenDSS:
         self._dssCommand = run_command
         self._dssSolution = self._dssInstance.Solution
         self._dssSolver = SolveMode.GetSolver(SimulationSettings=params, dssInstance=self._dssInstance)
+        if self._Partition is not None:
+            self._Partition.isolate(self._dssInstance)
 
-        self._Modifier = Modifier(self._dssInstance, run_command, params)
         self._UpdateDictionary()
         self._CreateBusObjects()
         self._dssSolver.reSolve()
+        if params['Project']['Reuse Compiled Circuit']:
+            self._CircuitSnapshot = CircuitSnapshot(self._dssInstance)
 
+    def _InitializeScenario(self, params):
+        self._Modifier = Modifier(self._dssInstance, run_command, params)
         if params['Profiles']["Use profile manager"]:
             #TODO: disable internal profiles
             self._Logger.info('Disabling internal yearly and duty-cycle profiles.')
@@ -139,10 +204,12 @@ class OpenDSS:
                                                 self._dssBuses, self._dssSolver, self._dssCommand, self._dssInstance)
 
         pyCtrlReader = pcr(self._dssPath['pyControllers'])
-        ControllerList = pyCtrlReader.pyControllers
+        self._ControllerList = pyCtrlReader.pyControllers
+        self._pyControls = {}
+        self._CreateControllerActiveSet()
 
-        if ControllerList is not None:
-            self._CreateControllers(ControllerList)
+        if self._ControllerList is not None:
+            self._CreateControllers(self._ControllerList)
 
         if params['Plots']['Create dynamic plots']:
             pyPlotReader = ppr(self._dssPath['pyPlots'])
@@ -154,6 +221,12 @@ class OpenDSS:
                     self._pyPlotObjects[Plot].session.show()
                 break
         self._increment_flag = True
+        self._AdaptiveStepper = None
+        self._StepSkipped = False
+        self._WarmupSteps = 0
+        self._Timing = None
+        self._MonteCarlo = None
+        self._ScenarioSnapshot = None
         if params['Helics']["Co-simulation Mode"]:
             self._HI = HI.helics_interface(self._dssSolver, self._dssObjects, self._dssObjectsByClass, params,
                                            self._dssPath)
@@ -168,6 +241,21 @@ class OpenDSS:
 
     def _CreateControllers(self, ControllerDict):
         self._pyControls = {}
+        if self._Partition is not None:
+            ControllerDict = {
+                x: {Name: Settings for Name, Settings in y.items() if Name in self._dssObjects}
+                for x, y in ControllerDict.items()
+            }
+
+        if self._Options['Project']['Use PV Controller Fleets'] and 'PvController' in ControllerDict:
+            ControllerDict = dict(ControllerDict)
+            fleets = create_pv_controller_fleets(
+                ControllerDict.pop('PvController'), self._dssObjects, self._dssInstance, self._dssSolver,
+                self._Options['Project']['Fleet Setpoint Tolerance'],
+            )
+            for fleet in fleets:
+                self._pyControls['Controller.' + fleet.Name()] = fleet
+                self._Logger.info('Created pyController -> Controller.' + fleet.Name())
 
         for ControllerType, ElementsDict in ControllerDict.items():
             for ElmName, SettingsDict in ElementsDict.items():
@@ -176,8 +264,18 @@ class OpenDSS:
                 if Controller != -1:
                     self._pyControls['Controller.' + ElmName] = Controller
                     self._Logger.info('Created pyController -> Controller.' + ElmName)
+        self._CreateControllerActiveSet()
         return
 
+    def _CreateControllerActiveSet(self):
+        self._ControllerActiveSet = ControllerActiveSet(
+            self._pyControls,
+            self._dssInstance,
+            self._Options['Project']['Error tolerance'],
+            self._Options['Project']['Voltage Change Tolerance'],
+            enabled=self._Options['Project']['Active Set Control Loop'],
+        )
+
     def _CreatePlots(self, PlotsDict):
 
         self.BokehDoc = curdoc()
@@ -233,13 +331,14 @@ class OpenDSS:
         return
 
     def _UpdateControllers(self, Priority, Time, Iteration, UpdateResults):
-        errors = []
-        maxError = 0
-        for controller in self._pyControls.values():
+        controllers = self._ControllerActiveSet.get_active_controllers(Iteration)
+        isLastIteration = Iteration == self._Options['Project']['Max Control Iterations'] - 1
+        tolerance = self._Options['Project']['Error tolerance']
+        for name, controller in controllers:
             error = controller.Update(Priority, Time, UpdateResults)
-            maxError = error if error > maxError else maxError
-            if Iteration == self._Options['Project']['Max Control Iterations'] - 1:
-                if error > self._Options['Project']['Error tolerance']:
+            self._ControllerActiveSet.set_error(name, error)
+            if isLastIteration:
+                if error > tolerance:
                     errorTag = {
                             "Report": "Convergence",
                             "Time": self._dssSolver.GetTotalSeconds(),
@@ -250,43 +349,77 @@ class OpenDSS:
                     }
                     json_object = json.dumps(errorTag)
                     self._reportsLogger.warning(json_object)
-            if Priority == 0:
-                pass
-        return maxError < self._Options['Project']['Error tolerance'], maxError
+        maxError = self._ControllerActiveSet.record_iteration(Priority, Iteration, len(controllers))
+        return self._ControllerActiveSet.has_converged(maxError), maxError
+
+    def GetControlLoopStatistics(self):
+        """Return the statistics of the control loop iterations of the last
+        time step.
+
+        Returns
+        -------
+        list
+            list of dict with keys Priority, Iteration, Active controllers,
+            Total controllers and Max error
+
+        """
+        return self._ControllerActiveSet.statistics
 
     def _CreateBusObjects(self):
         BusNames = self._dssCircuit.AllBusNames()
+        if self._Partition is not None:
+            BusNames = self._Partition.filter_bus_names(BusNames)
         self._dssInstance.run_command('New  Fault.DEFAULT Bus1={} enabled=no r=0.01'.format(BusNames[0]))
-        for BusName in BusNames:
-            self._dssCircuit.SetActiveBus(BusName)
-            self._dssBuses[BusName] = dssBus(self._dssInstance)
+        self._dssBuses = LazyObjectRegistry(self._CreateBus, BusNames)
+        self._dssObjectsByClass['Buses'] = self._dssBuses
         return
 
+    def _CreateBus(self, BusName):
+        # Objects are created on first access, so preserve the active bus.
+        ActiveBus = self._dssInstance.Bus.Name()
+        self._dssCircuit.SetActiveBus(BusName)
+        Bus = dssBus(self._dssInstance)
+        if ActiveBus:
+            self._dssCircuit.SetActiveBus(ActiveBus)
+        invalidate_active_objects(self._dssInstance)
+        return Bus
+
+    def _CreateElement(self, ElmName):
+        # Objects are created on first access, so preserve the active element.
+        ActiveElement = self._dssInstance.Element.Name()
+        self._dssInstance.Circuit.SetActiveElement(ElmName)
+        Class, Name = ElmName.split('.', 1)
+        Element = create_dss_element(Class, Name, self._dssInstance, buses=self._dssBuses)
+        if ActiveElement:
+            self._dssInstance.Circuit.SetActiveElement(ActiveElement)
+        invalidate_active_objects(self._dssInstance)
+        return Element
+
     def _UpdateDictionary(self):
         InvalidSelection = ['Settings', 'ActiveClass', 'dss', 'utils', 'PDElements', 'XYCurves', 'Bus', 'Properties']
         # TODO: this causes a segmentation fault. Aadil says it may not be needed.
         #self._dssObjectsByClass={'LoadShape': self._GetRelaventObjectDict('LoadShape')}
 
-        for ElmName in self._dssInstance.Circuit.AllElementNames():
-            Class, Name =  ElmName.split('.', 1)
-            if Class + 's' not in self._dssObjectsByClass:
-                self._dssObjectsByClass[Class + 's'] = {}
-            self._dssInstance.Circuit.SetActiveElement(ElmName)
-            self._dssObjectsByClass[Class + 's'][ElmName] = create_dss_element(Class, Name, self._dssInstance)
-            self._dssObjects[ElmName] = self._dssObjectsByClass[Class + 's'][ElmName]
-
-        for ObjName in self._dssObjects.keys():
-            Class = ObjName.split('.')[0] + 's'
-            if Class not in self._dssObjectsByClass:
-                self._dssObjectsByClass[Class] = {}
-            if  ObjName not in self._dssObjectsByClass[Class]:
-                self._dssObjectsByClass[Class][ObjName] = self._dssObjects[ObjName]
+        # Element objects are created on first access.
+        ElmNames = self._dssInstance.Circuit.AllElementNames()
+        if self._Partition is not None:
+            # Disabled elements belong to other processes.
+            ElmNames = self._Partition.filter_element_names(ElmNames)
+        self._dssObjects = LazyObjectRegistry(self._CreateElement, ElmNames)
+        NamesByClass = {}
+        for ElmName in ElmNames:
+            Class = ElmName.split('.', 1)[0] + 's'
+            NamesByClass.setdefault(Class, []).append(ElmName)
+        for Class, Names in NamesByClass.items():
+            self._dssObjectsByClass[Class] = self._dssObjects.view(Names)
+        if self._Partition is not None:
+            # Circuit totals would only cover the partition.
+            return
 
         self._dssObjects['Circuit.' + self._dssCircuit.Name()] = dssCircuit(self._dssInstance)
         self._dssObjectsByClass['Circuits'] = {
             'Circuit.' + self._dssCircuit.Name(): self._dssObjects['Circuit.' + self._dssCircuit.Name()]
         }
-        self._dssObjectsByClass['Buses'] = self._dssBuses
         return
 
     def _GetRelaventObjectDict(self, key):
@@ -302,33 +435,48 @@ class OpenDSS:
 
     def RunStep(self, step, updateObjects=None):
         # updating parameters bebore simulation run
-        self._Logger.info(f'PyDSS datetime - {self._dssSolver.GetDateTime()}')
-        self._Logger.info(f'OpenDSS time [h] - {self._dssSolver.GetOpenDSSTime()}')
+        if self._Logger.isEnabledFor(logging.DEBUG):
+            self._Logger.debug('PyDSS datetime - %s', self._dssSolver.GetDateTime())
+            self._Logger.debug('OpenDSS time [h] - %s', self._dssSolver.GetOpenDSSTime())
         if self._Options['Profiles']["Use profile manager"]:
-            self.profileStore.update()
+            with self._Timer('Profile update'):
+                self.profileStore.update()
 
         if self._Options['Helics']['Co-simulation Mode']:
-            self._HI.updateHelicsSubscriptions()
+            with self._Timer('HELICS subscriptions'):
+                self._HI.updateHelicsSubscriptions()
         else:
             if updateObjects:
                 for object, params in updateObjects.items():
                     cl, name = object.split('.')
                     self._Modifier.Edit_Element(cl, name, params)
 
+        # Profiles and co-simulation inputs can change the active element and
+        # edit elements without going through PyDSS objects.
+        invalidate_solution(self._dssInstance)
+        if self._Partition is not None:
+            self._Partition.update_boundary(self._dssInstance, self._dssSolver)
+
         # run simulation time step and get results
+        controllers_quiet = True
         if not self._Options['Project']['Disable PyDSS controllers']:
-            for priority in range(CONTROLLER_PRIORITIES):
-                for i in range(self._Options['Project']['Max Control Iterations']):
-                    has_converged, error = self._UpdateControllers(priority, step, i, UpdateResults=False)
-                    self._Logger.debug('Control Loop {} convergence error: {}'.format(priority, error))
-                    if has_converged or i == self._Options['Project']['Max Control Iterations'] - 1:
-                        if not has_converged:
-                            self._Logger.warning('Control Loop {} no convergence @ {} '.format(priority, step))
-                        break
-                    self._dssSolver.reSolve()
-            self._UpdatePlots()
-            if self._Options['Exports']['Log Results']:
-                self.ResultContainer.UpdateResults()
+            # A skipped step has the solution of the previous step, for which
+            # the controllers already converged. Results repeat its values.
+            if not self._StepSkipped:
+                self._ControllerActiveSet.clear_statistics()
+                for priority in range(CONTROLLER_PRIORITIES):
+                    with self._Timer(f'Control loop priority {priority}'):
+                        self._RunControlLoop(priority, step)
+                controllers_quiet = all(
+                    x["Iteration"] == 0 and self._ControllerActiveSet.has_converged(x["Max error"])
+                    for x in self._ControllerActiveSet.statistics
+                )
+                with self._Timer('Plot updates'):
+                    self._UpdatePlots()
+                invalidate_active_objects(self._dssInstance)
+            if self._Options['Exports']['Log Results'] and step >= self._WarmupSteps:
+                with self._Timer('UpdateResults'):
+                    self.ResultContainer.UpdateResults()
 
         if self._Options['Frequency']['Enable frequency sweep'] and \
                 self._Options['Project']['Simulation Type'].lower() != 'dynamic':
@@ -337,29 +485,60 @@ class OpenDSS:
                                       self._Options['Frequency']['End frequency'] + 1,
                                       self._Options['Frequency']['frequency increment']):
                 self._dssSolver.setFrequency(freqency * self._Options['Frequency']['Fundamental frequency'])
-                self._dssSolver.reSolve()
-                self._UpdatePlots()
-                if self._Options['Exports']['Log Results']:
-                    self.ResultContainer.UpdateResults()
+                with self._Timer('Frequency sweep reSolve'):
+                    self._dssSolver.reSolve()
+                with self._Timer('Plot updates'):
+                    self._UpdatePlots()
+                invalidate_active_objects(self._dssInstance)
+                if self._Options['Exports']['Log Results'] and step >= self._WarmupSteps:
+                    with self._Timer('UpdateResults'):
+                        self.ResultContainer.UpdateResults()
             if self._Options['Project']['Simulation Type'].lower() == 'snapshot':
                 self._dssSolver.setMode('Snapshot')
             else:
                 self._dssSolver.setMode('Yearly')
 
-        if self._Options['Helics']['Co-simulation Mode']:
-            if self._increment_flag:
-                self._dssSolver.IncStep()
+        with self._Timer('IncStep'):
+            if self._Options['Helics']['Co-simulation Mode']:
+                if self._increment_flag:
+                    self._dssSolver.IncStep()
+                else:
+                    self._dssSolver.reSolve()
+            elif self._AdaptiveStepper is not None:
+                self._StepSkipped = self._AdaptiveStepper.advance(controllers_quiet)
             else:
-                self._dssSolver.reSolve()
-        else:
-            self._dssSolver.IncStep()
+                self._dssSolver.IncStep()
 
         if self._Options['Helics']['Co-simulation Mode']:
-            self._HI.updateHelicsPublications()
-            self._increment_flag, helics_time = self._HI.request_time_increment()
+            with self._Timer('HELICS publications'):
+                self._HI.updateHelicsPublications()
+                self._increment_flag, helics_time = self._HI.request_time_increment()
 
         if self.ResultContainer:
-            return self.ResultContainer.GetCurrentData()
+            # ResultData only collects current values if "Return Results" is
+            # enabled. The legacy container always returns them.
+            if isinstance(self.ResultContainer, RC) or self._Options['Project']['Return Results']:
+                return self.ResultContainer.GetCurrentData()
+
+    def _RunControlLoop(self, priority, step):
+        for i in range(self._Options['Project']['Max Control Iterations']):
+            has_converged, error = self._UpdateControllers(priority, step, i, UpdateResults=False)
+            if self._Logger.isEnabledFor(logging.DEBUG):
+                self._Logger.debug('Control Loop %s iteration %s: %s active controllers, convergence error: %s',
+                                   priority, i, self._ControllerActiveSet.statistics[-1]["Active controllers"],
+                                   error)
+            if has_converged or i == self._Options['Project']['Max Control Iterations'] - 1:
+                if not has_converged:
+                    self._Logger.warning('Control Loop {} no convergence @ {} '.format(priority, step))
+                break
+            with self._Timer('Control loop reSolve'):
+                self._dssSolver.reSolve()
+
+    def _Timer(self, name):
+        """Return a context manager that adds its time to the timing statistics."""
+        if self._Timing is None:
+            return NULL_TIMER
+        return self._Timing.timer(name)
 
     def DryRunSimulation(self, project, scenario):
         """Run one time point for getting estimated space."""
@@ -375,16 +554,58 @@ class OpenDSS:
         finally:
             self.ResultContainer.FlushData()
 
-        return self.ResultContainer.max_num_bytes()
+        num_bytes = self.ResultContainer.max_num_bytes()
+        if isinstance(self.ResultContainer, ResultData):
+            full_precision_bytes = self.ResultContainer.max_num_bytes(full_precision=True)
+            if full_precision_bytes > num_bytes:
+                self._Logger.info(
+                    'Compact dtypes reduce the storage requirement from %s to %s (saves %s).',
+                    make_human_readable_size(full_precision_bytes),
+                    make_human_readable_size(num_bytes),
+                    make_human_readable_size(full_precision_bytes - num_bytes),
+                )
+
+        return num_bytes
+
+    def RunSimulation(self, project, scenario, MC_scenario_number=None, Steps=None, WarmupSteps=0,
+                      Checkpoint=None):
+        """Run the simulation.
+
+        Parameters
+        ----------
+        MC_scenario_number : int | None
+            Monte Carlo sample number
+        Steps : int | None
+            Number of time steps to run. Defaults to the steps of the simulation settings.
+        WarmupSteps : int
+            Number of initial time steps for which results are not exported
+        Checkpoint : dict | None
+            If set, resume the simulation from this checkpoint.
+
+        """
+        if MC_scenario_number is None and self._Options['Project']['Time Partitions'] > 1:
+            if self._RunTimePartitions(project, scenario):
+                return
 
-    def RunSimulation(self, project, scenario, MC_scenario_number=None):
         startTime = time.time()
-        Steps, sTime, eTime = self._dssSolver.SimulationSteps()
+        numSteps, sTime, eTime = self._dssSolver.SimulationSteps()
+        if Steps is None:
+            Steps = numSteps
+        self._WarmupSteps = WarmupSteps
         self._Logger.info('Running simulation from {} till {}.'.format(sTime, eTime))
         self._Logger.info('Simulation time step {}.'.format(Steps))
+        checkpointInterval = self._GetCheckpointInterval(MC_scenario_number)
+        if self._Options['Logging']['Timing Statistics']:
+            self._Timing = TimingStats(trace=self._Options['Logging']['Timing Trace'])
         if self._Options['Exports']['Result Container'] == 'ResultData':
             print("initializing store")
-            self.ResultContainer.InitializeDataStore(project.hdf_store, Steps, MC_scenario_number)
+            self.ResultContainer.InitializeDataStore(
+                project.hdf_store,
+                Steps - WarmupSteps,
+                MC_scenario_number,
+                checkpoint=None if Checkpoint is None else Checkpoint['results'],
+                timing=self._Timing,
+            )
 
         postprocessors = [
             pyPostprocess.Create(
@@ -402,12 +623,30 @@ class OpenDSS:
         if not postprocessors:
             self._Logger.info('No post processing script selected')
 
+        self._AdaptiveStepper = self._CreateAdaptiveStepper(postprocessors)
+        self._StepSkipped = False
+
+        step = 0
+        if Checkpoint is not None:
+            step = self._RestoreCheckpoint(Checkpoint)
+        elif checkpointInterval > 0:
+            remove_checkpoint(self._GetCheckpointFilename())
+
+        progress = ProgressReporter(
+            Steps,
+            self._Options['Logging']['Progress Interval (%)'],
+            self._Options['Logging']['Progress Interval (sec)'],
+            log=self._Logger,
+            start_step=step,
+        )
         try:
-            step = 0
             while step < Steps:
-                self.RunStep(step)
+                with self._Timer('RunStep'):
+                    self.RunStep(step)
+                if self._Timing is not None:
+                    self._Timing.end_step(step)
 
-                if step == 0 and self.ResultContainer is not None:
+                if step == WarmupSteps and self.ResultContainer is not None:
                     size = make_human_readable_size(self.ResultContainer.max_num_bytes())
                     self._Logger.info('Storage requirement estimation: %s, estimated based on first time step run.', size)
 
@@ -415,6 +654,10 @@ class OpenDSS:
                     step = postprocessor.run(step, Steps)
                 if self._increment_flag:
                     step += 1
+                progress.update(step)
+                if checkpointInterval > 0 and step < Steps and step % checkpointInterval == 0:
+                    with self._Timer('Checkpoint'):
+                        self._SaveCheckpoint(step)
 
         finally:
             if self._Options and self._Options['Exports']['Log Results']:
@@ -423,21 +666,223 @@ class OpenDSS:
                 self.ResultContainer.FlushData()
 
         if self._Options and self._Options['Exports']['Log Results']:
-            self.ResultContainer.ExportResults(
-                fileprefix="",
-            )
-
+            with self._Timer('ExportResults'):
+                self.ResultContainer.ExportResults(
+                    fileprefix="",
+                )
+        if checkpointInterval > 0:
+            save_checkpoint(self._GetCheckpointFilename(), {'complete': True})
+
+        if self._AdaptiveStepper is not None:
+            self._Logger.info('Skipped the solution of %s of %s time steps',
+                              self._AdaptiveStepper.total_skipped_steps, Steps)
+            self._AdaptiveStepper = None
+        if self._Timing is not None:
+            self._ExportTimingStatistics(MC_scenario_number)
         self._Logger.info('Simulation completed in ' + str(time.time() - startTime) + ' seconds')
         self._Logger.info('End of simulation')
 
+    def _ExportTimingStatistics(self, MC_scenario_number):
+        if isinstance(self.ResultContainer, ResultData) and self._Options['Exports']['Log Results']:
+            count, seconds = self.ResultContainer.GetFlushStatistics()
+            self._Timing.add('HDF flush', seconds, count=count)
+        basename = self._Options['Project']['Active Scenario']
+        if MC_scenario_number is not None:
+            basename += f'_MC{MC_scenario_number}'
+        self._Timing.export(self._dssPath['Log'], basename)
+        for name, stats in list(self._Timing.get_summary()['phases'].items())[:5]:
+            self._Logger.info('Timing: %s took %.3f seconds in %s calls', name, stats['total_seconds'],
+                              stats['count'])
+        self._Timing = None
+
+    def ResumeSimulation(self, project, scenario):
+        """Resume the simulation from its last checkpoint. The simulation is
+        skipped if it completed and restarted if it has no checkpoint.
+
+        """
+        checkpoint = load_checkpoint(self._GetCheckpointFilename())
+        if checkpoint is None:
+            group = 'Exports/' + self._Options['Project']['Active Scenario']
+            if group in project.hdf_store:
+                del project.hdf_store[group]
+            self._Logger.info('No checkpoint exists; restarting the simulation')
+            self.RunSimulation(project, scenario)
+        elif checkpoint['complete']:
+            self._Logger.info('The simulation is already complete')
+        else:
+            self._Logger.info('Resuming the simulation from step %s at %s', checkpoint['step'], checkpoint['time'])
+            self.RunSimulation(project, scenario, Checkpoint=checkpoint)
+
+    def _GetCheckpointFilename(self):
+        return os.path.join(self._dssPath['Export'], self._Options['Project']['Active Scenario'], CHECKPOINT_FILENAME)
+
+    def _GetCheckpointInterval(self, MC_scenario_number):
+        interval = self._Options['Project']['Checkpoint Interval']
+        if interval == 0:
+            return 0
+
+        unsupported = {
+            'the simulation type is not QSTS': self._Options['Project']['Simulation Type'].lower() != 'qsts',
+            'co-simulation mode is enabled': self._Options['Helics']['Co-simulation Mode'],
+            'the profile manager is enabled': self._Options['Profiles']['Use profile manager'],
+            'results are not stored with ResultData': self._Options['Exports']['Result Container'] != 'ResultData' or
+                                                      not self._Options['Exports']['Log Results'],
+            'Monte Carlo samples are run': MC_scenario_number is not None,
+        }
+        reasons = [x for x, y in unsupported.items() if y]
+        if reasons:
+            self._Logger.warning('Checkpoints are disabled because %s', ', '.join(reasons))
+            return 0
+        return interval
+
+    def _SaveCheckpoint(self, step):
+        """Record the state of the simulation before the time step."""
+        checkpoint = {
+            'step': step,
+            'time': self._dssSolver.GetDateTime(),
+            'circuit': CircuitSnapshot(self._dssInstance),
+            'controllers': {x: get_object_state(y) for x, y in self._pyControls.items()},
+            'results': self.ResultContainer.GetCheckpointState(),
+            'complete': False,
+        }
+        save_checkpoint(self._GetCheckpointFilename(), checkpoint)
+        self._Logger.info('Saved a checkpoint at step %s', step)
+
+    def _RestoreCheckpoint(self, checkpoint):
+        """Restore the state of the simulation and return the time step at
+        which it continues."""
+        snapshot = checkpoint['circuit']
+        snapshot.attach(self._dssInstance)
+        snapshot.restore()
+        for name, state in checkpoint['controllers'].items():
+            if name not in self._pyControls:
+                raise InvalidConfiguration(f'{name} is not a controller of the simulation')
+            set_object_state(self._pyControls[name], state)
+
+        step = checkpoint['step']
+        self._dssSolver.GoToStep(step)
+        invalidate_active_objects(self._dssInstance)
+        return step
+
+    def _CreateAdaptiveStepper(self, postprocessors):
+        project_options = self._Options['Project']
+        if not project_options['Adaptive Time Step']:
+            return None
+
+        unsupported = {
+            'the simulation type is not QSTS': project_options['Simulation Type'].lower() != 'qsts',
+            'co-simulation mode is enabled': self._Options['Helics']['Co-simulation Mode'],
+            'the profile manager is enabled': self._Options['Profiles']['Use profile manager'],
+            'the frequency sweep is enabled': self._Options['Frequency']['Enable frequency sweep'],
+            'post-processing scripts are selected': bool(postprocessors),
+        }
+        reasons = [x for x, y in unsupported.items() if y]
+        if reasons:
+            self._Logger.warning('Adaptive Time Step is disabled because %s', ', '.join(reasons))
+            return None
+
+        return AdaptiveStepper(
+            self._dssInstance,
+            self._dssSolver,
+            project_options['Adaptive Profile Tolerance'],
+            project_options['Adaptive Max Skipped Steps'],
+            project_options['Adaptive Event Hold Steps'],
+        )
+
+    def _RunTimePartitions(self, project, scenario):
+        """Run time partitions of the simulation in parallel processes.
+        Returns False if the settings do not support time partitions.
+
+        """
+        from PyDSS.time_partitioning import run_time_partitioned_simulation
+        unsupported = {
+            'the simulation type is not QSTS': self._Options['Project']['Simulation Type'].lower() != 'qsts',
+            'co-simulation mode is enabled': self._Options['Helics']['Co-simulation Mode'],
+            'the profile manager is enabled': self._Options['Profiles']['Use profile manager'],
+            'results are not stored with ResultData': self._Options['Exports']['Result Container'] != 'ResultData',
+            'post-processing scripts are selected': bool(scenario.post_process_infos),
+            'daemon processes cannot start workers': multiprocessing.current_process().daemon,
+        }
+        reasons = [x for x, y in unsupported.items() if y]
+        if reasons:
+            self._Logger.warning('Time Partitions is disabled because %s', ', '.join(reasons))
+            return False
+
+        startTime = time.time()
+        Steps, _, _ = self._dssSolver.SimulationSteps()
+        run_time_partitioned_simulation(project, scenario, self._Options, Steps)
+        self._Logger.info('Simulation completed in ' + str(time.time() - startTime) + ' seconds')
+        return True
+
+    def RunPartitionedSimulation(self, project, scenario):
+        """Split the circuit into feeders and solve them in parallel processes.
+        This process solves the upstream circuit. Runs the simulation in this
+        process if the settings do not support partitioning.
+
+        """
+        from PyDSS.feeder_partitioning import find_feeder_partitions, run_partitioned_simulation
+        unsupported = {
+            'the simulation type is not QSTS': self._Options['Project']['Simulation Type'].lower() != 'qsts',
+            'co-simulation mode is enabled': self._Options['Helics']['Co-simulation Mode'],
+            'the profile manager is enabled': self._Options['Profiles']['Use profile manager'],
+            'the frequency sweep is enabled': self._Options['Frequency']['Enable frequency sweep'],
+            'Adaptive Time Step is enabled': self._Options['Project']['Adaptive Time Step'],
+            'Time Partitions is greater than 1': self._Options['Project']['Time Partitions'] > 1,
+            'post-processing scripts are selected': bool(scenario.post_process_infos),
+            'daemon processes cannot start workers': multiprocessing.current_process().daemon,
+        }
+        reasons = [x for x, y in unsupported.items() if y]
+        if reasons:
+            self._Logger.warning('Feeder Partitioning is disabled because %s', ', '.join(reasons))
+            self.RunSimulation(project, scenario)
+            return
+
+        startTime = time.time()
+        partitions = find_feeder_partitions(
+            self._dssInstance,
+            self._Options['Project']['Number of Partitions'],
+            self._Options['Project']['Partition Bus'],
+        )
+        iterations = run_partitioned_simulation(
+            project, scenario, self._Options, self._dssInstance, self._dssSolver, partitions
+        )
+        self._Logger.info('Solved %s partitions with %s boundary iterations in %s time steps',
+                          partitions.num_partitions, sum(iterations), len(iterations))
+        self._Logger.info('Simulation completed in ' + str(time.time() - startTime) + ' seconds')
+
     def RunMCsimulation(self, project, scenario, samples):
-        from PyDSS.Extensions.MonteCarlo import MonteCarloSim
-        MC = MonteCarloSim(self._Options, self._dssPath, self._dssObjects, self._dssObjectsByClass)
+        from PyDSS.Extensions.MonteCarlo import run_monte_carlo_in_parallel
+        num_workers = min(self._Options['MonteCarlo']['Number of Workers'], samples)
+        if num_workers > 1:
+            if multiprocessing.current_process().daemon:
+                self._Logger.warning('Daemon processes cannot start Monte Carlo workers; '
+                                     'running samples serially.')
+            else:
+                run_monte_carlo_in_parallel(project, scenario, self._Options, samples, num_workers)
+                return
+
         for i in range(samples):
-            MC.Create_Scenario()
-            self.RunSimulation(project, scenario, i)
+            self.RunMCsample(project, scenario, i)
         return
 
+    def RunMCsample(self, project, scenario, sample_number):
+        """Run one Monte Carlo sample from the baseline circuit."""
+        from PyDSS.Extensions.MonteCarlo import MonteCarloSim
+        if self._MonteCarlo is None:
+            self._MonteCarlo = MonteCarloSim(self._Options, self._dssPath, self._dssObjects,
+                                             self._dssObjectsByClass, self._dssInstance)
+            self._ScenarioSnapshot = CircuitSnapshot(self._dssInstance)
+        else:
+            # Undo the edits of controllers and reset their internal state.
+            self._ScenarioSnapshot.restore()
+            if self._ControllerList is not None:
+                self._CreateControllers(self._ControllerList)
+        self._MonteCarlo.Create_Scenario(sample_number)
+        self._dssSolver.reset()
+        # The first time step reads the solution of the sampled circuit.
+        self._dssSolver.reSolve()
+        self.RunSimulation(project, scenario, sample_number)
+
     def _UpdatePlots(self):
         for Plot in self._pyPlotObjects:
             self._pyPlotObjects[Plot].UpdatePlot()
@@ -445,6 +890,9 @@ class OpenDSS:
 
     def __del__(self):
         self._Logger.info('An instance of OpenDSS (' + str(self) + ') has been deleted.')
+        self._CloseLoggers()
+
+    def _CloseLoggers(self):
         loggers = [self._Logger, self._reportsLogger]
         if self._Options["Logging"]["Log to external file"]:
             for L in loggers:
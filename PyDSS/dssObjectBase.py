@@ -2,7 +2,113 @@
 import abc
  
 from PyDSS.exceptions import InvalidParameter
-from PyDSS.value_storage import ValueByLabel, ValueByNumber
+from PyDSS.value_storage import ValueByNumber, ValueSchema
+
+
+class ActiveObjectCache:
+    """Tracks the circuit element and bus that PyDSS objects last activated
+    in an OpenDSS instance, so that repeated reads of one object skip the
+    activation.
+
+    Code that activates elements or buses without a PyDSS object, runs
+    commands, or solves the circuit must call invalidate.
+
+    """
+
+    __slots__ = ("element", "bus")
+
+    def __init__(self):
+        self.element = None
+        self.bus = None
+
+    def invalidate(self):
+        """Forget the active objects."""
+        self.element = None
+        self.bus = None
+
+
+_ACTIVE_OBJECT_CACHES = {}  # id of OpenDSS instance to ActiveObjectCache
+
+
+def get_active_object_cache(dssInstance):
+    """Return the ActiveObjectCache for an OpenDSS instance.
+
+    Returns
+    -------
+    ActiveObjectCache
+
+    """
+    cache = _ACTIVE_OBJECT_CACHES.get(id(dssInstance))
+    if cache is None:
+        cache = ActiveObjectCache()
+        _ACTIVE_OBJECT_CACHES[id(dssInstance)] = cache
+    return cache
+
+
+def invalidate_active_objects(dssInstance):
+    """Forget the active objects of an OpenDSS instance. Call this after
+    activating elements or buses directly, running commands, or solving.
+
+    """
+    get_active_object_cache(dssInstance).invalidate()
+
+
+class ValueCache:
+    """Stores the values of variables read through PyDSS objects since the
+    last change to an OpenDSS instance, so that controllers, plots, exports,
+    and co-simulation publications that read the same quantity in one time
+    step only query OpenDSS once.
+
+    Code that solves the circuit or edits elements must call invalidate.
+    Cached values are shared, so callers must not modify them.
+
+    """
+
+    __slots__ = ("values", "version")
+
+    def __init__(self):
+        self.values = {}  # (object, variable name) to raw value
+        self.version = 0
+
+    def invalidate(self):
+        """Forget all values."""
+        self.values = {}
+        self.version += 1
+
+
+_VALUE_CACHES = {}  # id of OpenDSS instance to ValueCache
+
+
+def get_value_cache(dssInstance):
+    """Return the ValueCache for an OpenDSS instance.
+
+    Returns
+    -------
+    ValueCache
+
+    """
+    cache = _VALUE_CACHES.get(id(dssInstance))
+    if cache is None:
+        cache = ValueCache()
+        _VALUE_CACHES[id(dssInstance)] = cache
+    return cache
+
+
+def invalidate_values(dssInstance):
+    """Forget the cached values of an OpenDSS instance. Call this after
+    running commands that edit elements.
+
+    """
+    get_value_cache(dssInstance).invalidate()
+
+
+def invalidate_solution(dssInstance):
+    """Forget the cached values and active objects of an OpenDSS instance.
+    Call this after solving the circuit.
+
+    """
+    get_value_cache(dssInstance).invalidate()
+    get_active_object_cache(dssInstance).invalidate()
 
 
 class dssObjectBase(abc.ABC):
@@ -10,12 +116,20 @@ class dssObjectBase(abc.ABC):
     VARIABLE_OUTPUTS_BY_LABEL = {}
     VARIABLE_OUTPUTS_COMPLEX = ()
 
+    # Circuits can have hundreds of thousands of these objects. Subclasses
+    # must declare their attributes in __slots__ and share per-class tables.
+    __slots__ = ("_Name", "_FullName", "_Class", "_Variables", "_dssInstance", "_Enabled",
+                 "_ValueSchemas", "_ActiveObjects", "_Values")
+
     def __init__(self, dssInstance, name, fullName):
         self._Name = name
         self._FullName = fullName
         self._Variables = {}
         self._dssInstance = dssInstance
         self._Enabled = True
+        self._ValueSchemas = None
+        self._ActiveObjects = get_active_object_cache(dssInstance)
+        self._Values = get_value_cache(dssInstance)
 
     @property
     def dss(self):
@@ -61,26 +175,59 @@ class dssObjectBase(abc.ABC):
         if VarName not in self._Variables:
             raise InvalidParameter(f'{VarName} is an invalid variable name for element {self._FullName}')
 
-        self.SetActiveObject()
-        func = self._Variables[VarName]
-        if func is None:
-            print(func, VarName)
-            raise InvalidParameter(f"get function for {self._FullName} / {VarName} is None")
+        key = (self, VarName)
+        value = self._Values.values.get(key)
+        if value is None:
+            self.SetActiveObject()
+            func = self._Variables[VarName]
+            if func is None:
+                print(func, VarName)
+                raise InvalidParameter(f"get function for {self._FullName} / {VarName} is None")
+
+            value = func()
+            self._Values.values[key] = value
 
-        value = func()
         if not convert:
             return value
 
         if VarName in self.VARIABLE_OUTPUTS_BY_LABEL:
-            info = self.VARIABLE_OUTPUTS_BY_LABEL[VarName]
-            is_complex = info["is_complex"]
-            units = info["units"]
-            return ValueByLabel(self._FullName, VarName, value, self._Nodes, is_complex, units)
+            return self.GetValueSchema(VarName, value).make_value(value)
         elif VarName in self.VARIABLE_OUTPUTS_COMPLEX:
             assert isinstance(value, list) and len(value) == 2, str(value)
             value = complex(value[0], value[1])
         return ValueByNumber(self._FullName, VarName, value)
 
+    def GetValueSchema(self, VarName, value):
+        """Return the ValueSchema that converts raw values of a labeled variable.
+        The schema is created on first use and reused as long as the length of
+        the raw value does not change.
+
+        Parameters
+        ----------
+        VarName : str
+        value : list
+            Raw value returned by the variable's function
+
+        Returns
+        -------
+        ValueSchema | None
+            None if the variable is not stored by label.
+
+        """
+        info = self.VARIABLE_OUTPUTS_BY_LABEL.get(VarName)
+        if info is None:
+            return None
+
+        if self._ValueSchemas is None:
+            self._ValueSchemas = {}
+        schema = self._ValueSchemas.get(VarName)
+        if schema is None or not schema.matches(value):
+            schema = ValueSchema(
+                self._FullName, VarName, self._Nodes, info["is_complex"], info["units"], len(value)
+            )
+            self._ValueSchemas[VarName] = schema
+        return schema
+
     def GetVariableNames(self):
         return self._Variables.keys()
 
@@ -103,4 +250,5 @@ class dssObjectBase(abc.ABC):
         if VarName not in self._Variables:
             raise InvalidParameter(f"invalid variable name {VarName}")
 
+        self._Values.invalidate()
         return self._Variables[VarName](Value)
@@ -50,8 +50,10 @@ class dssTransformer(dssElement):
         'taps'
     ]
 
-    def __init__(self, dssInstance):
-        super(dssTransformer, self).__init__(dssInstance)
+    __slots__ = ("_NumWindings",)
+
+    def __init__(self, dssInstance, buses=None):
+        super(dssTransformer, self).__init__(dssInstance, buses=buses)
         self._NumWindings = dssInstance.Transformers.NumWindings()
 
     @property
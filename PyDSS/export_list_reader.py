@@ -40,6 +40,12 @@ class StoreValuesType(enum.Enum):
     SUM = "sum"
 
 
+# Dtypes that can be set per property to reduce storage size.
+EXPORT_DTYPES = (
+    "float32", "float64", "complex64", "complex128", "int8", "int16", "int32", "int64",
+)
+
+
 class ExportListProperty:
     def __init__(self, elem_class, data):
         self.elem_class = elem_class
@@ -52,12 +58,21 @@ class ExportListProperty:
         self._sample_interval = data.get("sample_interval", 1)
         self._ma_store_interval = data.get("moving_average_store_interval")
         self._window_size = data.get("window_size", 100)
+        self._scale_offset = data.get("scale_offset")
+        self._dtype = data.get("dtype")
         custom_prop = f"{elem_class}.{self.name}"
         self._custom_function = CUSTOM_FUNCTIONS.get(custom_prop)
 
         if self._store_values_type == StoreValuesType.MOVING_AVERAGE and \
                 self._ma_store_interval is None:
             self._ma_store_interval = self._window_size
+        if self._scale_offset is not None and \
+                (not isinstance(self._scale_offset, int) or self._scale_offset < 0):
+            raise InvalidConfiguration(f"invalid scale_offset: {self._scale_offset}")
+        if self._dtype is not None and self._dtype not in EXPORT_DTYPES:
+            raise InvalidConfiguration(
+                f"invalid dtype: {self._dtype}; must be one of {EXPORT_DTYPES}"
+            )
 
     @staticmethod
     def _parse_limits(data):
@@ -135,6 +150,30 @@ class ExportListProperty:
         """
         return self._limits
 
+    @property
+    def scale_offset(self):
+        """Return the number of decimal digits to keep for float values with
+        the lossy HDF scale-offset filter. None means store full precision.
+
+        Returns
+        -------
+        int | None
+
+        """
+        return self._scale_offset
+
+    @property
+    def dtype(self):
+        """Return the dtype used to store values. None means use the default
+        for the value type.
+
+        Returns
+        -------
+        str | None
+
+        """
+        return self._dtype
+
     @property
     def moving_average_store_interval(self):
         """Return the interval on which moving averages are stored."""
@@ -196,6 +235,10 @@ class ExportListProperty:
             "publish": self.publish,
             "store_values_type": self.store_values_type.value,
         }
+        if self._scale_offset is not None:
+            data["scale_offset"] = self._scale_offset
+        if self._dtype is not None:
+            data["dtype"] = self._dtype
         if self._limits is not None:
             data["limits"] = [self._limits.min, self._limits.max]
             data["limits_filter"] = self._limits_filter.value
@@ -0,0 +1,484 @@
+"""Splits a circuit into feeders that are solved in parallel processes.
+
+The circuit is split at a bus, normally the substation bus from which the
+feeders branch. Each worker process compiles the circuit, disables every
+element outside of its partition and moves the circuit source to the split
+bus. The parent process solves the upstream circuit, in which the feeders are
+replaced by a constant power load at the split bus.
+
+At each time step the workers report the power that flows into their feeders
+and the parent returns the voltage of the split bus, until the voltage
+changes by less than a tolerance.
+
+"""
+
+import copy
+import logging
+import multiprocessing
+import os
+import threading
+
+import h5py
+import networkx as nx
+import numpy as np
+
+from PyDSS.NetworkModifier import ParameterBatch
+from PyDSS.dssObjectBase import invalidate_active_objects
+from PyDSS.exceptions import InvalidConfiguration
+from PyDSS.pydss_fs_interface import SCENARIO_STORES_DIRNAME
+from PyDSS.storage_backends import StorageBackend, merge_hdf_stores, open_store
+
+
+logger = logging.getLogger(__name__)
+
+BOUNDARY_LOAD = "pydss_boundary"
+
+# Control and metering elements belong to the partition of the element that
+# they reference: class -> (property, class of names without a class prefix)
+_REFERENCE_PROPERTIES = {
+    "regcontrol": ("transformer", "Transformer"),
+    "capcontrol": ("capacitor", "Capacitor"),
+    "swtcontrol": ("switchedobj", None),
+    "energymeter": ("element", None),
+    "monitor": ("element", None),
+    "sensor": ("element", None),
+    "fuse": ("monitoredobj", None),
+    "recloser": ("monitoredobj", None),
+    "relay": ("monitoredobj", None),
+}
+
+# Controls of lists of DERs stay enabled in every process. They only act on
+# enabled elements.
+_SHARED_CLASSES = {
+    "invcontrol", "expcontrol", "storagecontroller", "gendispatcher", "upfccontrol", "espvlcontrol",
+}
+
+
+class FeederPartitions:
+    """Describes how a circuit is split into partitions of feeders.
+
+    Upstream elements, such as the source and the substation transformer,
+    and shunt elements at the split bus are solved by the parent process.
+
+    """
+
+    def __init__(self, source, split_bus, base_kv, upstream, partitions):
+        self.source = source  # name of the circuit's Vsource
+        self.split_bus = split_bus
+        self.base_kv = base_kv  # line-to-line kV at the split bus
+        self.upstream = upstream  # list of element names
+        self.partitions = partitions  # list of lists of element names
+
+    @property
+    def num_partitions(self):
+        """Return the number of partitions."""
+        return len(self.partitions)
+
+    def get_disabled_elements(self, index=None):
+        """Return the elements to disable in the process that solves a
+        partition.
+
+        Parameters
+        ----------
+        index : int | None
+            Index of the partition. None returns the elements to disable in
+            the upstream circuit.
+
+        Returns
+        -------
+        list
+
+        """
+        names = []
+        if index is not None:
+            names += [x for x in self.upstream if x.lower() != "vsource." + self.source.lower()]
+        for i, partition in enumerate(self.partitions):
+            if i != index:
+                names += partition
+        return names
+
+
+def find_feeder_partitions(dss, num_partitions, split_bus=""):
+    """Split a circuit into partitions of feeders.
+
+    The feeders are the parts of the circuit that are connected to the split
+    bus but not to the source. Feeders are assigned to partitions so that the
+    partitions have similar numbers of elements.
+
+    Parameters
+    ----------
+    dss : module
+        opendssdirect
+    num_partitions : int
+        Maximum number of partitions
+    split_bus : str
+        Bus at which the circuit is split. If empty, this is the first bus
+        downstream of the source from which multiple feeders branch.
+
+    Returns
+    -------
+    FeederPartitions
+
+    Raises
+    ------
+    InvalidConfiguration
+        Raised if the circuit cannot be split.
+
+    """
+    elements = _read_elements(dss)
+    dss.Vsources.First()
+    source = dss.Vsources.Name()
+    source_bus = elements["vsource." + source.lower()][0]
+
+    graph = nx.Graph()
+    graph.add_nodes_from(dss.Circuit.AllBusNames())
+    for buses in elements.values():
+        for bus in buses[1:]:
+            if bus != buses[0]:
+                graph.add_edge(buses[0], bus)
+
+    split_bus = split_bus.lower() if split_bus else _find_split_bus(graph, source_bus)
+    if split_bus not in graph:
+        raise InvalidConfiguration(f"split bus {split_bus} does not exist")
+    if split_bus == source_bus:
+        raise InvalidConfiguration("the circuit cannot be split at the source bus")
+
+    graph.remove_node(split_bus)
+    components = {}  # bus to component index; 0 is upstream
+    feeders = [x for x in nx.connected_components(graph) if source_bus not in x]
+    if len(feeders) < 2:
+        raise InvalidConfiguration(f"fewer than two feeders are connected to bus {split_bus}")
+    for i, buses in enumerate(feeders, start=1):
+        components.update(dict.fromkeys(buses, i))
+
+    assigned = {}  # lowercase element name to component index
+    for name, buses in elements.items():
+        feeder_buses = [x for x in buses if x != split_bus]
+        assigned[name] = components.get(feeder_buses[0], 0) if feeder_buses else 0
+
+    members = [[] for _ in range(len(feeders) + 1)]
+    for name in dss.Circuit.AllElementNames():
+        index = _assign_element(dss, name, elements, assigned)
+        if index is not None:
+            members[index].append(name)
+    invalidate_active_objects(dss)
+
+    dss.Circuit.SetActiveBus(split_bus)
+    base_kv = dss.Bus.kVBase() * np.sqrt(3)
+    invalidate_active_objects(dss)
+
+    partitions = _group_feeders(members[1:], num_partitions)
+    logger.info("Split the circuit at bus %s into %s feeders in %s partitions",
+                split_bus, len(feeders), len(partitions))
+    return FeederPartitions(source, split_bus, base_kv, members[0], partitions)
+
+
+def _read_elements(dss):
+    """Return the bus names of all elements with buses, except controls."""
+    elements = {}
+    for name in dss.Circuit.AllElementNames():
+        elem_class = name.split(".", 1)[0].lower()
+        if elem_class in _REFERENCE_PROPERTIES or elem_class in _SHARED_CLASSES:
+            continue
+        dss.Circuit.SetActiveElement(name)
+        buses = [x.split(".")[0].lower() for x in dss.CktElement.BusNames()]
+        if buses:
+            elements[name.lower()] = buses
+    invalidate_active_objects(dss)
+    return elements
+
+
+def _assign_element(dss, name, elements, assigned):
+    """Return the component of an element, or None if it stays enabled in
+    every process."""
+    lname = name.lower()
+    if lname in assigned:
+        return assigned[lname]
+
+    elem_class = lname.split(".", 1)[0]
+    if elem_class not in _REFERENCE_PROPERTIES:
+        return None
+    prop, default_class = _REFERENCE_PROPERTIES[elem_class]
+    dss.Circuit.SetActiveElement(name)
+    reference = dss.Properties.Value(prop).lower()
+    if reference and "." not in reference and default_class is not None:
+        reference = f"{default_class.lower()}.{reference}"
+    return assigned.get(reference)
+
+
+def _find_split_bus(graph, source_bus):
+    """Return the first bus in breadth-first order from the source whose
+    removal disconnects multiple parts of the circuit from the source."""
+    for bus in nx.bfs_tree(graph, source_bus):
+        if bus == source_bus:
+            continue
+        reduced = graph.subgraph(x for x in graph if x != bus)
+        feeders = [x for x in nx.connected_components(reduced) if source_bus not in x]
+        if len(feeders) > 1:
+            return bus
+    raise InvalidConfiguration("no bus connects multiple feeders to the source")
+
+
+def _group_feeders(feeders, num_partitions):
+    """Assign the largest remaining feeder to the smallest partition."""
+    partitions = [[] for _ in range(min(num_partitions, len(feeders)))]
+    for feeder in sorted(feeders, key=len, reverse=True):
+        min(partitions, key=len).extend(feeder)
+    return partitions
+
+
+def read_boundary_voltage(dss, bus):
+    """Return the mean per-unit voltage magnitude and the angle of the first
+    node of a bus.
+
+    Returns
+    -------
+    tuple
+        (pu, angle in degrees)
+
+    """
+    dss.Circuit.SetActiveBus(bus)
+    values = dss.Bus.puVmagAngle()
+    invalidate_active_objects(dss)
+    return float(np.mean(values[0::2])), values[1]
+
+
+class FeederPartition:
+    """Solves one partition of feeders in a worker process.
+
+    The OpenDSS instance calls isolate after compiling the circuit and
+    update_boundary at each time step.
+
+    """
+
+    def __init__(self, partitions, index, powers, voltage, barrier):
+        self._partitions = partitions
+        self._index = index
+        self._powers = powers
+        self._voltage = voltage
+        self._barrier = barrier
+        self._names = set(partitions.partitions[index])
+        self._buses = {partitions.split_bus}
+
+    @property
+    def index(self):
+        """Return the index of the partition."""
+        return self._index
+
+    def isolate(self, dss):
+        """Disable the elements of other partitions and upstream elements and
+        move the circuit source to the split bus."""
+        for name in self._partitions.partitions[self._index]:
+            dss.Circuit.SetActiveElement(name)
+            self._buses.update(x.split(".")[0].lower() for x in dss.CktElement.BusNames())
+        batch = ParameterBatch(dss)
+        for name in self._partitions.get_disabled_elements(self._index):
+            batch.add(name, "enabled", "no")
+        batch.apply()
+        dss.utils.run_command(
+            f"Edit Vsource.{self._partitions.source} bus1={self._partitions.split_bus} "
+            f"basekv={self._partitions.base_kv} pu={self._voltage[0]} angle={self._voltage[1]} "
+            "MVAsc3=1e6 MVAsc1=1e6"
+        )
+        invalidate_active_objects(dss)
+
+    def filter_element_names(self, names):
+        """Return the names of the elements of the partition."""
+        return [x for x in names if x in self._names]
+
+    def filter_bus_names(self, names):
+        """Return the names of the buses of the partition. Buses that only
+        connect disabled elements do not exist after the next solve."""
+        return [x for x in names if x.lower() in self._buses]
+
+    def update_boundary(self, dss, solver):
+        """Exchange the feeder power and the split bus voltage with the
+        parent process until the voltage converges."""
+        while True:
+            kw, kvar = dss.Circuit.TotalPower()[:2]
+            self._powers[2 * self._index] = -kw
+            self._powers[2 * self._index + 1] = -kvar
+            self._barrier.wait()  # The parent reads the powers.
+            self._barrier.wait()  # The parent wrote the voltage.
+            if self._voltage[2]:
+                return
+            dss.Vsources.Name(self._partitions.source)
+            dss.Vsources.PU(self._voltage[0])
+            dss.Vsources.AngleDeg(self._voltage[1])
+            invalidate_active_objects(dss)
+            solver.reSolve()
+
+    def abort(self):
+        """Release the other processes after an error."""
+        self._barrier.abort()
+
+
+class BoundaryCoordinator:
+    """Solves the upstream circuit in the parent process and sends the split
+    bus voltage to the partitions."""
+
+    def __init__(self, dss, solver, partitions, powers, voltage, barrier, tolerance, max_iterations):
+        self._dss = dss
+        self._solver = solver
+        self._partitions = partitions
+        self._powers = powers
+        self._voltage = voltage
+        self._barrier = barrier
+        self._tolerance = tolerance
+        self._max_iterations = max_iterations
+        self._iterations = []
+
+    @property
+    def iterations(self):
+        """Return the number of boundary iterations of each time step."""
+        return self._iterations
+
+    def isolate(self):
+        """Disable the feeders and add the boundary load."""
+        batch = ParameterBatch(self._dss)
+        for name in self._partitions.get_disabled_elements():
+            batch.add(name, "enabled", "no")
+        batch.apply()
+        self._dss.utils.run_command(
+            f"New Load.{BOUNDARY_LOAD} bus1={self._partitions.split_bus} phases=3 "
+            f"kV={self._partitions.base_kv} kW=0 kvar=0 model=1 status=fixed vminpu=0.5 vmaxpu=1.5"
+        )
+        invalidate_active_objects(self._dss)
+
+    def run(self, num_steps):
+        """Coordinate the partitions for a simulation."""
+        applied = self._to_complex(self._voltage[0], self._voltage[1])
+        batch = ParameterBatch(self._dss)
+        for step in range(num_steps):
+            if step > 0:
+                self._solver.IncStep()
+            for iteration in range(self._max_iterations):
+                self._barrier.wait()
+                batch.add(f"Load.{BOUNDARY_LOAD}", "kW", sum(self._powers[0::2]))
+                batch.add(f"Load.{BOUNDARY_LOAD}", "kvar", sum(self._powers[1::2]))
+                batch.apply()
+                self._solver.reSolve()
+                pu, angle = read_boundary_voltage(self._dss, self._partitions.split_bus)
+                voltage = self._to_complex(pu, angle)
+                done = abs(voltage - applied) <= self._tolerance or iteration == self._max_iterations - 1
+                if not done:
+                    self._voltage[0] = pu
+                    self._voltage[1] = angle
+                    applied = voltage
+                self._voltage[2] = float(done)
+                self._barrier.wait()
+                if done:
+                    break
+            self._iterations.append(iteration + 1)
+            logger.debug("Boundary iterations at step %s: %s", step, iteration + 1)
+
+    @staticmethod
+    def _to_complex(pu, angle):
+        return pu * np.exp(1j * np.radians(angle))
+
+
+def _make_worker_settings(settings):
+    settings = copy.deepcopy(settings)
+    # Workers would overwrite each other's files. They only export to their stores.
+    for key in ("Export Elements", "Export Event Log", "Export PV Profiles"):
+        settings["Exports"][key] = False
+    settings["Plots"]["Create dynamic plots"] = False
+    settings["Project"]["Reuse Compiled Circuit"] = False
+    settings["Project"]["Checkpoint Interval"] = 0
+    settings["Logging"]["Timing Statistics"] = False
+    return settings
+
+
+def _run_partition(project, scenario, settings, partition, filename):
+    from PyDSS import dssInstance
+    try:
+        with open_store(filename, StorageBackend.HDF5, mode="w") as store:
+            project.hdf_store = store
+            dss = dssInstance.OpenDSS(settings, partition=partition)
+            dss.RunSimulation(project, scenario)
+    except Exception:
+        logger.exception("Partition %s failed", partition.index)
+        partition.abort()
+        raise
+
+
+def run_partitioned_simulation(project, scenario, settings, dss, solver, partitions):
+    """Run the partitions of a circuit in parallel processes. The data of
+    each partition is written to its own file in SCENARIO_STORES_DIRNAME and
+    merged into the open project store.
+
+    Parameters
+    ----------
+    project : PyDssProject
+    scenario : PyDssScenario
+    settings : dict
+        Simulation settings
+    dss : module
+        opendssdirect with the compiled circuit. The feeders are disabled.
+    solver : abstact_solver
+    partitions : FeederPartitions
+
+    Returns
+    -------
+    list
+        Number of boundary iterations of each time step
+
+    """
+    store = project.hdf_store
+    # Partition stores are merged with h5py.
+    if not isinstance(store, h5py.File):
+        raise InvalidConfiguration("Feeder Partitioning requires the HDF5 storage backend")
+    store_dir = os.path.join(project.project_path, SCENARIO_STORES_DIRNAME)
+    os.makedirs(store_dir, exist_ok=True)
+
+    num_partitions = partitions.num_partitions
+    barrier = multiprocessing.Barrier(num_partitions + 1)
+    powers = multiprocessing.Array("d", 2 * num_partitions, lock=False)
+    voltage = multiprocessing.Array("d", 3, lock=False)
+    voltage[0], voltage[1] = read_boundary_voltage(dss, partitions.split_bus)
+
+    project_settings = settings["Project"]
+    coordinator = BoundaryCoordinator(
+        dss, solver, partitions, powers, voltage, barrier,
+        project_settings["Boundary Voltage Tolerance"], project_settings["Max Boundary Iterations"],
+    )
+    coordinator.isolate()
+
+    worker_settings = _make_worker_settings(settings)
+    filenames = [
+        os.path.join(store_dir, f"{scenario.name}_partition{i}.h5") for i in range(num_partitions)
+    ]
+    processes = [
+        multiprocessing.Process(
+            target=_run_partition,
+            args=(
+                project,
+                scenario,
+                worker_settings,
+                FeederPartition(partitions, i, powers, voltage, barrier),
+                filenames[i],
+            ),
+        ) for i in range(num_partitions)
+    ]
+
+    logger.info("Running %s feeder partitions in parallel processes", num_partitions)
+    for process in processes:
+        process.start()
+    try:
+        num_steps, _, _ = solver.SimulationSteps()
+        coordinator.run(num_steps)
+    except threading.BrokenBarrierError:
+        pass
+    except Exception:
+        barrier.abort()
+        raise
+    finally:
+        for process in processes:
+            process.join()
+
+    failed = [i for i, x in enumerate(processes) if x.exitcode != 0]
+    if failed:
+        raise Exception(f"feeder partitions {failed} failed; refer to the log")
+
+    merge_hdf_stores(store, filenames)
+    return coordinator.iterations
@@ -140,11 +140,8 @@ class helics_interface:
                     dssElement = self._objects_by_element[element_name]
                     dssElement.SetParameter(sub_info['Property'], value)
 
-                    self._logger.debug('Value for "{}.{}" changed to "{}"'.format(
-                        element_name,
-                        sub_info['Property'],
-                        value * sub_info['Multiplier']
-                    ))
+                    self._logger.debug('Value for "%s.%s" changed to "%s"',
+                                       element_name, sub_info['Property'], value * sub_info['Multiplier'])
 
                     if self._options['Helics']['Iterative Mode']:
                         if self.c_seconds != self.c_seconds_old:
@@ -201,7 +198,7 @@ class helics_interface:
         if not self._options['Helics']['Iterative Mode']:
             while self.c_seconds < r_seconds:
                 self.c_seconds = helics.helicsFederateRequestTime(self._PyDSSfederate, r_seconds )
-            self._logger.info('Time requested: {} - time granted: {} '.format(r_seconds, self.c_seconds))
+            self._logger.debug('Time requested: %s - time granted: %s', r_seconds, self.c_seconds)
             return True, self.c_seconds
         else:
             self.c_seconds, iteration_state = helics.helicsFederateRequestTimeIterative(
@@ -209,8 +206,8 @@ class helics_interface:
                 r_seconds,
                 helics.helics_iteration_request_iterate_if_needed
             )
-            self._logger.info('Time requested: {} - time granted: {} error: {} it: {}'.format(
-                r_seconds, self.c_seconds, error, self.itr))
+            self._logger.debug('Time requested: %s - time granted: %s error: %s it: %s',
+                               r_seconds, self.c_seconds, error, self.itr)
             if error > -1 and self.itr < self._co_convergance_max_iterations:
                 self.itr += 1
                 return False, self.c_seconds
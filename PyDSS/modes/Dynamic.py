@@ -56,17 +56,18 @@ class Dynamic(abstact_solver):
         self._dssSolution.Hour(Hour)
         self._dssSolution.Seconds(Min*60)
         self._dssSolution.Number(mTimeStep)
-        self._dssSolution.Solve()
+        self._SolveCircuit()
         return
 
     def IncStep(self):
         self._dssSolution.StepSize(self._sStepRes)
-        self._dssSolution.Solve()
+        self._SolveCircuit()
         self._Time = self._Time + timedelta(seconds=self._sStepRes)
-        self._Hour = int(self._dssSolution.DblHour() // 1)
-        self._Second = (self._dssSolution.DblHour() % 1) * 60 * 60
-        self.pyLogger.debug('OpenDSS time [h] - ' + str(self._dssSolution.DblHour()))
-        self.pyLogger.debug('PyDSS datetime - ' + str(self._Time))
+        hour = self._dssSolution.DblHour()
+        self._Hour = int(hour // 1)
+        self._Second = (hour % 1) * 60 * 60
+        self.pyLogger.debug('OpenDSS time [h] - %s', hour)
+        self.pyLogger.debug('PyDSS datetime - %s', self._Time)
 
     def GetTotalSeconds(self):
         return (self._Time - self._StartTime).total_seconds()
@@ -82,11 +83,11 @@ class Dynamic(abstact_solver):
 
     def reSolve(self):
         self._dssSolution.StepSize(0)
-        self._dssSolution.SolveNoControl()
+        self._SolveCircuitNoControl()
 
     def Solve(self):
         self._dssSolution.StepSize(0)
-        self._dssSolution.Solve()
+        self._SolveCircuit()
 
     def getMode(self):
         return self._dssSolution.ModeID()
@@ -31,6 +31,7 @@ class QSTS(abstact_solver):
 
         self._EndTime = self._EndTime + timedelta(minutes=EndTimeMin)
         self._sStepRes = sStepResolution
+        self._SkippedSteps = 0
         self._dssIntance = dssInstance
         self._dssSolution = dssInstance.Solution
         self._dssSolution.Mode(2)
@@ -61,18 +62,40 @@ class QSTS(abstact_solver):
         self._dssSolution.Hour(Hour)
         self._dssSolution.Seconds(Min*60)
         self._dssSolution.Number(mTimeStep)
-        self._dssSolution.Solve()
+        self._SolveCircuit()
         return
 
+    def SkipStep(self):
+        """Advance the time by one step without solving the circuit. The next
+        call to IncStep solves for the time of all skipped steps."""
+        self._SkippedSteps += 1
+        self._Time = self._Time + timedelta(seconds=self._sStepRes)
+
     def IncStep(self):
         #self.__sStepRes = 1/240
-        self._dssSolution.StepSize(self._sStepRes)
-        self._dssSolution.Solve()
+        self._dssSolution.StepSize(self._sStepRes * (self._SkippedSteps + 1))
+        self._SolveCircuit()
+        self._SkippedSteps = 0
         self._Time = self._Time + timedelta(seconds=self._sStepRes)
+        hour = self._dssSolution.DblHour()
+        self._Hour = int(hour // 1)
+        self._Second = (hour % 1) * 60 * 60
+        self.pyLogger.debug('OpenDSS time [h] - %s', hour)
+        self.pyLogger.debug('PyDSS datetime - %s', self._Time)
+
+    def GoToStep(self, step):
+        """Set the time to a step of the simulation and solve the circuit.
+        This is used to resume a simulation from a checkpoint."""
+        StartDay = self.Settings['Project']['Start Day']
+        StartTimeMin = self.Settings['Project']['Start Time (min)']
+        self._SkippedSteps = 0
+        self._Time = self._StartTime + timedelta(seconds=step * self._sStepRes)
+        self._dssSolution.Hour((StartDay - 1) * 24)
+        self._dssSolution.Seconds(StartTimeMin * 60 + step * self._sStepRes)
+        self.Solve()
+        self._dssSolution.StepSize(self._sStepRes)
         self._Hour = int(self._dssSolution.DblHour() // 1)
         self._Second = (self._dssSolution.DblHour() % 1) * 60 * 60
-        self.pyLogger.info('OpenDSS time [h] - ' + str(self._dssSolution.DblHour()))
-        self.pyLogger.info('PyDSS datetime - ' + str(self._Time))
 
     def GetTotalSeconds(self):
         return (self._Time - self._StartTime).total_seconds()
@@ -88,11 +111,11 @@ class QSTS(abstact_solver):
 
     def reSolve(self):
         self._dssSolution.StepSize(0)
-        self._dssSolution.SolveNoControl()
+        self._SolveCircuitNoControl()
 
     def Solve(self):
         self._dssSolution.StepSize(0)
-        self._dssSolution.Solve()
+        self._SolveCircuit()
 
     def getMode(self):
         return self._dssSolution.ModeID()
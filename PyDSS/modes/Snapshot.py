@@ -40,13 +40,13 @@ class Snapshot(abstact_solver):
         return self._sStepRes
 
     def reSolve(self):
-        return self._dssSolution.SolveNoControl()
+        return self._SolveCircuitNoControl()
 
     def Solve(self):
-        self._dssSolution.Solve()
+        self._SolveCircuit()
 
     def IncStep(self):
-        return self._dssSolution.Solve()
+        return self._SolveCircuit()
 
     def setFrequency(self, frequency):
         self._dssSolution.Frequency(frequency)
@@ -1,6 +1,9 @@
 from datetime import datetime, timedelta
 import abc
 
+from PyDSS.dssObjectBase import invalidate_solution
+
+
 class abstact_solver(abc.ABC):
     def __init__(self, dssInstance, SimulationSettings, Logger):
         self.Settings = SimulationSettings
@@ -18,6 +21,27 @@ class abstact_solver(abc.ABC):
         mode = SimulationSettings['Project']['Simulation Type'].lower()
         self._sStepRes = stepres if mode != 'snapshot' else 1
 
+    def reset(self):
+        """Return the solver to the start time of the simulation."""
+        self.__init__(self._dssIntance, self.Settings, self.pyLogger)
+
+    def GetOpenDSSTime(self):
+        """Return the time of the OpenDSS solution in hours."""
+        return self._dssSolution.DblHour()
+
+    def _SolveCircuit(self):
+        """Solve the circuit and forget values read before the solution."""
+        result = self._dssSolution.Solve()
+        invalidate_solution(self._dssIntance)
+        return result
+
+    def _SolveCircuitNoControl(self):
+        """Solve the circuit without OpenDSS controls and forget values read
+        before the solution."""
+        result = self._dssSolution.SolveNoControl()
+        invalidate_solution(self._dssIntance)
+        return result
+
     @abc.abstractmethod
     def setFrequency(self, frequency):
         return
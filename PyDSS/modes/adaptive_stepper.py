@@ -0,0 +1,186 @@
+"""Contains AdaptiveStepper"""
+
+import logging
+import math
+
+import numpy as np
+
+from PyDSS.dssObjectBase import invalidate_active_objects
+
+
+logger = logging.getLogger(__name__)
+
+
+class AdaptiveStepper:
+    """Decides whether a QSTS simulation must solve the next time step or can
+    skip it.
+
+    A step is skipped when the controllers did not act at the current step,
+    no load shape multiplier changes by more than the profile tolerance
+    between the last solved step and the next step, and fewer than the
+    maximum number of steps have been skipped in a row. The solve that
+    follows skipped steps covers their time, so OpenDSS integrates energy
+    and storage state over the whole interval.
+
+    Regulator tap changes and capacitor switching are events. After an event
+    the next steps are solved at full resolution.
+
+    The yearly, daily and duty load shapes of loads, PV systems, storage and
+    generators are tracked. Temperature shapes are not tracked.
+
+    """
+
+    _SHAPE_CLASSES = ("Load", "PVSystem", "Storage", "Generator")
+    _SHAPE_PROPERTIES = ("yearly", "daily", "duty")
+
+    def __init__(self, dssInstance, dssSolver, profileTolerance, maxSkippedSteps, eventHoldSteps):
+        self._dss = dssInstance
+        self._solver = dssSolver
+        self._profile_tolerance = profileTolerance
+        self._max_skipped_steps = maxSkippedSteps
+        self._event_hold_steps = eventHoldSteps
+        self._step_hours = dssSolver.GetStepResolutionSeconds() / 3600
+        self._fixed_shapes = {}  # (interval in hours, number of points) to 2D array of multipliers
+        self._variable_shapes = []  # (hours, multipliers)
+        self._read_load_shapes()
+        self._solved_hour = dssSolver.GetOpenDSSTime()
+        self._event_state = self._read_event_state()
+        self._hold = 0
+        self._num_skipped = 0
+        self._total_skipped = 0
+
+    @property
+    def total_skipped_steps(self):
+        """Return the number of steps that were not solved."""
+        return self._total_skipped
+
+    def _get_used_shape_names(self):
+        names = set()
+        for dss_class in self._SHAPE_CLASSES:
+            self._dss.Circuit.SetActiveClass(dss_class)
+            flag = self._dss.ActiveClass.First()
+            while flag > 0:
+                for prop in self._SHAPE_PROPERTIES:
+                    names.add(self._dss.Properties.Value(prop).lower())
+                flag = self._dss.ActiveClass.Next()
+        invalidate_active_objects(self._dss)
+        names.discard("")
+        return names
+
+    def _read_load_shapes(self):
+        used = self._get_used_shape_names()
+        shapes = self._dss.LoadShape
+        fixed = {}
+        flag = shapes.First()
+        while flag > 0:
+            if shapes.Name().lower() not in used:
+                flag = shapes.Next()
+                continue
+            npts = shapes.Npts()
+            multipliers = [x for x in (shapes.PMult(), shapes.QMult()) if len(x) == npts]
+            interval = shapes.HrInterval()
+            if npts > 0 and multipliers:
+                if interval > 0:
+                    fixed.setdefault((interval, npts), []).extend(multipliers)
+                else:
+                    hours = np.array(shapes.TimeArray(), dtype=np.float64)
+                    for values in multipliers:
+                        self._variable_shapes.append((hours, np.array(values, dtype=np.float64)))
+            flag = shapes.Next()
+
+        for key, multipliers in fixed.items():
+            self._fixed_shapes[key] = np.array(multipliers, dtype=np.float64).T
+        logger.debug("Tracking %s load shape multiplier arrays",
+                     sum(x.shape[1] for x in self._fixed_shapes.values()) + len(self._variable_shapes))
+
+    def _read_event_state(self):
+        taps = []
+        regcontrols = self._dss.RegControls
+        flag = regcontrols.First()
+        while flag > 0:
+            taps.append(regcontrols.TapNumber())
+            flag = regcontrols.Next()
+
+        states = []
+        capacitors = self._dss.Capacitors
+        flag = capacitors.First()
+        while flag > 0:
+            states.append(tuple(capacitors.States()))
+            flag = capacitors.Next()
+        invalidate_active_objects(self._dss)
+        return taps, states
+
+    def get_profile_change(self, startHour, endHour):
+        """Return the largest change of any load shape multiplier between two
+        times. Points adjacent to the interval are included, so the result
+        does not depend on how OpenDSS rounds or interpolates.
+
+        Parameters
+        ----------
+        startHour : float
+        endHour : float
+
+        Returns
+        -------
+        float
+
+        """
+        change = 0.0
+        for (interval, npts), multipliers in self._fixed_shapes.items():
+            first = math.floor(startHour / interval) - 1
+            last = math.ceil(endHour / interval) + 1
+            if last - first + 1 >= npts:
+                window = multipliers
+            else:
+                window = multipliers[np.arange(first, last + 1) % npts]
+            change = max(change, float(np.max(window.max(axis=0) - window.min(axis=0))))
+
+        for hours, values in self._variable_shapes:
+            period = hours[-1] if hours[-1] > 0 else 1.0
+            first = max(np.searchsorted(hours, startHour % period) - 1, 0)
+            last = np.searchsorted(hours, endHour % period) + 1
+            if endHour - startHour >= period or last <= first:
+                window = values
+            else:
+                window = values[first:last + 1]
+            change = max(change, float(window.max() - window.min()))
+        return change
+
+    def advance(self, controllersQuiet):
+        """Skip or solve the next time step.
+
+        Parameters
+        ----------
+        controllersQuiet : bool
+            True if no controller acted at the current time step
+
+        Returns
+        -------
+        bool
+            True if the next step was skipped
+
+        """
+        if self._can_skip(controllersQuiet):
+            self._solver.SkipStep()
+            self._num_skipped += 1
+            self._total_skipped += 1
+            return True
+
+        self._solver.IncStep()
+        self._num_skipped = 0
+        self._solved_hour = self._solver.GetOpenDSSTime()
+        event_state = self._read_event_state()
+        if event_state != self._event_state:
+            logger.debug("Tap change or capacitor switching at %s h", self._solved_hour)
+            self._event_state = event_state
+            self._hold = self._event_hold_steps
+        return False
+
+    def _can_skip(self, controllersQuiet):
+        if self._hold > 0:
+            self._hold -= 1
+            return False
+        if not controllersQuiet or self._num_skipped >= self._max_skipped_steps:
+            return False
+        next_hour = self._solved_hour + (self._num_skipped + 1) * self._step_hours
+        return self.get_profile_change(self._solved_hour, next_hour) <= self._profile_tolerance
@@ -0,0 +1,91 @@
+"""Contains LazyObjectRegistry and LazyObjectRegistryView"""
+
+import collections.abc
+
+
+class LazyObjectRegistry(collections.abc.MutableMapping):
+    """Maps names to PyDSS objects, which are created on first access.
+
+    Only names are recorded up front. Iterating over the keys or checking
+    membership does not create objects. items() and values() create every
+    object.
+
+    """
+
+    def __init__(self, factory, names=()):
+        self._factory = factory
+        self._objects = dict.fromkeys(names)  # name -> object, None until created
+
+    def __getitem__(self, name):
+        obj = self._objects[name]
+        if obj is None:
+            obj = self._factory(name)
+            self._objects[name] = obj
+        return obj
+
+    def __setitem__(self, name, obj):
+        self._objects[name] = obj
+
+    def __delitem__(self, name):
+        del self._objects[name]
+
+    def __contains__(self, name):
+        return name in self._objects
+
+    def __iter__(self):
+        return iter(self._objects)
+
+    def __len__(self):
+        return len(self._objects)
+
+    @property
+    def num_created(self):
+        """Return the number of objects that have been created."""
+        return sum(1 for x in self._objects.values() if x is not None)
+
+    def view(self, names):
+        """Return a view of a subset of names, such as those of one class.
+
+        Parameters
+        ----------
+        names : iterable
+
+        Returns
+        -------
+        LazyObjectRegistryView
+
+        """
+        return LazyObjectRegistryView(self, names)
+
+
+class LazyObjectRegistryView(collections.abc.MutableMapping):
+    """A subset of the names in a LazyObjectRegistry. Objects are shared with
+    the registry. Objects added to the view are also added to the registry.
+
+    """
+
+    def __init__(self, registry, names=()):
+        self._registry = registry
+        self._names = dict.fromkeys(names)
+
+    def __getitem__(self, name):
+        if name not in self._names:
+            raise KeyError(name)
+        return self._registry[name]
+
+    def __setitem__(self, name, obj):
+        self._names[name] = None
+        self._registry[name] = obj
+
+    def __delitem__(self, name):
+        del self._names[name]
+        del self._registry[name]
+
+    def __contains__(self, name):
+        return name in self._names
+
+    def __iter__(self):
+        return iter(self._names)
+
+    def __len__(self):
+        return len(self._names)
@@ -0,0 +1,166 @@
+"""Contains ControllerActiveSet"""
+
+import logging
+
+import numpy as np
+
+from PyDSS.dssObjectBase import invalidate_active_objects
+
+
+logger = logging.getLogger(__name__)
+
+
+class ControllerActiveSet:
+    """Selects the controllers to update in each iteration of a control loop
+    and records per-iteration statistics.
+
+    When enabled, the first iteration of a loop updates every controller.
+    Later iterations only update controllers whose last error exceeded the
+    error tolerance, plus converged controllers whose local node voltages
+    moved by more than the voltage tolerance since their last update.
+    Controllers that do not control a circuit element, such as PV controller
+    fleets, are updated in every iteration.
+
+    When disabled, every iteration updates every controller.
+
+    """
+
+    def __init__(self, controllers, dssInstance, errorTolerance, voltageTolerance, enabled=True):
+        self._controllers = controllers
+        self._dss = dssInstance
+        self._error_tolerance = errorTolerance
+        self._voltage_tolerance = voltageTolerance
+        self._enabled = enabled
+        self._errors = {}
+        self._voltages = {}  # controller name to node voltages at its last update
+        self._node_indexes = {}
+        self._statistics = []
+        if enabled and controllers:
+            self._create_node_indexes()
+
+    def _create_node_indexes(self):
+        """Find the positions of the nodes of each controlled element in
+        AllBusMagPu."""
+        circuit = self._dss.Circuit
+        node_positions = {x.lower(): i for i, x in enumerate(circuit.AllNodeNames())}
+        for name in self._controllers:
+            element_name = name.split('.', 1)[1]
+            circuit.SetActiveElement(element_name)
+            if self._dss.CktElement.Name().lower() != element_name.lower():
+                continue
+            bus_names = {x.split('.')[0] for x in self._dss.CktElement.BusNames()}
+            index = []
+            for bus_name in sorted(bus_names):
+                circuit.SetActiveBus(bus_name)
+                index += [
+                    node_positions[f"{bus_name}.{x}".lower()] for x in self._dss.Bus.Nodes()
+                    if f"{bus_name}.{x}".lower() in node_positions
+                ]
+            if index:
+                self._node_indexes[name] = np.array(index, dtype=np.int64)
+        invalidate_active_objects(self._dss)
+        logger.debug("Tracking the voltages of %s of %s controllers",
+                     len(self._node_indexes), len(self._controllers))
+
+    @property
+    def enabled(self):
+        """Return True if converged controllers are skipped."""
+        return self._enabled
+
+    @property
+    def statistics(self):
+        """Return the statistics of the iterations since the last call to
+        clear_statistics.
+
+        Returns
+        -------
+        list
+            list of dict with keys Priority, Iteration, Active controllers,
+            Total controllers and Max error
+
+        """
+        return self._statistics
+
+    def clear_statistics(self):
+        """Discard the recorded statistics. Call at the start of a time step."""
+        self._statistics = []
+
+    def get_active_controllers(self, Iteration):
+        """Return the controllers to update in this iteration.
+
+        Parameters
+        ----------
+        Iteration : int
+            Iteration of the control loop. Iteration 0 starts a new loop.
+
+        Returns
+        -------
+        list
+            list of (name, controller) tuples
+
+        """
+        if Iteration == 0:
+            self._errors.clear()
+        if not self._enabled:
+            return list(self._controllers.items())
+
+        voltages = None
+        if self._node_indexes:
+            voltages = np.array(self._dss.Circuit.AllBusMagPu(), dtype=np.float64)
+
+        if Iteration == 0:
+            active = list(self._controllers.items())
+        else:
+            active = [x for x in self._controllers.items() if self._is_active(x[0], voltages)]
+
+        for name, _ in active:
+            index = self._node_indexes.get(name)
+            if index is not None:
+                self._voltages[name] = voltages[index]
+        return active
+
+    def _is_active(self, name, voltages):
+        if not self.has_converged(self._errors.get(name, np.inf)):
+            return True
+        index = self._node_indexes.get(name)
+        if index is None:
+            return True
+        return bool(np.max(np.abs(voltages[index] - self._voltages[name])) > self._voltage_tolerance)
+
+    def has_converged(self, error):
+        """Return True if an error is within the error tolerance. The control
+        loop and the selection of active controllers must use the same test.
+
+        Parameters
+        ----------
+        error : float
+
+        Returns
+        -------
+        bool
+
+        """
+        return error < self._error_tolerance
+
+    def set_error(self, name, error):
+        """Record the error returned by a controller's update."""
+        self._errors[name] = error
+
+    def record_iteration(self, Priority, Iteration, NumActive):
+        """Record the statistics of one iteration and return the maximum error
+        of all controllers, including those that were skipped.
+
+        Returns
+        -------
+        float
+
+        """
+        maxError = max(self._errors.values(), default=0)
+        self._statistics.append({
+            "Priority": Priority,
+            "Iteration": Iteration,
+            "Active controllers": NumActive,
+            "Total controllers": len(self._controllers),
+            "Max error": maxError,
+        })
+        return maxError
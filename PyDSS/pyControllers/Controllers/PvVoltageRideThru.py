@@ -3,9 +3,14 @@ from shapely.geometry import MultiPoint, Polygon, Point, MultiPolygon
 from shapely.ops import triangulate, cascaded_union
 from descartes.patch import PolygonPatch
 import datetime
+import logging
 import math
 import os
 
+
+logger = logging.getLogger(__name__)
+
+
 class PvVoltageRideThru(ControllerAbstract):
     """Implementation of IEEE1547-2003 and IEEE1547-2018 voltage ride-through standards using the OpenDSS Generator model. Subclass of the :class:`PyDSS.pyControllers.pyControllerAbstract.ControllerAbstract` abstract class.
 
@@ -378,7 +383,7 @@ class PvVoltageRideThru(ControllerAbstract):
         # Calculate the active power limit (dependent on the chosen priority)
         if self.__priority == 'Var':
             Pscaler = (1 - QpvNew ** 2) ** 0.5
-            print(QpvNew, self.__Srated * Qcalc, Qcalc)
+            logger.debug('%s: QpvNew=%s Q=%s Qcalc=%s', self.__Name, QpvNew, self.__Srated * Qcalc, Qcalc)
             P = self.__Srated * Pscaler
             Q = self.__Srated * QpvNew
             pfCalc = math.cos(math.atan(QpvNew / Pscaler))
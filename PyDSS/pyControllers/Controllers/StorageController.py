@@ -1,8 +1,13 @@
 from  PyDSS.pyControllers.pyControllerAbstract import ControllerAbstract
 import calendar
+import logging
 import math
 import ast
 
+
+logger = logging.getLogger(__name__)
+
+
 class StorageController(ControllerAbstract):
     """Numerous control implementation for a storage system from both behind-the-meter and front-of- meter applications. Subclass of the :class:`PyDSS.pyControllers.pyControllerAbstract.ControllerAbstract` abstract class.
 
@@ -176,7 +181,7 @@ class StorageController(ControllerAbstract):
             self.Demand = sum(self.__EnergyCounter) / (60 / self.__dssSolver.GetStepResolutionMinutes())
 
             if self.Demand >= 0.9 * DemandChgThreh:
-                print('Mitigating demand charge: ', self.Demand)
+                logger.debug('%s: mitigating demand charge: %s', self.__Name, self.Demand)
                 if Pin > Pub:
                     dP = Pin - Pub
                     Pbatt = Pbatt + (dP) * self.__a - (Pbatt - self.PbattOld) * self.__b
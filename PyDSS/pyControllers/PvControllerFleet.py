@@ -0,0 +1,412 @@
+"""Contains PvControllerFleet"""
+
+import logging
+
+import numpy as np
+
+from PyDSS.NetworkModifier import ParameterBatch
+from PyDSS.dssObjectBase import invalidate_active_objects
+from PyDSS.pyControllers.pyControllerAbstract import ControllerAbstract
+
+
+logger = logging.getLogger(__name__)
+
+CONTROL_KEYS = ("Control1", "Control2", "Control3")
+
+
+def create_pv_controller_fleets(ElementsDict, ElmObjectList, dssInstance, dssSolver, tolerance):
+    """Create one PvControllerFleet for each combination of control modes.
+
+    Parameters
+    ----------
+    ElementsDict : dict
+        Maps PVSystem name to PvController settings
+    ElmObjectList : dict
+        Dictionary of all dssElement, dssBus and dssCircuit objects
+    dssInstance : opendssdirect
+    dssSolver : SolveMode
+    tolerance : float
+        Setpoints that change by less than this value are not written.
+
+    Returns
+    -------
+    list
+        list of PvControllerFleet
+
+    """
+    groups = {}
+    for ElmName, Settings in ElementsDict.items():
+        assert ElmName in ElmObjectList, \
+            "'{}' does not exist in the PyDSS master object dictionary.".format(ElmName)
+        controls = tuple(Settings[x] for x in CONTROL_KEYS)
+        groups.setdefault(controls, {})[ElmName] = Settings
+
+    return [
+        PvControllerFleet(
+            {x: ElmObjectList[x] for x in settings}, settings, dssInstance, dssSolver, tolerance
+        )
+        for settings in groups.values()
+    ]
+
+
+class PvControllerFleet(ControllerAbstract):
+    """Evaluates the smart inverter controls of many PVSystem elements with
+    array operations. Produces the same setpoints as one
+    :class:`PyDSS.pyControllers.Controllers.PvController.PvController` per
+    element.
+
+    All elements must use the same control mode for each priority. Other
+    settings can differ by element. Powers and pf values are read by iterating
+    over the OpenDSS PVSystem class and bus voltages from the circuit node
+    array. Only setpoints that changed by more than the tolerance are written.
+
+    :param PvObjects: Maps element name to a wrapped OpenDSS 'PVSystem' element
+    :type PvObjects: dict
+    :param Settings: Maps element name to PvController settings
+    :type Settings: dict
+    :param dssInstance: An :class:`opendssdirect` instance
+    :type dssInstance: :class:`opendssdirect`
+    :param dssSolver: An instance of one of the classed defined in :mod:`PyDSS.SolveMode`.
+    :type dssSolver: :mod:`PyDSS.SolveMode`
+    :param tolerance: Setpoints that change by less than this value are not written.
+    :type tolerance: float
+
+    """
+
+    _VPF_ITERATIONS = 10
+    _VPF_TOLERANCE = 1E-4
+
+    def __init__(self, PvObjects, Settings, dssInstance, dssSolver, tolerance):
+        super().__init__()
+        self._names = list(PvObjects)
+        self._settings = [Settings[x] for x in self._names]
+        controls = tuple(self._settings[0][x] for x in CONTROL_KEYS)
+        assert all(tuple(x[y] for y in CONTROL_KEYS) == controls for x in self._settings), \
+            "all elements of a PvControllerFleet must use the same control modes"
+        self._dssInstance = dssInstance
+        self._dssSolver = dssSolver
+        self._tolerance = tolerance
+        self._arrays = {}
+        self.Time = (-1, 0)
+        self.TimeChange = False
+
+        controlDict = {
+            'None': self._NoControl,
+            'CPF': self._CPFcontrol,
+            'VPF': self._VPFcontrol,
+            'VVar': self._VVARcontrol,
+            'VW': self._VWcontrol,
+            'Cutoff': self._CutoffControl,
+        }
+        self._controls = controls
+        self.update = [controlDict[x] for x in controls]
+        self._Name = 'pyContFleet_PVSystem_' + '_'.join(controls)
+
+        for ElmName, PvObj in PvObjects.items():
+            Class, _ = PvObj.GetInfo()
+            assert Class.lower() == 'pvsystem', 'PvControllerFleet works only with OpenDSS PVSystem elements'
+
+        count = len(self._names)
+        self._Srated = np.array([float(x.GetParameter('kVA')) for x in PvObjects.values()])
+        self._Prated = np.array([float(x.GetParameter('Pmpp')) for x in PvObjects.values()])
+        Qrated = np.array([float(x.GetParameter('kVARlimit')) for x in PvObjects.values()])
+        self._cutin = self._Setting('%PCutin') / 100
+        self._cutout = self._Setting('%PCutout') / 100
+        self._dampCoef = self._Setting('DampCoef')
+        self.QlimPU = np.minimum(np.minimum(Qrated / self._Srated, self._Setting('QlimPU')), 1.0)
+
+        self.Pmppt = np.full(count, 100.0)
+        self.pf = np.ones(count)
+        self.oldPcalc = np.zeros(count)
+        self.oldQcalc = np.zeros(count)
+        self._vDisconnected = np.zeros(count, dtype=bool)
+        self._pDisconnected = np.zeros(count, dtype=bool)
+
+        self._batch = ParameterBatch(dssInstance)
+        self._written = {}  # parameter name to array of the last values written
+        for name, settings in zip(self._names, self._settings):
+            self._batch.add(name, '%cutin', settings['%PCutin'])
+            self._batch.add(name, '%cutout', settings['%PCutout'])
+        self._batch.apply()
+
+        self._positions = {x.lower(): i for i, x in enumerate(self._names)}
+        self._CreateVoltageIndex()
+        logger.info("Created %s for %s PVSystems", self._Name, count)
+
+    def Name(self):
+        return self._Name
+
+    def ControlledElement(self):
+        return self._names
+
+    def debugInfo(self):
+        return list(self._controls)
+
+    def _Setting(self, name):
+        """Return a float array of one setting for all elements."""
+        array = self._arrays.get(name)
+        if array is None:
+            array = np.array([float(x[name]) for x in self._settings])
+            self._arrays[name] = array
+        return array
+
+    def _CreateVoltageIndex(self):
+        """Find the positions of each element's bus nodes in AllBusMagPu."""
+        circuit = self._dssInstance.Circuit
+        node_positions = {x.lower(): i for i, x in enumerate(circuit.AllNodeNames())}
+        bus_names = [None] * len(self._names)
+        self._ForEachPvSystem(
+            lambda i: bus_names.__setitem__(i, self._dssInstance.CktElement.BusNames()[0].split('.')[0])
+        )
+
+        index = []
+        offsets = []
+        for bus_name in bus_names:
+            circuit.SetActiveBus(bus_name)
+            offsets.append(len(index))
+            index += [node_positions[f"{bus_name}.{x}".lower()] for x in self._dssInstance.Bus.Nodes()]
+        invalidate_active_objects(self._dssInstance)
+        self._node_index = np.array(index, dtype=np.int64)
+        self._node_offsets = np.array(offsets, dtype=np.int64)
+
+    def _ForEachPvSystem(self, func):
+        """Call func with the fleet position of each PVSystem in the fleet
+        while it is the active element."""
+        pvsystems = self._dssInstance.PVsystems
+        flag = pvsystems.First()
+        while flag > 0:
+            i = self._positions.get("pvsystem." + pvsystems.Name().lower())
+            if i is not None:
+                func(i)
+            flag = pvsystems.Next()
+        invalidate_active_objects(self._dssInstance)
+
+    def _ReadPowers(self):
+        """Return the total active and reactive power of each element."""
+        P = np.zeros(len(self._names))
+        Q = np.zeros(len(self._names))
+
+        def read(i):
+            powers = self._dssInstance.CktElement.Powers()
+            P[i] = sum(powers[::2])
+            Q[i] = sum(powers[1::2])
+
+        self._ForEachPvSystem(read)
+        return P, Q
+
+    def _ReadProperty(self, func):
+        values = np.zeros(len(self._names))
+        self._ForEachPvSystem(lambda i: values.__setitem__(i, func()))
+        return values
+
+    def _ReadVoltages(self):
+        """Return the maximum per-unit node voltage at the bus of each element."""
+        magpu = np.array(self._dssInstance.Circuit.AllBusMagPu(), dtype=np.float64)
+        return np.maximum.reduceat(magpu[self._node_index], self._node_offsets)
+
+    def _Write(self, Param, mask, values, force=False):
+        """Queue setpoints of the elements in mask that changed by more than
+        the tolerance since they were last written."""
+        values = np.broadcast_to(values, mask.shape)
+        written = self._written.get(Param)
+        if written is None:
+            written = np.full(len(self._names), np.nan)
+            self._written[Param] = written
+        if not force:
+            mask = mask & ~(np.abs(values - written) <= self._tolerance)
+        for i in np.flatnonzero(mask):
+            self._batch.add(self._names[i], Param, values[i])
+        written[mask] = values[mask]
+
+    def _ApplyWrites(self):
+        if len(self._batch):
+            self._batch.apply()
+
+    def Update(self, Priority, Time, Update):
+        self.TimeChange = self.Time != (Priority, Time)
+        self.Time = (Priority, Time)
+        P, Q = self._ReadPowers()
+        Ppv = -P / self._Prated
+
+        reconnected = self._pDisconnected & (Ppv >= self._cutin)
+        disconnected = ~self._pDisconnected & (Ppv < self._cutout)
+        self._pDisconnected = (self._pDisconnected & ~reconnected) | disconnected
+        self._Write('pf', disconnected, 1.0)
+        active = ~self._pDisconnected
+
+        errors = self.update[Priority](active, P, Q)
+        self._ApplyWrites()
+        return float(np.max(errors, initial=0))
+
+    def _NoControl(self, active, P, Q):
+        return np.zeros(len(self._names))
+
+    def _VWcontrol(self, active, P, Q):
+        """Volt / Watt  control implementation
+        """
+        uMinC = self._Setting('uMinC')
+        uMaxC = self._Setting('uMaxC')
+        Pmin = self._Setting('PminVW') / 100
+
+        uIn = self._ReadVoltages()
+        Ppv = -P / self._Srated
+        Qpv = -Q / self._Srated
+
+        availablePower = np.array([x['VWtype'] == 'Available Power' for x in self._settings])
+        Plim = np.where(availablePower, np.sqrt(np.clip(1 - Qpv ** 2, 0, None)), 1.0)
+        m = (1 - Pmin) / (uMinC - uMaxC)
+        c = ((Pmin * uMinC) - uMaxC) / (uMinC - uMaxC)
+        Pcalc = np.where(
+            uIn < uMinC,
+            Plim,
+            np.where((uIn < uMaxC) & (uIn > uMinC), np.minimum(m * uIn + c, Plim), Pmin),
+        )
+
+        adjust = active & ((Ppv > Pcalc) | ((Ppv > 0) & (self.Pmppt < 100)))
+        # adding heavy ball term to improve convergence
+        dP = (Ppv - Pcalc) * 0.5 / self._dampCoef + (self.oldPcalc - Ppv) * 0.1 / self._dampCoef
+        Pcalc = Ppv - dP
+        with np.errstate(divide='ignore', invalid='ignore'):
+            Pmppt = np.minimum(self.Pmppt * Pcalc / Ppv, 100)
+            pf = np.cos(np.arctan(Qpv / Pcalc))
+        pf = np.where(Qpv < 0, -pf, pf)
+        self.Pmppt = np.where(adjust, Pmppt, self.Pmppt)
+        self.pf = np.where(adjust, pf, self.pf)
+        self._Write('pctPmpp', adjust, self.Pmppt)
+        self._Write('pf', adjust, self.pf)
+
+        self.oldPcalc = np.where(active, Ppv, self.oldPcalc)
+        return np.where(adjust, np.abs(dP), 0)
+
+    def _CutoffControl(self, active, P, Q):
+        """Over voltage trip implementation
+        """
+        uIn = self._ReadVoltages()
+        uCut = self._Setting('%UCutoff')
+        errors = np.zeros(len(self._names))
+
+        tripped = active & (uIn >= uCut)
+        self._Write('pctPmpp', tripped, 0.0)
+        self._Write('pf', tripped, 1.0)
+        errors[tripped & ~self._vDisconnected] = self._Prated[tripped & ~self._vDisconnected]
+        self._vDisconnected |= tripped
+
+        if self.TimeChange:
+            reconnected = active & self._vDisconnected & (uIn < uCut)
+            self._Write('pctPmpp', reconnected, self.Pmppt)
+            self._Write('pf', reconnected, self.pf)
+            self._vDisconnected &= ~reconnected
+            errors[reconnected] = self._Prated[reconnected]
+
+        return errors
+
+    def _CPFcontrol(self, active, P, Q):
+        """Constant power factor implementation
+        """
+        PFset = self._Setting('pf')
+        PFact = self._ReadProperty(self._dssInstance.PVsystems.pf)
+
+        priority = np.array([x['cpf-priority'] for x in self._settings])
+        pfPriority = active & (priority == 'PF')
+        self._Write('pctPmpp', pfPriority, PFset * 100)
+        other = active & ~pfPriority
+        if self.TimeChange:
+            self.Pmppt = np.where(other, 100.0, self.Pmppt)
+        else:
+            Plim = np.where(priority == 'Var', 0.0, 1.0)
+            self.Pmppt = np.where(other, Plim * self._Srated, self.Pmppt)
+
+        self._Write('pf', active, -PFset)
+        return np.where(active, np.abs(PFset + PFact), 0)
+
+    def _VPFcontrol(self, active, P, Q):
+        """Variable power factor control implementation
+        """
+        Pmin = self._Setting('Pmin')
+        Pmax = self._Setting('Pmax')
+        PFmin = self._Setting('pfMin')
+        PFmax = self._Setting('pfMax')
+        self._ApplyWrites()
+        self._dssSolver.reSolve()
+        P, _ = self._ReadPowers()
+        Pcalc = np.abs(P) / self._Srated
+        with np.errstate(divide='ignore', invalid='ignore'):
+            m = (PFmax - PFmin) / (Pmin - Pmax)
+            c = (PFmin * Pmin - PFmax * Pmax) / (Pmin - Pmax)
+        PF = np.select([Pcalc <= 0, Pcalc < Pmin, Pcalc > Pmax], [PFmax, PFmax, PFmin], Pcalc * m + c)
+
+        self._Write('irradiance', active, 1.0, force=True)
+        self._Write('pf', active, -PF, force=True)
+        self._ApplyWrites()
+        self._dssSolver.reSolve()
+
+        for _ in range(self._VPF_ITERATIONS):
+            Error = PF + self._ReadProperty(self._dssInstance.PVsystems.pf)
+            pending = active & ~(np.abs(Error) < self._VPF_TOLERANCE)
+            if not pending.any():
+                break
+            Pirr = self._ReadProperty(self._dssInstance.PVsystems.Irradiance)
+            self._Write('pf', pending, -PF, force=True)
+            self._Write('irradiance', pending, Pirr * (1 + Error * 1.5), force=True)
+            self._ApplyWrites()
+            self._dssSolver.reSolve()
+
+        return np.zeros(len(self._names))
+
+    def _VVARcontrol(self, active, P, Q):
+        """Volt / var control implementation
+        """
+        uMin = self._Setting('uMin')
+        uMax = self._Setting('uMax')
+        pfLim = self._Setting('PFlim')
+        uDbMin = self._Setting('uDbMin')
+        uDbMax = self._Setting('uDbMax')
+        varPriority = np.array([x['Priority'] == 'Var' for x in self._settings])
+        enablePfLimit = np.array([bool(x['Enable PF limit']) for x in self._settings])
+
+        uIn = self._ReadVoltages()
+
+        m1 = self.QlimPU / (uMin - uDbMin)
+        m2 = self.QlimPU / (uDbMax - uMax)
+        c1 = self.QlimPU * uDbMin / (uDbMin - uMin)
+        c2 = self.QlimPU * uDbMax / (uMax - uDbMax)
+
+        Pcalc = np.abs(P) / self._Srated
+        Qpv = -Q / self._Srated
+
+        Qcalc = np.select(
+            [
+                uIn <= uMin,
+                (uIn <= uDbMin) & (uIn > uMin),
+                (uIn <= uDbMax) & (uIn > uDbMin),
+                (uIn <= uMax) & (uIn > uDbMax),
+                uIn >= uMax,
+            ],
+            [self.QlimPU, uIn * m1 + c1, 0.0, uIn * m2 + c2, -self.QlimPU],
+            0.0,
+        )
+
+        # adding heavy ball term to improve convergence
+        Qcalc = Qpv + (Qcalc - Qpv) * 0.5 / self._dampCoef + (Qpv - self.oldQcalc) * 0.1 / self._dampCoef
+        dQ = np.abs(Qcalc - Qpv)
+
+        var = active & varPriority
+        Plim = np.sqrt(np.clip(1 - Qcalc ** 2, 0, None))
+        if self.TimeChange:
+            self.Pmppt = np.where(var, 100.0, self.Pmppt)
+        else:
+            limited = var & (Pcalc > Plim)
+            self.Pmppt = np.where(limited, Plim / self._Prated * self._Srated * 100, self.Pmppt)
+            Pcalc = np.where(limited, Plim, Pcalc)
+        self._Write('pctPmpp', var, self.Pmppt)
+
+        producing = active & (Pcalc > 0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            pf = np.cos(np.arctan(Qcalc / Pcalc))
+        pf = np.where(enablePfLimit & (np.abs(pf) < pfLim), pfLim, pf)
+        pf = np.where(Qcalc < 0, -pf, pf)
+        self.pf = np.where(producing, pf, self.pf)
+        self._Write('pf', producing, self.pf)
+
+        self.oldQcalc = np.where(active, Qpv, self.oldQcalc)
+        return np.where(active, dQ, 0)
@@ -62,6 +62,16 @@ class instance(object):
             'Export Data In Memory': {'type': bool, 'Options': [True, False]},
             'Export PV Profiles': {'type': bool, 'Options': [True, False]},
             'HDF Max Chunk Bytes': {'type': int, 'Options': range(16 * 1024, 1024 * 1024 + 1)},
+            'Export Storage Layout': {'type': str, 'Options': ["PerElement", "PerClass"]},
+            'Bulk Value Capture': {'type': bool, 'Options': [True, False]},
+            'Storage Backend': {'type': str, 'Options': ["HDF5", "NumPyMemmap"]},
+            'HDF Compression': {'type': str, 'Options': ["none", "gzip", "lzf", "blosc", "zstd", "lz4"]},
+            'HDF Compression Level': {'type': int, 'Options': range(0, 23)},
+            'HDF Shuffle': {'type': bool, 'Options': [True, False]},
+            'HDF Background Writer': {'type': bool, 'Options': [True, False]},
+            'HDF Writer Queue Size': {'type': int, 'Options': range(1, 1025)},
+            'Export Float Precision': {'type': str, 'Options': ["float64", "float32"]},
+            'Export Buffer Memory MiB': {'type': int, 'Options': range(0, 1024 * 1024 + 1)},
             'Log Results': {'type': bool, 'Options': [True, False]},
             'Result Container': {'type': str, 'Options': ['ResultContainer', 'ResultData']},
         },
@@ -93,9 +103,15 @@ class instance(object):
             'Display on screen': {'type': bool, 'Options': [True, False]},
             'Clear old log file': {'type': bool, 'Options': [True, False]},
             'Pre-configured logging': {'type': bool, 'Options': [True, False]},
+            'Timing Statistics': {'type': bool, 'Options': [True, False]},
+            'Timing Trace': {'type': bool, 'Options': [True, False]},
+            'Progress Interval (%)': {'type': float},
+            'Progress Interval (sec)': {'type': float},
         },
         "MonteCarlo": {
             'Number of Monte Carlo scenarios': {'type': int},
+            'Number of Workers': {'type': int, 'Options': range(1, 1025)},
+            'Random Seed': {'type': int},
         },
         "Plots": {
             'Create dynamic plots': {'type': bool, 'Options': [True, False]},
@@ -122,6 +138,23 @@ class instance(object):
             'Control mode': {'type': str, 'Options': ["Static", "Time"]},
             'Disable PyDSS controllers': {'type': bool, 'Options': [True, False]},
             'Use Controller Registry': {'type': bool, 'Options': [True, False]},
+            'Reuse Compiled Circuit': {'type': bool, 'Options': [True, False]},
+            'Use PV Controller Fleets': {'type': bool, 'Options': [True, False]},
+            'Fleet Setpoint Tolerance': {'type': float},
+            'Active Set Control Loop': {'type': bool, 'Options': [True, False]},
+            'Voltage Change Tolerance': {'type': float},
+            'Adaptive Time Step': {'type': bool, 'Options': [True, False]},
+            'Adaptive Profile Tolerance': {'type': float},
+            'Adaptive Max Skipped Steps': {'type': int},
+            'Adaptive Event Hold Steps': {'type': int},
+            'Feeder Partitioning': {'type': bool, 'Options': [True, False]},
+            'Partition Bus': {'type': str},
+            'Number of Partitions': {'type': int},
+            'Boundary Voltage Tolerance': {'type': float},
+            'Max Boundary Iterations': {'type': int},
+            'Time Partitions': {'type': int},
+            'Time Partition Warm-up (min)': {'type': float},
+            'Checkpoint Interval': {'type': int},
         },
         "Reports": {
             'Format': {'type': str, 'Options': ["csv", "h5"]},
@@ -131,8 +164,10 @@ class instance(object):
 
     def __init__(self):
         self._estimated_space = None
+        self._dss = None
+        self._circuit_key = None
 
-    def run(self, simulation_config, project, scenario, dry_run=False):
+    def run(self, simulation_config, project, scenario, dry_run=False, resume=False):
         bokeh_server_proc = None
         if simulation_config['Plots']['Create dynamic plots']:
             bokeh_server_proc = subprocess.Popen(["bokeh", "serve"], stdout=subprocess.PIPE)
@@ -142,6 +177,7 @@ class instance(object):
                 scenario,
                 simulation_config,
                 dry_run=dry_run,
+                resume=resume,
             )
         finally:
             if simulation_config['Plots']['Create dynamic plots']:
@@ -159,15 +195,25 @@ class instance(object):
         return dss_args
 
     def create_dss_instance(self, dss_args):
-        dss = dssInstance.OpenDSS(dss_args)
-        return dss
+        if not dss_args['Project']['Reuse Compiled Circuit']:
+            self._dss = None
+            return dssInstance.OpenDSS(dss_args)
 
-    def run_scenario(self, project, scenario, simulation_config , dry_run=False):
+        key = dssInstance.OpenDSS.GetCircuitKey(dss_args)
+        if self._dss is not None and key == self._circuit_key:
+            self._dss.ReuseCircuit(dss_args)
+        else:
+            self._dss = None
+            self._dss = dssInstance.OpenDSS(dss_args)
+            self._circuit_key = key
+        return self._dss
+
+    def run_scenario(self, project, scenario, simulation_config , dry_run=False, resume=False):
         dss_args = self.update_scenario_settings(simulation_config)
         self._dump_scenario_simulation_settings(dss_args)
         
         if dry_run:
-            dss = dssInstance.OpenDSS(dss_args)
+            dss = self.create_dss_instance(dss_args)
             logger.info('Dry run scenario: %s', dss_args["Project"]["Active Scenario"])
             if dss_args["MonteCarlo"]["Number of Monte Carlo scenarios"] > 0:
                 raise InvalidConfiguration("Dry run does not support MonteCarlo simulation.")
@@ -175,10 +221,21 @@ class instance(object):
                 self._estimated_space = dss.DryRunSimulation(project, scenario)
             return None, None
         
-        dss = dssInstance.OpenDSS(dss_args)
+        if resume and (dss_args["MonteCarlo"]["Number of Monte Carlo scenarios"] > 0 or
+                       dss_args["Project"]["Feeder Partitioning"] or
+                       dss_args["Project"]["Time Partitions"] > 1):
+            raise InvalidConfiguration(
+                "Monte Carlo, Feeder Partitioning, and Time Partitions simulations cannot be resumed"
+            )
+
+        dss = self.create_dss_instance(dss_args)
         logger.info('Running scenario: %s', dss_args["Project"]["Active Scenario"])
-        if dss_args["MonteCarlo"]["Number of Monte Carlo scenarios"] > 0:
+        if resume:
+            dss.ResumeSimulation(project, scenario)
+        elif dss_args["MonteCarlo"]["Number of Monte Carlo scenarios"] > 0:
             dss.RunMCsimulation(project, scenario, samples=dss_args["MonteCarlo"]['Number of Monte Carlo scenarios'])
+        elif dss_args["Project"]["Feeder Partitioning"]:
+            dss.RunPartitionedSimulation(project, scenario)
         else:
             dss.RunSimulation(project, scenario)
         return dss_args
@@ -250,6 +307,9 @@ class instance(object):
                     raise InvalidConfiguration("Reports are only supported with Log Results")
                 if dss_args["Exports"]["Result Container"] != "ResultData":
                     raise InvalidConfiguration("Reports are only supported with ResultData container")
+        if dss_args["Exports"]["Bulk Value Capture"] and \
+                dss_args["Exports"]["Export Storage Layout"] != "PerClass":
+            raise InvalidConfiguration("Bulk Value Capture requires Export Storage Layout = PerClass")
         return
 
 if __name__ == '__main__':
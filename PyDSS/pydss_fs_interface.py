@@ -18,6 +18,8 @@ from PyDSS.utils.utils import load_data
 
 
 STORE_FILENAME = "store.h5"
+MEMMAP_STORE_DIRNAME = "store_memmap"
+SCENARIO_STORES_DIRNAME = "store_scenarios"
 SCENARIOS = "Scenarios"
 PROJECT_DIRECTORIES = ("DSSfiles", "Exports", "Logs", "Scenarios")
 
@@ -1,5 +1,6 @@
 """Contains functionality to configure PyDSS simulations."""
 
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import logging
 import os
 import shutil
@@ -8,7 +9,6 @@ import tarfile
 import tempfile
 import zipfile
 
-import h5py
 import pandas as pd
 
 import PyDSS
@@ -22,9 +22,11 @@ from PyDSS.pyDSS import instance
 from PyDSS.pydss_fs_interface import PyDssDirectoryInterface, \
     PyDssArchiveFileInterfaceBase, PyDssTarFileInterface, \
     PyDssZipFileInterface, PROJECT_DIRECTORIES, \
-    SCENARIOS, STORE_FILENAME
+    SCENARIOS, STORE_FILENAME, MEMMAP_STORE_DIRNAME, SCENARIO_STORES_DIRNAME
 from PyDSS.reports import REPORTS_DIR
 from PyDSS.registry import Registry
+from PyDSS.storage_backends import StorageBackend, find_store, get_store_path, \
+    link_hdf_stores, open_store, remove_store
 from PyDSS.utils.dss_utils import read_pv_systems_from_dss_file
 from PyDSS.utils.utils import dump_data, load_data
 
@@ -42,7 +44,10 @@ READ_CONTROLLER_FUNCTIONS = {
 class PyDssProject:
     """Represents the project options for a PyDSS simulation."""
 
-    _SKIP_ARCHIVE = (PROJECT_ZIP, PROJECT_TAR, STORE_FILENAME, REPORTS_DIR)
+    _SKIP_ARCHIVE = (
+        PROJECT_ZIP, PROJECT_TAR, STORE_FILENAME, MEMMAP_STORE_DIRNAME, SCENARIO_STORES_DIRNAME,
+        REPORTS_DIR,
+    )
 
     def __init__(self, path, name, scenarios, simulation_config, fs_intf=None,
                  simulation_file=SIMULATION_SETTINGS_FILENAME):
@@ -98,6 +103,16 @@ class PyDssProject:
             raise InvalidConfiguration("hdf_store is not defined")
         return self._hdf_store
 
+    @hdf_store.setter
+    def hdf_store(self, store):
+        self._hdf_store = store
+
+    def __getstate__(self):
+        # Open stores cannot be sent to worker processes.
+        state = self.__dict__.copy()
+        state["_hdf_store"] = None
+        return state
+
     @property
     def fs_interface(self):
         """Return the interface object used to read files.
@@ -112,12 +127,12 @@ class PyDssProject:
         return self._fs_intf
 
     def get_hdf_store_filename(self):
-        """Return the HDFStore filename.
+        """Return the path to the result store.
 
         Returns
         -------
         str
-            Path to the HDFStore.
+            Path to the HDFStore or to the store of another backend.
 
         Raises
         ------
@@ -125,11 +140,23 @@ class PyDssProject:
             Raised if no store exists.
 
         """
-        filename = os.path.join(self._project_dir, STORE_FILENAME)
-        if not os.path.exists(filename):
-            raise InvalidConfiguration(f"HDFStore does not exist")
+        return self.get_store_info()[0]
 
-        return filename
+    def get_store_info(self):
+        """Return the path and storage backend of the result store.
+
+        Returns
+        -------
+        tuple
+            (str, StorageBackend)
+
+        Raises
+        ------
+        InvalidConfiguration
+            Raised if no store exists.
+
+        """
+        return find_store(self._project_dir)
 
     def get_post_process_directory(self, scenario_name):
         """Return the post-process output directory for scenario_name.
@@ -303,33 +330,70 @@ class PyDssProject:
     def list_scenario_names(self):
         return [x.name for x in self.scenarios]
 
-    def run(self, logging_configured=True, tar_project=False, zip_project=False, dry_run=False):
-        """Run all scenarios in the project."""
+    def run(self, logging_configured=True, tar_project=False, zip_project=False, dry_run=False,
+            num_workers=1, resume=False):
+        """Run all scenarios in the project.
+
+        Parameters
+        ----------
+        num_workers : int
+            Number of processes to use to run scenarios in parallel. Dry runs
+            are always serial.
+        resume : bool
+            If True, append to the existing store and resume each scenario
+            from its last checkpoint. Completed scenarios are skipped.
+            Scenarios are run serially.
+
+        """
         if isinstance(self._fs_intf, PyDssArchiveFileInterfaceBase):
             raise InvalidConfiguration("cannot run from an archived project")
         if tar_project and zip_project:
             raise InvalidParameter("tar_project and zip_project cannot both be True")
         if self._simulation_config['Project']['DSS File'] == "":
             raise InvalidConfiguration("a valid opendss file needs to be passed")
+        if resume and dry_run:
+            raise InvalidParameter("resume and dry_run cannot both be True")
 
         inst = instance()
         self._simulation_config["Logging"]["Pre-configured logging"] = logging_configured
 
+        backend = StorageBackend(
+            self._simulation_config["Exports"].get("Storage Backend", StorageBackend.HDF5.value)
+        )
         if dry_run:
-            store_filename = os.path.join(tempfile.gettempdir(), STORE_FILENAME)
+            store_filename = get_store_path(tempfile.gettempdir(), backend)
+        elif resume:
+            # Resuming requires the chunks of existing datasets.
+            if backend != StorageBackend.HDF5:
+                raise InvalidConfiguration("resume requires the HDF5 storage backend")
+            store_filename = get_store_path(self._project_dir, backend)
         else:
-            store_filename = os.path.join(self._project_dir, STORE_FILENAME)
-
-        driver = None
-        if self._simulation_config["Exports"].get("Export Data In Memory", True):
-            driver = "core"
-        with h5py.File(store_filename, mode="w", driver=driver) as hdf_store:
-            self._hdf_store = hdf_store
-            self._hdf_store.attrs["version"] = DATA_FORMAT_VERSION
-            for scenario in self._scenarios:
-                self._simulation_config["Project"]["Active Scenario"] = scenario.name
-                inst.run(self._simulation_config, self, scenario, dry_run=dry_run)
-                self._estimated_space[scenario.name] = inst.get_estimated_space()
+            store_filename = get_store_path(self._project_dir, backend)
+            # Don't let readers find a stale store from a different backend.
+            for other in StorageBackend:
+                if other != backend:
+                    remove_store(get_store_path(self._project_dir, other))
+            remove_store(os.path.join(self._project_dir, SCENARIO_STORES_DIRNAME))
+
+        in_memory = self._simulation_config["Exports"].get("Export Data In Memory", True)
+        if self._simulation_config["Project"].get("Checkpoint Interval", 0) > 0:
+            # Checkpoints are only useful if the data is on disk.
+            in_memory = False
+        num_workers = min(num_workers, len(self._scenarios))
+        if resume and num_workers > 1:
+            logger.warning("Scenarios are run serially when resuming a simulation")
+            num_workers = 1
+        if num_workers > 1 and not dry_run:
+            self._run_scenarios_in_parallel(store_filename, backend, in_memory, num_workers)
+        else:
+            mode = "a" if resume else "w"
+            with open_store(store_filename, backend, mode=mode, in_memory=in_memory) as hdf_store:
+                self._hdf_store = hdf_store
+                self._hdf_store.attrs["version"] = DATA_FORMAT_VERSION
+                for scenario in self._scenarios:
+                    self._simulation_config["Project"]["Active Scenario"] = scenario.name
+                    inst.run(self._simulation_config, self, scenario, dry_run=dry_run, resume=resume)
+                    self._estimated_space[scenario.name] = inst.get_estimated_space()
 
         if not dry_run:
             results = None
@@ -353,8 +417,86 @@ class PyDssProject:
         elif zip_project:
             self._zip_project_files()
 
-        if dry_run and os.path.exists(store_filename):
-            os.remove(store_filename)
+        if dry_run:
+            remove_store(store_filename)
+
+    def _run_scenarios_in_parallel(self, store_filename, backend, in_memory, num_workers):
+        """Run each scenario in its own process, and so its own OpenDSS instance.
+
+        With HDF5 each process writes a separate file in SCENARIO_STORES_DIRNAME
+        and the project store links to them. Memmap stores allow concurrent
+        writers to separate datasets, so each process writes to the project
+        store.
+
+        """
+        if backend == StorageBackend.HDF5:
+            stores_dir = os.path.join(self._project_dir, SCENARIO_STORES_DIRNAME)
+            os.makedirs(stores_dir)
+            scenario_stores = {
+                x.name: os.path.join(stores_dir, x.name + ".h5") for x in self._scenarios
+            }
+        else:
+            with open_store(store_filename, backend, mode="w") as store:
+                store.attrs["version"] = DATA_FORMAT_VERSION
+            scenario_stores = {x.name: store_filename for x in self._scenarios}
+
+        logger.info("Running %s scenarios with %s processes", len(self._scenarios), num_workers)
+        with ProcessPoolExecutor(max_workers=num_workers) as executor:
+            futures = {
+                executor.submit(
+                    _run_scenario_in_process,
+                    self,
+                    scenario.name,
+                    scenario_stores[scenario.name],
+                    backend,
+                    in_memory,
+                ): scenario.name
+                for scenario in self._scenarios
+            }
+            for future in as_completed(futures):
+                name = futures[future]
+                self._estimated_space[name] = future.result()
+                logger.info("Completed scenario %s", name)
+
+        if backend == StorageBackend.HDF5:
+            link_hdf_stores(
+                store_filename,
+                [scenario_stores[x.name] for x in self._scenarios],
+                attributes={"version": DATA_FORMAT_VERSION},
+            )
+
+    def run_scenario(self, scenario_name, store_filename, backend, in_memory=False):
+        """Run one scenario and write its data to a store. This is used by
+        worker processes.
+
+        Parameters
+        ----------
+        scenario_name : str
+        store_filename : str
+        backend : StorageBackend
+        in_memory : bool
+
+        Returns
+        -------
+        int
+            estimated space of the scenario
+
+        """
+        scenario = self.get_scenario(scenario_name)
+        inst = instance()
+        # Memmap stores are shared by all workers and created by the parent.
+        mode = "w" if backend == StorageBackend.HDF5 else "a"
+        with open_store(store_filename, backend, mode=mode, in_memory=in_memory) as hdf_store:
+            self._hdf_store = hdf_store
+            if backend == StorageBackend.HDF5:
+                self._hdf_store.attrs["version"] = DATA_FORMAT_VERSION
+            self._simulation_config["Project"]["Active Scenario"] = scenario.name
+            try:
+                inst.run(self._simulation_config, self, scenario)
+            finally:
+                self._hdf_store = None
+
+        return inst.get_estimated_space()
 
     def _serialize_scenarios(self):
         self._simulation_config["Project"]["Scenarios"] = []
@@ -409,6 +551,8 @@ class PyDssProject:
             to_delete = []
             with zipfile.ZipFile(filename, "w") as zipf:
                 for root, dirs, files in os.walk("."):
+                    if root == ".":
+                        dirs[:] = [x for x in dirs if x not in self._SKIP_ARCHIVE]
                     if delete and root == ".":
                         to_delete += dirs
                     for filename in files:
@@ -505,7 +649,8 @@ class PyDssProject:
         )
 
     @classmethod
-    def run_project(cls, path, options=None, tar_project=False, zip_project=False, simulation_file=None, dry_run=False):
+    def run_project(cls, path, options=None, tar_project=False, zip_project=False, simulation_file=None, dry_run=False,
+                    num_workers=1, resume=False):
 
         """Load a PyDssProject from directory and run all scenarios.
 
@@ -521,10 +666,20 @@ class PyDssProject:
             zip project files after successful execution
         dry_run: bool
             dry run for getting estimated space.
+        num_workers : int
+            number of processes to use to run scenarios in parallel
+        resume : bool
+            resume an interrupted run from its checkpoints
         """
 
         project = cls.load_project(path, options=options, simulation_file=simulation_file)
-        return project.run(tar_project=tar_project, zip_project=zip_project, dry_run=dry_run)
+        return project.run(tar_project=tar_project, zip_project=zip_project, dry_run=dry_run,
+                           num_workers=num_workers, resume=resume)
+
+
+def _run_scenario_in_process(project, scenario_name, store_filename, backend, in_memory):
+    return project.run_scenario(scenario_name, store_filename, backend, in_memory=in_memory)
+
 
 class PyDssScenario:
     """Represents a PyDSS Scenario."""
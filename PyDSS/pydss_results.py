@@ -6,7 +6,6 @@ import logging
 import os
 import re
 
-import h5py
 import numpy as np
 import pandas as pd
 
@@ -15,10 +14,12 @@ from PyDSS.element_options import ElementOptions
 from PyDSS.exceptions import InvalidParameter
 from PyDSS.pydss_project import PyDssProject
 from PyDSS.reports import Reports, REPORTS, REPORTS_DIR
+from PyDSS.storage_backends import open_store, is_dataset, is_group
 from PyDSS.utils.dataframe_utils import read_dataframe, write_dataframe
 from PyDSS.utils.utils import dump_data, load_data
 from PyDSS.value_storage import ValueStorageBase, DatasetPropertyType, \
-    get_dataset_property_type, get_timestamp_path
+    get_class_columns, get_class_dataset_path, get_dataset_property_type, \
+    get_element_column_ranges, get_timestamp_path
 
 
 logger = logging.getLogger(__name__)
@@ -55,9 +56,8 @@ class PyDssResults:
             self._project = project
         self._fs_intf = self._project.fs_interface
         self._scenarios = []
-        filename = self._project.get_hdf_store_filename()
-        driver = "core" if in_memory else None
-        self._hdf_store = h5py.File(filename, "r", driver=driver)
+        filename, backend = self._project.get_store_info()
+        self._hdf_store = open_store(filename, backend, mode="r", in_memory=in_memory)
 
         if self._project.simulation_config["Exports"]["Log Results"]:
             for name in self._project.list_scenario_names():
@@ -156,7 +156,7 @@ class PyDssResults:
 
         Returns
         -------
-        h5py.File
+        h5py.File | MemmapStore
 
         """
         return self._hdf_store
@@ -214,12 +214,15 @@ class PyDssScenarioResults:
         self._fs_intf = fs_intf
         self._group = self._hdf_store["Exports"][name]
         self._elem_classes = [
-            x for x in self._group.keys() if isinstance(self._group[x], h5py.Group)
+            x for x in self._group.keys() if is_group(self._group[x])
         ]
         self._elems_by_class = defaultdict(dict)
         self._props_by_class = defaultdict(list)
         self._elem_props = defaultdict(list)
         self._elem_prop_nums = defaultdict(dict)
+        # (element class, property) to
+        # (dataset, {element name: column range}, column names)
+        self._class_datasets = {}
         self._indices_df = None
         self._add_frequency = frequency
         self._add_mode = mode
@@ -233,11 +236,28 @@ class PyDssScenarioResults:
     def _parse_datasets(self):
         for elem_class in self._elem_classes:
             class_group = self._group[elem_class]
-            self._elems_by_class[elem_class] = list(class_group.keys())
+            elem_groups = []
+            class_datasets = []
+            for name, item in class_group.items():
+                if is_dataset(item):
+                    if get_class_dataset_path(name) is None:
+                        class_datasets.append((name, item))
+                else:
+                    elem_groups.append(name)
+            elem_names = dict.fromkeys(elem_groups)  # Use a dict as an ordered set.
+            # Elements stored only in per-class datasets do not have groups.
+            for prop, dataset in class_datasets:
+                column_ranges = get_element_column_ranges(class_group, prop)
+                columns = get_class_columns(class_group, prop)
+                self._class_datasets[(elem_class, prop)] = (dataset, column_ranges, columns)
+                for elem_name in column_ranges:
+                    elem_names[elem_name] = None
+                    self._elem_props[elem_name].append(prop)
+            self._elems_by_class[elem_class] = list(elem_names)
             if not self._elems_by_class[elem_class]:
                 continue
-            self._props_by_class[elem_class] = set()
-            for elem_name in self._elems_by_class[elem_class]:
+            self._props_by_class[elem_class] = {x[0] for x in class_datasets}
+            for elem_name in elem_groups:
                 for prop in self._group[elem_class][elem_name]:
                     dataset = self._group[elem_class][elem_name][prop]
                     dataset_property_type = get_dataset_property_type(dataset)
@@ -362,9 +382,16 @@ class PyDssScenarioResults:
         if element_name not in self._elem_props:
             raise InvalidParameter(f"element {element_name} is not stored")
 
-        elem_group = self._group[element_class][element_name]
-        dataset = elem_group[prop]
-        df = DatasetBuffer.to_dataframe(dataset)
+        class_dataset = self._class_datasets.get((element_class, prop))
+        if class_dataset is not None and element_name in class_dataset[1]:
+            dataset, column_ranges, columns = class_dataset
+            df = DatasetBuffer.to_dataframe(
+                dataset, column_range=column_ranges[element_name], columns=columns
+            )
+        else:
+            elem_group = self._group[element_class][element_name]
+            dataset = elem_group[prop]
+            df = DatasetBuffer.to_dataframe(dataset)
 
         if kwargs:
             options = self._check_options(element_class, prop, **kwargs)
@@ -384,12 +411,16 @@ class PyDssScenarioResults:
             self._add_indices_to_dataframe(df)
 
         if real_only:
-            for column in df.columns:
-                if df[column].dtype == np.complex:
-                    df[column] = [x.real for x in df[column]]
+            self._drop_imaginary_components(df)
 
         return df
 
+    @staticmethod
+    def _drop_imaginary_components(df):
+        for column in df.columns:
+            if df[column].dtype == np.complex:
+                df[column] = [x.real for x in df[column]]
+
     @property
     def element_property_numbers(self):
         """Return all element property values stored as numbers.
@@ -429,6 +460,15 @@ class PyDssScenarioResults:
         if prop not in self.list_element_properties(element_class):
             raise InvalidParameter(f"property {prop} is not stored")
 
+        class_dataset = self._class_datasets.get((element_class, prop))
+        if class_dataset is not None:
+            # All elements are stored in one dataset; read it in one call.
+            df = DatasetBuffer.to_dataframe(class_dataset[0], columns=class_dataset[2])
+            self._add_indices_to_dataframe(df)
+            if real_only:
+                self._drop_imaginary_components(df)
+            return df
+
         master_df = None
         length = None
         for _, df in self.iterate_dataframes(element_class, prop, real_only=real_only):
@@ -0,0 +1,611 @@
+"""Storage backends for exported result data.
+
+ResultData, DatasetBuffer and PyDssResults use a subset of the h5py API:
+nested groups addressed by path, create_dataset, slice reads and writes,
+and attrs. The HDF5 backend uses h5py directly. Other backends implement
+the same subset.
+
+"""
+
+import collections.abc
+import enum
+import json
+import logging
+import os
+import shutil
+
+import h5py
+import numpy as np
+
+from PyDSS.exceptions import InvalidConfiguration, InvalidParameter
+from PyDSS.pydss_fs_interface import STORE_FILENAME, MEMMAP_STORE_DIRNAME
+from PyDSS.value_storage import CLASS_COLUMNS_SUFFIX, get_class_columns, get_class_dataset_path, \
+    get_element_column_ranges, write_class_metadata
+
+
+logger = logging.getLogger(__name__)
+
+
+class StorageBackend(enum.Enum):
+    """Supported storage backends"""
+    HDF5 = "HDF5"
+    NUMPY_MEMMAP = "NumPyMemmap"
+
+
+_STORE_NAMES = {
+    StorageBackend.HDF5: STORE_FILENAME,
+    StorageBackend.NUMPY_MEMMAP: MEMMAP_STORE_DIRNAME,
+}
+
+
+def get_store_path(directory, backend):
+    """Return the path of the result store for a backend.
+
+    Parameters
+    ----------
+    directory : str
+    backend : StorageBackend
+
+    Returns
+    -------
+    str
+
+    """
+    return os.path.join(directory, _STORE_NAMES[backend])
+
+
+def find_store(directory):
+    """Return the path and backend of the result store in directory.
+
+    Parameters
+    ----------
+    directory : str
+
+    Returns
+    -------
+    tuple
+        (path, StorageBackend)
+
+    Raises
+    ------
+    InvalidConfiguration
+        Raised if no store exists.
+
+    """
+    for backend in StorageBackend:
+        path = get_store_path(directory, backend)
+        if os.path.exists(path):
+            return path, backend
+
+    raise InvalidConfiguration(f"no result store exists in {directory}")
+
+
+def remove_store(path):
+    """Delete a store created by any backend."""
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+    elif os.path.exists(path):
+        os.remove(path)
+
+
+def open_store(path, backend, mode="r", in_memory=False):
+    """Open a result store.
+
+    Parameters
+    ----------
+    path : str
+    backend : StorageBackend
+    mode : str
+        "r", "w", or "a"
+    in_memory : bool
+        Keep all data in memory until the store is closed. Only applies to HDF5.
+
+    Returns
+    -------
+    h5py.File | MemmapStore
+        Both can be used as a context manager.
+
+    """
+    if backend == StorageBackend.HDF5:
+        driver = "core" if in_memory else None
+        return h5py.File(path, mode=mode, driver=driver)
+    if backend == StorageBackend.NUMPY_MEMMAP:
+        return MemmapStore(path, mode=mode)
+
+    raise InvalidParameter(f"unsupported storage backend {backend}")
+
+
+def link_hdf_stores(store_filename, filenames, attributes=None):
+    """Create an HDF5 store whose second-level groups are external links to
+    the groups in other HDF5 stores, such as Exports/<scenario>. Readers can
+    use the store as if the data were stored in it.
+
+    Links use paths relative to the directory of store_filename so that the
+    files can be moved together.
+
+    Parameters
+    ----------
+    store_filename : str
+    filenames : list
+        HDF5 files to link
+    attributes : dict | None
+        Attributes to set on the root group
+
+    Raises
+    ------
+    InvalidParameter
+        Raised if two files contain the same group.
+
+    """
+    with h5py.File(store_filename, "w") as store:
+        for key, val in (attributes or {}).items():
+            store.attrs[key] = val
+        link_hdf_groups(store, filenames)
+
+
+def link_hdf_groups(store, filenames):
+    """Add external links to the second-level groups of other HDF5 stores to
+    an open HDF5 store. Refer to link_hdf_stores.
+
+    Parameters
+    ----------
+    store : h5py.File
+    filenames : list
+        HDF5 files to link
+
+    Raises
+    ------
+    InvalidParameter
+        Raised if a group exists in store or in multiple files.
+
+    """
+    directory = os.path.dirname(os.path.abspath(store.filename))
+    for filename in filenames:
+        relpath = os.path.relpath(os.path.abspath(filename), directory)
+        with h5py.File(filename, "r") as src:
+            for group_name, group in src.items():
+                for name in group.keys():
+                    path = f"{group_name}/{name}"
+                    if path in store:
+                        raise InvalidParameter(f"{path} exists in multiple stores")
+                    store[path] = h5py.ExternalLink(relpath, "/" + path)
+        logger.debug("Linked %s into %s", filename, store.filename)
+
+
+def merge_hdf_stores(store, filenames):
+    """Add the datasets of HDF5 stores that contain different elements of the
+    same scenario to an open HDF5 store.
+
+    A dataset that exists in one file is added as an external link. A dataset
+    that exists in multiple files is linked from the first file if it has the
+    same columns in all files, such as timestamps. Otherwise the distinct
+    columns of all files are copied into one dataset. The columns of class
+    datasets are copied by element along with their metadata datasets.
+
+    Parameters
+    ----------
+    store : h5py.File
+    filenames : list
+        HDF5 files to merge
+
+    Raises
+    ------
+    InvalidParameter
+        Raised if a dataset exists in store.
+
+    """
+    sources = {}  # dataset path to files that contain it
+    for filename in filenames:
+        with h5py.File(filename, "r") as src:
+            src.visititems(
+                lambda name, item, filename=filename:
+                sources.setdefault(name, []).append(filename) if isinstance(item, h5py.Dataset) else None
+            )
+
+    directory = os.path.dirname(os.path.abspath(store.filename))
+    copied = set()
+    # Class datasets are handled before their metadata datasets.
+    paths = sorted(sources, key=lambda x: get_class_dataset_path(x) is not None)
+    for path in paths:
+        files = sources[path]
+        class_path = get_class_dataset_path(path)
+        if class_path in copied:
+            # Written with the class dataset.
+            continue
+        if path in store:
+            raise InvalidParameter(f"{path} exists in the store")
+        if class_path is not None:
+            copy = False
+        elif path + CLASS_COLUMNS_SUFFIX in sources:
+            copy = len(files) > 1 and _copy_distinct_elements(store, path, files)
+        else:
+            copy = len(files) > 1 and _copy_distinct_columns(store, path, files)
+        if copy:
+            copied.add(path)
+        else:
+            relpath = os.path.relpath(os.path.abspath(files[0]), directory)
+            store[path] = h5py.ExternalLink(relpath, "/" + path)
+    logger.debug("Merged %s datasets from %s files into %s; copied %s",
+                 len(sources), len(filenames), store.filename, len(copied))
+
+
+def _copy_distinct_columns(store, path, filenames):
+    """Copy the distinct columns of a dataset in multiple files into store.
+    Return False if the dataset has the same columns in all files."""
+    columns = []
+    data = []
+    attributes = None
+    for filename in filenames:
+        with h5py.File(filename, "r") as src:
+            dataset = src[path]
+            if attributes is None:
+                attributes = dict(dataset.attrs)
+            values = dataset[()]
+            if values.ndim == 1:
+                values = values.reshape(-1, 1)
+            for i, column in enumerate(dataset.attrs.get("columns", [])):
+                if column not in columns:
+                    columns.append(column)
+                    data.append(values[:, i])
+
+    if len(columns) == len(attributes.get("columns", [])):
+        return False
+
+    dataset = store.create_dataset(path, data=np.column_stack(data))
+    for key, val in attributes.items():
+        dataset.attrs[key] = val
+    dataset.attrs["columns"] = columns
+    return True
+
+
+def _copy_distinct_elements(store, path, filenames):
+    """Copy the distinct elements of a class dataset in multiple files into
+    store. Return False if the dataset has the same elements in all files."""
+    columns = []
+    column_ranges = {}
+    data = []
+    attributes = None
+    num_first_elements = None
+    for filename in filenames:
+        with h5py.File(filename, "r") as src:
+            dataset = src[path]
+            if attributes is None:
+                attributes = dict(dataset.attrs)
+            values = dataset[()]
+            if values.ndim == 1:
+                values = values.reshape(-1, 1)
+            src_columns = get_class_columns(src, path)
+            src_ranges = get_element_column_ranges(src, path)
+            if num_first_elements is None:
+                num_first_elements = len(src_ranges)
+            for name, (start, length) in src_ranges.items():
+                if name not in column_ranges:
+                    column_ranges[name] = (len(columns), length)
+                    columns += src_columns[start:start + length]
+                    data.append(values[:, start:start + length])
+
+    if len(column_ranges) == num_first_elements:
+        return False
+
+    dataset = store.create_dataset(path, data=np.hstack(data))
+    for key, val in attributes.items():
+        dataset.attrs[key] = val
+    write_class_metadata(store, path, columns, list(column_ranges), list(column_ranges.values()))
+    return True
+
+
+def concatenate_hdf_stores(store, filenames):
+    """Copy the datasets of HDF5 stores that contain consecutive time ranges
+    of the same scenario into an open HDF5 store.
+
+    The rows of each dataset are concatenated in the order of filenames.
+    Datasets with one value for the whole simulation, such as sums and
+    change counts, are added. The metadata datasets of class datasets are
+    copied from the first file that contains them. Datasets that are only
+    created when a value passes a filter, along with their timestamps, may
+    be missing from some files.
+
+    Parameters
+    ----------
+    store : h5py.File
+    filenames : list
+        HDF5 files in time order
+
+    Raises
+    ------
+    InvalidParameter
+        Raised if a dataset exists in store.
+
+    """
+    sources = [h5py.File(x, "r") for x in filenames]
+    try:
+        paths = {}
+        for src in sources:
+            src.visititems(lambda name, item: paths.setdefault(name) if isinstance(item, h5py.Dataset) else None)
+
+        for path in paths:
+            if path in store:
+                raise InvalidParameter(f"{path} exists in the store")
+            datasets = [src[path] for src in sources if path in src]
+            first = datasets[0]
+            if first.attrs.get("type") == "number":
+                data = sum(x[()] for x in datasets)
+            elif get_class_dataset_path(path) is not None:
+                data = first[()]
+            else:
+                data = np.concatenate([x[:x.attrs.get("length", len(x))] for x in datasets])
+            dataset = store.create_dataset(
+                path, data=data, compression=first.compression, compression_opts=first.compression_opts,
+            )
+            for key, val in first.attrs.items():
+                dataset.attrs[key] = val
+            if "length" in first.attrs:
+                dataset.attrs["length"] = len(data)
+    finally:
+        for src in sources:
+            src.close()
+    logger.debug("Concatenated %s datasets from %s files into %s", len(paths), len(filenames), store.filename)
+
+
+def is_group(item):
+    """Return True if the store item is a group."""
+    return isinstance(item, (h5py.Group, MemmapGroup))
+
+
+def is_dataset(item):
+    """Return True if the store item is a dataset."""
+    return isinstance(item, (h5py.Dataset, MemmapDataset))
+
+
+class _MemmapAttributes(collections.abc.MutableMapping):
+    """Attributes of a memmap group or dataset, persisted as JSON.
+
+    If write_through is False, changes are kept in memory until flush is
+    called. DatasetBuffer sets the length of a dataset at every chunk flush,
+    and rewriting the JSON, which includes the column names, each time would
+    dominate the write time. The file is replaced atomically so that readers
+    never see a partial file.
+
+    """
+
+    def __init__(self, filename, writable, write_through=True):
+        self._filename = filename
+        self._writable = writable
+        self._write_through = write_through
+        self._modified = False
+        if os.path.exists(filename):
+            with open(filename) as f_in:
+                self._data = json.load(f_in)
+        else:
+            self._data = {}
+
+    @staticmethod
+    def _to_json(value):
+        if isinstance(value, np.ndarray):
+            return value.tolist()
+        if isinstance(value, np.generic):
+            return value.item()
+        if isinstance(value, (list, tuple)):
+            return [_MemmapAttributes._to_json(x) for x in value]
+        return value
+
+    def __getitem__(self, key):
+        return self._data[key]
+
+    def __setitem__(self, key, value):
+        if not self._writable:
+            raise InvalidParameter("store is opened read-only")
+        self._data[key] = self._to_json(value)
+        self._modified = True
+        if self._write_through:
+            self.flush()
+
+    def __delitem__(self, key):
+        if not self._writable:
+            raise InvalidParameter("store is opened read-only")
+        del self._data[key]
+        self._modified = True
+        if self._write_through:
+            self.flush()
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def flush(self):
+        """Write modified attributes to disk."""
+        if not self._modified:
+            return
+        tmp_filename = self._filename + ".tmp"
+        with open(tmp_filename, "w") as f_out:
+            json.dump(self._data, f_out)
+        os.replace(tmp_filename, self._filename)
+        self._modified = False
+
+
+class MemmapDataset:
+    """Dataset stored as an uncompressed .npy file accessed with np.memmap.
+
+    Attributes are written to disk when the dataset is flushed. There is no
+    chunks property and groups have no visititems, so resuming from a
+    checkpoint and merging partition stores must reject this backend.
+
+    """
+
+    def __init__(self, filename, writable, data=None):
+        self._filename = filename
+        if data is None:
+            data = np.load(filename, mmap_mode="r+" if writable else "r")
+        self._data = data
+        self._attrs = _MemmapAttributes(_attrs_filename(filename), writable, write_through=False)
+
+    def __getitem__(self, key):
+        return np.array(self._data[key])
+
+    def __setitem__(self, key, value):
+        self._data[key] = value
+
+    def __len__(self):
+        return len(self._data)
+
+    @property
+    def attrs(self):
+        return self._attrs
+
+    @property
+    def dtype(self):
+        return self._data.dtype
+
+    @property
+    def shape(self):
+        return self._data.shape
+
+    def flush(self):
+        """Flush modified data and attributes to disk."""
+        if isinstance(self._data, np.memmap):
+            self._data.flush()
+        self._attrs.flush()
+
+
+class MemmapGroup:
+    """Group stored as a directory. Datasets are .npy files."""
+
+    _DATASET_EXT = ".npy"
+    _ATTRS_EXT = ".attrs.json"
+
+    def __init__(self, path, writable, store=None):
+        self._path = path
+        self._writable = writable
+        self._store = store if store is not None else self
+        self._attrs = _MemmapAttributes(os.path.join(path, self._ATTRS_EXT), writable)
+
+    def _resolve(self, name):
+        path = os.path.join(self._path, *[x for x in name.split("/") if x])
+        if os.path.isdir(path):
+            return MemmapGroup(path, self._writable, self._store)
+        filename = path + self._DATASET_EXT
+        if os.path.isfile(filename):
+            return self._store.get_dataset(filename)
+        raise KeyError(name)
+
+    def __getitem__(self, name):
+        return self._resolve(name)
+
+    def __contains__(self, name):
+        try:
+            self._resolve(name)
+            return True
+        except KeyError:
+            return False
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    @property
+    def attrs(self):
+        return self._attrs
+
+    def keys(self):
+        names = []
+        for name in os.listdir(self._path):
+            if name.endswith((self._ATTRS_EXT, self._ATTRS_EXT + ".tmp")):
+                continue
+            if name.endswith(self._DATASET_EXT):
+                name = name[:-len(self._DATASET_EXT)]
+            names.append(name)
+        # Match the h5py default order.
+        return sorted(names)
+
+    def items(self):
+        return [(x, self[x]) for x in self.keys()]
+
+    def values(self):
+        return [self[x] for x in self.keys()]
+
+    def create_group(self, name):
+        if not self._writable:
+            raise InvalidParameter("store is opened read-only")
+        path = os.path.join(self._path, *[x for x in name.split("/") if x])
+        os.makedirs(path, exist_ok=True)
+        return MemmapGroup(path, self._writable, self._store)
+
+    def create_dataset(self, name, shape, dtype, **kwargs):
+        """Create a dataset. Chunking and compression options are ignored
+        because data is written uncompressed.
+
+        """
+        if not self._writable:
+            raise InvalidParameter("store is opened read-only")
+        fields = [x for x in name.split("/") if x]
+        group_path = os.path.join(self._path, *fields[:-1])
+        os.makedirs(group_path, exist_ok=True)
+        filename = os.path.join(group_path, fields[-1] + self._DATASET_EXT)
+        if os.path.exists(filename):
+            raise InvalidParameter(f"dataset {name} already exists")
+        data = np.lib.format.open_memmap(
+            filename, mode="w+", dtype=np.dtype(dtype), shape=shape
+        )
+        return self._store.add_dataset(MemmapDataset(filename, True, data=data))
+
+
+class MemmapStore(MemmapGroup):
+    """Result store where each dataset is a memory-mapped .npy file.
+
+    Writes are plain memory copies: there is no compression and no global
+    library lock, so this is the fastest backend and allows concurrent
+    writers to separate datasets.
+
+    """
+
+    def __init__(self, path, mode="r"):
+        if mode == "w":
+            remove_store(path)
+            os.makedirs(path)
+        elif mode == "a":
+            os.makedirs(path, exist_ok=True)
+        elif mode == "r":
+            if not os.path.isdir(path):
+                raise InvalidConfiguration(f"store {path} does not exist")
+        else:
+            raise InvalidParameter(f"invalid mode {mode}")
+        self._datasets = {}
+        super().__init__(path, mode != "r", store=self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @property
+    def filename(self):
+        """Return the path of the store."""
+        return self._path
+
+    def add_dataset(self, dataset):
+        self._datasets[dataset._filename] = dataset
+        return dataset
+
+    def get_dataset(self, filename):
+        dataset = self._datasets.get(filename)
+        if dataset is None:
+            dataset = MemmapDataset(filename, self._writable)
+            if self._writable:
+                self._datasets[filename] = dataset
+        return dataset
+
+    def close(self):
+        """Flush all open datasets."""
+        for dataset in self._datasets.values():
+            dataset.flush()
+        self._datasets.clear()
+
+
+def _attrs_filename(dataset_filename):
+    base = dataset_filename[:-len(MemmapGroup._DATASET_EXT)]
+    return base + MemmapGroup._ATTRS_EXT
@@ -0,0 +1,163 @@
+"""Runs time partitions of a QSTS simulation in parallel processes."""
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import copy
+import logging
+import math
+import os
+
+import h5py
+
+from PyDSS.exceptions import InvalidConfiguration
+from PyDSS.pydss_fs_interface import SCENARIO_STORES_DIRNAME
+from PyDSS.storage_backends import StorageBackend, concatenate_hdf_stores, open_store
+
+
+logger = logging.getLogger(__name__)
+
+MINUTES_PER_DAY = 24 * 60
+
+
+class TimePartition:
+    """Describes the time steps that one process runs."""
+
+    def __init__(self, settings, warmup_steps, num_steps):
+        self.settings = settings  # simulation settings that start at the warm-up
+        self.warmup_steps = warmup_steps  # steps that are not exported
+        self.num_steps = num_steps  # steps including the warm-up
+
+
+def get_time_partitions(settings, num_steps, num_partitions, warmup_minutes):
+    """Split the time steps of a simulation into contiguous partitions of
+    similar length. Each partition except the first starts with warm-up steps
+    that overlap the previous partition.
+
+    Parameters
+    ----------
+    settings : dict
+        Simulation settings
+    num_steps : int
+        Number of time steps of the simulation
+    num_partitions : int
+    warmup_minutes : float
+
+    Returns
+    -------
+    list
+        list of TimePartition
+
+    """
+    project = settings["Project"]
+    step_minutes = project["Step resolution (sec)"] / 60
+    start = (project["Start Day"] - 1) * MINUTES_PER_DAY + project["Start Time (min)"]
+    max_warmup_steps = math.ceil(warmup_minutes / step_minutes)
+    num_partitions = min(num_partitions, num_steps)
+
+    partitions = []
+    for i in range(num_partitions):
+        first = i * num_steps // num_partitions
+        last = (i + 1) * num_steps // num_partitions
+        warmup_steps = min(max_warmup_steps, first)
+        partition_settings = copy.deepcopy(settings)
+        _set_time(partition_settings["Project"], "Start", start + (first - warmup_steps) * step_minutes)
+        _set_time(partition_settings["Project"], "End", start + last * step_minutes)
+        partitions.append(TimePartition(partition_settings, warmup_steps, last - first + warmup_steps))
+    return partitions
+
+
+def _set_time(project, prefix, minutes):
+    day = int(minutes // MINUTES_PER_DAY)
+    project[f"{prefix} Day"] = day + 1
+    project[f"{prefix} Time (min)"] = minutes - day * MINUTES_PER_DAY
+
+
+def _make_worker_settings(settings):
+    # Workers would overwrite each other's files. They only export to their stores.
+    for key in ("Export Elements", "Export Event Log", "Export PV Profiles"):
+        settings["Exports"][key] = False
+    settings["Plots"]["Create dynamic plots"] = False
+    settings["Project"]["Reuse Compiled Circuit"] = False
+    settings["Project"]["Checkpoint Interval"] = 0
+    settings["Logging"]["Timing Statistics"] = False
+    settings["Project"]["Time Partitions"] = 1
+    return settings
+
+
+# Per-process state of time partition worker processes.
+_worker = {}
+
+
+def _initialize_worker(project, scenario):
+    _worker["project"] = project
+    _worker["scenario"] = scenario
+
+
+def _run_time_partition(partition, filename):
+    from PyDSS import dssInstance
+    project = _worker["project"]
+    with open_store(filename, StorageBackend.HDF5, mode="w") as store:
+        project.hdf_store = store
+        try:
+            dss = dssInstance.OpenDSS(partition.settings)
+            dss.RunSimulation(
+                project,
+                _worker["scenario"],
+                Steps=partition.num_steps,
+                WarmupSteps=partition.warmup_steps,
+            )
+        finally:
+            project.hdf_store = None
+    return filename
+
+
+def run_time_partitioned_simulation(project, scenario, settings, num_steps):
+    """Run time partitions of a simulation in a pool of processes. Each
+    partition is written to its own file in SCENARIO_STORES_DIRNAME. The
+    files are concatenated into the open project store.
+
+    Parameters
+    ----------
+    project : PyDssProject
+    scenario : PyDssScenario
+    settings : dict
+        Simulation settings
+    num_steps : int
+        Number of time steps of the simulation
+
+    """
+    store = project.hdf_store
+    # Partition stores are merged with h5py.
+    if not isinstance(store, h5py.File):
+        raise InvalidConfiguration("Time Partitions requires the HDF5 storage backend")
+    store_dir = os.path.join(project.project_path, SCENARIO_STORES_DIRNAME)
+    os.makedirs(store_dir, exist_ok=True)
+
+    partitions = get_time_partitions(
+        _make_worker_settings(copy.deepcopy(settings)),
+        num_steps,
+        settings["Project"]["Time Partitions"],
+        settings["Project"]["Time Partition Warm-up (min)"],
+    )
+    logger.info("Running %s time steps in %s time partitions", num_steps, len(partitions))
+    filenames = {}
+    with ProcessPoolExecutor(
+            max_workers=len(partitions),
+            initializer=_initialize_worker,
+            initargs=(project, scenario),
+        ) as executor:
+        futures = {
+            executor.submit(
+                _run_time_partition,
+                partition,
+                os.path.join(store_dir, f"{scenario.name}_time{i}.h5"),
+            ): i
+            for i, partition in enumerate(partitions)
+        }
+        for future in as_completed(futures):
+            index = futures[future]
+            filenames[index] = future.result()
+            logger.info("Completed time partition %s", index)
+
+    concatenate_hdf_stores(store, [filenames[i] for i in range(len(partitions))])
+    for filename in filenames.values():
+        os.remove(filename)
@@ -2,6 +2,7 @@
 import logging
 import math
 
+from PyDSS.dssObjectBase import invalidate_active_objects
 from PyDSS.exceptions import InvalidParameter
 from PyDSS.value_storage import ValueContainer, ValueByNumber
 
@@ -31,6 +32,7 @@ def track_capacitor_state_changes(
         capacitor, timestamp, step_number, options, last_value, count
     ):
     capacitor.dss.Capacitors.Name(capacitor.Name)
+    invalidate_active_objects(capacitor.dss)
     if capacitor.dss.CktElement.Name() != capacitor.dss.Element.Name():
         raise InvalidParameter(
             f"Object is not a circuit element {capacitor.Name}"
@@ -54,6 +56,7 @@ def track_reg_control_tap_number_changes(
         reg_control, timestamp, step_number, options, last_value, count
     ):
     reg_control.dss.RegControls.Name(reg_control.Name)
+    invalidate_active_objects(reg_control.dss)
     if reg_control.dss.CktElement.Name() != reg_control.dss.Element.Name():
         raise InvalidParameter(
             f"Object is not a circuit element {reg_control.Name()}"
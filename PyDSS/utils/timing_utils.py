@@ -0,0 +1,232 @@
+"""Utility functions to measure where the time of a simulation goes."""
+
+from datetime import timedelta
+import logging
+import os
+import time
+
+import pandas as pd
+
+from PyDSS.utils.utils import dump_data
+
+
+logger = logging.getLogger(__name__)
+
+
+class TimingStats:
+    """Accumulates the wall time and number of calls of named phases of a
+    simulation. Phases can be nested, so their times can overlap.
+    Optionally records the time of each phase at every time step.
+
+    """
+
+    def __init__(self, trace=False):
+        self._totals = {}  # phase name to [count, seconds]
+        self._timers = {}
+        self._step_totals = {}  # phase name to seconds in the current step
+        self._trace = [] if trace else None
+        self._start = time.perf_counter()
+
+    def add(self, name, seconds, count=1):
+        """Add time to a phase.
+
+        Parameters
+        ----------
+        name : str
+        seconds : float
+        count : int
+            Number of calls that took the time
+
+        """
+        total = self._totals.get(name)
+        if total is None:
+            self._totals[name] = [count, seconds]
+        else:
+            total[0] += count
+            total[1] += seconds
+        if self._trace is not None:
+            self._step_totals[name] = self._step_totals.get(name, 0.0) + seconds
+
+    def timer(self, name):
+        """Return a context manager that adds its elapsed time to a phase.
+
+        Parameters
+        ----------
+        name : str
+
+        Returns
+        -------
+        _Timer
+
+        """
+        timer = self._timers.get(name)
+        if timer is None:
+            timer = _Timer(self, name)
+            self._timers[name] = timer
+        return timer
+
+    def end_step(self, step):
+        """Record the time of each phase in the step if tracing is enabled.
+
+        Parameters
+        ----------
+        step : int
+
+        """
+        if self._trace is not None:
+            self._step_totals["Step"] = step
+            self._trace.append(self._step_totals)
+            self._step_totals = {}
+
+    def get_summary(self):
+        """Return the statistics of each phase.
+
+        Returns
+        -------
+        dict
+
+        """
+        elapsed = time.perf_counter() - self._start
+        phases = {}
+        for name, (count, seconds) in sorted(self._totals.items(), key=lambda x: -x[1][1]):
+            phases[name] = {
+                "count": count,
+                "total_seconds": seconds,
+                "average_seconds": seconds / count if count else 0.0,
+                "percent": seconds / elapsed * 100 if elapsed else 0.0,
+            }
+        return {"elapsed_seconds": elapsed, "phases": phases}
+
+    def export(self, directory, basename):
+        """Write the summary to <basename>_timing.json and .csv and the
+        trace to <basename>_timing_trace.csv.
+
+        Parameters
+        ----------
+        directory : str
+        basename : str
+
+        Returns
+        -------
+        list
+            Created files
+
+        """
+        summary = self.get_summary()
+        filenames = [
+            os.path.join(directory, basename + "_timing.json"),
+            os.path.join(directory, basename + "_timing.csv"),
+        ]
+        dump_data(summary, filenames[0], indent=2)
+        df = pd.DataFrame.from_dict(summary["phases"], orient="index")
+        df.index.name = "phase"
+        df.to_csv(filenames[1])
+        if self._trace is not None:
+            filenames.append(os.path.join(directory, basename + "_timing_trace.csv"))
+            df = pd.DataFrame(self._trace).fillna(0.0)
+            columns = ["Step"] + sorted(x for x in df.columns if x != "Step")
+            df.reindex(columns=columns).to_csv(filenames[-1], index=False)
+        logger.info("Exported timing statistics to %s", ", ".join(filenames))
+        return filenames
+
+
+class ProgressReporter:
+    """Logs the number of completed time steps, the throughput, and the
+    estimated time remaining at an interval of steps or wall time.
+
+    """
+
+    def __init__(self, num_steps, percent_interval, seconds_interval, log=None, start_step=0):
+        """Constructs ProgressReporter.
+
+        Parameters
+        ----------
+        num_steps : int
+        percent_interval : float
+            Report each time this percent of the steps completes. 0 disables it.
+        seconds_interval : float
+            Report at this interval of wall time. 0 disables it.
+        log : logging.Logger | None
+        start_step : int
+            Number of steps completed before this run, such as when resuming
+            from a checkpoint. They are excluded from the throughput.
+
+        """
+        self._num_steps = num_steps
+        self._logger = logger if log is None else log
+        self._start_step = start_step
+        self._start = time.perf_counter()
+        if percent_interval > 0:
+            self._step_interval = max(int(num_steps * percent_interval / 100), 1)
+            self._next_step = (start_step // self._step_interval + 1) * self._step_interval
+        else:
+            self._step_interval = None
+            self._next_step = None
+        self._seconds_interval = seconds_interval
+        self._next_time = self._start + seconds_interval
+
+    def update(self, completed_steps):
+        """Report the progress if an interval has passed.
+
+        Parameters
+        ----------
+        completed_steps : int
+
+        """
+        if self._next_step is not None and completed_steps >= self._next_step:
+            self._next_step = (completed_steps // self._step_interval + 1) * self._step_interval
+            self._report(completed_steps)
+        elif self._seconds_interval > 0 and time.perf_counter() >= self._next_time:
+            self._report(completed_steps)
+
+    def _report(self, completed_steps):
+        now = time.perf_counter()
+        self._next_time = now + self._seconds_interval
+        elapsed = now - self._start
+        rate = (completed_steps - self._start_step) / elapsed if elapsed > 0 else 0.0
+        if rate > 0:
+            eta = str(timedelta(seconds=round((self._num_steps - completed_steps) / rate)))
+        else:
+            eta = "unknown"
+        self._logger.info(
+            "Completed %s of %s time steps (%.1f%%), %.2f steps/s, ETA %s",
+            completed_steps,
+            self._num_steps,
+            completed_steps / self._num_steps * 100 if self._num_steps else 100.0,
+            rate,
+            eta,
+        )
+
+
+class _Timer:
+    """Adds the time spent in a with block to a phase."""
+
+    __slots__ = ("_stats", "_name", "_start")
+
+    def __init__(self, stats, name):
+        self._stats = stats
+        self._name = name
+        self._start = None
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        self._stats.add(self._name, time.perf_counter() - self._start)
+        return False
+
+
+class _NullTimer:
+    """Timer to use when timing statistics are disabled."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+
+NULL_TIMER = _NullTimer()
@@ -10,8 +10,18 @@ from PyDSS.dataset_buffer import DatasetBuffer
 from PyDSS.exceptions import InvalidParameter, InvalidConfiguration
 
 
+# The column names, element names, and element column ranges of a class
+# dataset are stored in datasets named with these suffixes. They exceed the
+# 64 KiB limit of HDF5 attributes for classes with thousands of columns.
+CLASS_COLUMNS_SUFFIX = "__columns"
+CLASS_NAMES_SUFFIX = "__names"
+CLASS_COLUMN_RANGES_SUFFIX = "__column_ranges"
+CLASS_METADATA_SUFFIXES = (CLASS_COLUMNS_SUFFIX, CLASS_NAMES_SUFFIX, CLASS_COLUMN_RANGES_SUFFIX)
+
+
 class DatasetPropertyType(enum.Enum):
     ELEMENT_PROPERTY = "elem_prop"  # data is stored at every time point
+    ELEMENT_CLASS_PROPERTY = "elem_class_prop"  # one dataset for all elements of a class
     FILTERED = "filtered"  # data is stored after being filtered
     NUMBER = "number"  # Only a single value is written
     TIMESTAMP = "timestamp"  # data are timestamps, tied to FILTERED
@@ -284,6 +294,130 @@ class ValueByNumber(ValueStorageBase):
         return self._value_type
 
 
+class ValueSchema:
+    """Describes how to convert the raw values of a labeled element property into
+    stored values. Column labels and the positions of the values in the raw
+    list are computed once per element and property. Converting a raw list is
+    then a single NumPy take.
+
+    """
+    _PHASES = {
+        1: 'A',
+        2: 'B',
+        3: 'C',
+        0: 'N',
+    }
+
+    def __init__(self, name, prop, Nodes, is_complex, units, raw_length):
+        """Constructor for ValueSchema
+
+        Parameters
+        ----------
+        name : str
+        prop : str
+        Nodes : list
+            list of lists of node numbers, one list per terminal
+        is_complex : bool
+            True if each pair of raw values is a complex number. Otherwise,
+            pairs are magnitude and angle.
+        units : list
+            list of str
+        raw_length : int
+            Length of the raw list of values
+
+        """
+        self._name = name
+        self._prop = prop
+        self._raw_length = raw_length
+        self._is_complex = is_complex
+        self._labels = []
+        pair_indices = []
+
+        # Every two consecutive raw values make one quantity. Each terminal
+        # has m quantities, but only the first len(node) are connected.
+        # Example: 2 terminals, 12 raw values -> m = 12 / (2 * 2) = 3
+        #   terminal one pairs: [0, 1], [2, 3], [4, 5]
+        #   terminal two pairs: [6, 7], [8, 9], [10, 11]
+        num_pairs = raw_length // 2
+        m = int(raw_length / (len(Nodes) * 2))
+        for i, node in enumerate(Nodes):
+            for j, v in enumerate(node[:m]):
+                pair_index = i * m + j
+                if pair_index >= num_pairs:
+                    break
+                label = '{}{}'.format(self._PHASES[v], str(i + 1))
+                if is_complex:
+                    self._labels.append(label + " " + units[0])
+                else:
+                    self._labels.append(label + ValueStorageBase.DELIMITER + "mag" + ' ' + units[0])
+                    self._labels.append(label + ValueStorageBase.DELIMITER + "ang" + ' ' + units[1])
+                pair_indices.append(pair_index)
+
+        pair_indices = np.array(pair_indices, dtype=np.int64)
+        if is_complex:
+            self._index = pair_indices
+        else:
+            self._index = np.column_stack((pair_indices * 2, pair_indices * 2 + 1)).ravel()
+        self._columns = [
+            ValueStorageBase.DELIMITER.join((name, x)) for x in self._labels
+        ]
+
+    def matches(self, raw_value):
+        """Return True if the schema applies to the raw value."""
+        return len(raw_value) == self._raw_length
+
+    def make_value(self, raw_value):
+        """Return a ValueByLabel for the raw value.
+
+        Parameters
+        ----------
+        raw_value : list
+
+        Returns
+        -------
+        ValueByLabel
+
+        """
+        return ValueByLabel.from_schema(self, self.to_array(raw_value).tolist())
+
+    def to_array(self, raw_value):
+        """Convert the raw value to an array in column order.
+
+        Parameters
+        ----------
+        raw_value : list
+
+        Returns
+        -------
+        np.ndarray
+
+        """
+        array = np.asarray(raw_value, dtype=np.float64)
+        if self._is_complex:
+            array = array[:(self._raw_length // 2) * 2].view(np.complex128)
+        return array.take(self._index)
+
+    @property
+    def columns(self):
+        return self._columns
+
+    @property
+    def labels(self):
+        return self._labels
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def prop(self):
+        return self._prop
+
+    @property
+    def value_type(self):
+        return complex if self._is_complex else float
+
+
 class ValueByLabel(ValueStorageBase):
     """Stores a list of lists of numbers by an arbitrary label. Use this class when working with cktElement function
     calls like Currents, currentMagAng where every two consecutive values in the returned list are representing one
@@ -296,57 +430,47 @@ class ValueByLabel(ValueStorageBase):
         ----------
         name : str
         prop : str
-        label_prefix : str
-            Text to use as a prefix for column labels. Ex: Phase
-        labels : list
+        value : list
+            Pairs of values that can be interpreted as complex numbers or
+            magnitude and angle.
+        Nodes : list
+            list of lists of node numbers, one list per terminal
+        is_complex : bool
+        units : list
             list of str
-        values : list
-            Pairs of values that can be interpreted as complex numbers.
 
         """
         super().__init__()
-        phs = {
-            1: 'A',
-            2: 'B',
-            3: 'C',
-            0: 'N',
-        }
+        schema = ValueSchema(name, prop, Nodes, is_complex, units, len(value))
+        self._init(schema, schema.to_array(value).tolist())
 
-        self._name = name
-        self._prop = prop
-        self._labels = []
-        self._value = []
-        self._value_type = complex if is_complex else float
-
-        n = 2
-        m = int(len(value) / (len(Nodes)*n))
-        value = self.chunk_list(value, n)
-        value = self.chunk_list(value, m)
-
-        # Chunk_list example
-        # X = list(range(12)) , nList= 2
-        # Y = chunk_list(X, nList) -> [[0, 1], [2, 3], [4, 5], [6, 7], [8, 9], [10, 11]]
-        # Given element has 2 terminals m = 12 / (2*2) = 3
-        # Z =  chunk_list(Y, m) - > [
-        #                            [[0, 1], [2, 3], [4, 5]],  Terminal one complex pairs
-        #                            [[6, 7], [8, 9], [10, 11]] Terminal two complex pairs
-        #                            ]
-
-        for i, node_val in enumerate(zip(Nodes, value)):
-            node, val = node_val
-            for v, x in zip(node, val):
-                label = '{}{}'.format(phs[v], str(i+1))
-                if is_complex:
-                    label += " " + units[0]
-                    self._labels.append(label)
-                    self._value += [complex(x[0], x[1])]
-                else:
-                    # TODO: only generate labels once.
-                    # Should be able to do that with an existing instance.
-                    label_mag = label + self.DELIMITER + "mag" + ' ' + units[0]
-                    label_ang = label + self.DELIMITER + "ang" + ' ' + units[1]
-                    self._labels.extend([label_mag, label_ang])
-                    self._value += [x[0], x[1]]
+    @classmethod
+    def from_schema(cls, schema, value):
+        """Create an instance from a ValueSchema without recomputing labels.
+
+        Parameters
+        ----------
+        schema : ValueSchema
+        value : list
+            Values in column order
+
+        Returns
+        -------
+        ValueByLabel
+
+        """
+        obj = cls.__new__(cls)
+        ValueStorageBase.__init__(obj)
+        obj._init(schema, value)
+        return obj
+
+    def _init(self, schema, value):
+        self._name = schema.name
+        self._prop = schema.prop
+        self._labels = schema.labels
+        self._columns = schema.columns
+        self._value = value
+        self._value_type = schema.value_type
 
     def __iadd__(self, other):
         for i in range(len(self._value)):
@@ -357,10 +481,6 @@ class ValueByLabel(ValueStorageBase):
     def value(self):
         return self._value
 
-    @staticmethod
-    def chunk_list(values, nLists):
-        return  [values[i * nLists:(i + 1) * nLists] for i in range((len(values) + nLists - 1) // nLists)]
-
     @property
     def num_columns(self):
         return len(self._labels)
@@ -372,9 +492,8 @@ class ValueByLabel(ValueStorageBase):
         self._value = value
 
     def make_columns(self):
-        return [
-            self.DELIMITER.join((self._name, f"{x}")) for x in self._labels
-        ]
+        # Computed once by the schema. Callers must not modify the list.
+        return self._columns
 
     @property
     def value_type(self):
@@ -384,32 +503,38 @@ class ValueByLabel(ValueStorageBase):
 class ValueContainer:
     """Container for a sequence of instances of ValueStorageBase."""
 
-    # These could potentially be reduced in bit lengths. Compression probably
-    # makes that unnecessary.
+    # Default dtypes. These can be reduced per property with the export list
+    # dtype option or globally with the "Export Float Precision" setting.
     _TYPE_MAPPING = {
         float: np.float,
         int: np.int,
         complex: np.complex,
     }
+    _SINGLE_PRECISION_TYPE_MAPPING = {
+        float: np.float32,
+        complex: np.complex64,
+    }
 
     def __init__(self, value, hdf_store, path, max_size, dataset_property_type, max_chunk_bytes=None,
-                 store_timestamp=False):
+                 store_timestamp=False, writer=None, compression=None, float_scaleoffset=None,
+                 dtype=None, single_precision=False, resume_lengths=None):
+        # resume_lengths maps the paths of datasets written by an interrupted
+        # simulation to their lengths. Those datasets are continued.
+        if resume_lengths is None:
+            resume_lengths = {}
         group_name = os.path.dirname(path)
         basename = os.path.basename(path)
         try:
-            if basename in hdf_store[group_name].keys():
+            if path not in resume_lengths and basename in hdf_store[group_name].keys():
                 raise InvalidParameter(f"duplicate dataset name {basename}")
         except KeyError:
             # Don't bother checking each sub path.
             pass
 
-        dtype = self._TYPE_MAPPING.get(value.value_type)
-        assert dtype is not None
-        scaleoffset = None
-        if dtype == np.float:
-            scaleoffset = 4
-        elif dtype == np.int:
-            scaleoffset = 0
+        dtype, scaleoffset = self.get_dtype_and_scaleoffset(
+            value.value_type, float_scaleoffset, dtype=dtype, single_precision=single_precision
+        )
+        self._default_dtype = self._TYPE_MAPPING[value.value_type]
         attributes = {"type": dataset_property_type.value}
         timestamp_path = None
 
@@ -424,6 +549,9 @@ class ValueContainer:
                 scaleoffset=scaleoffset,
                 max_chunk_bytes=max_chunk_bytes,
                 attributes={"type": DatasetPropertyType.TIMESTAMP.value},
+                writer=writer,
+                compression=compression,
+                length=resume_lengths.get(timestamp_path),
             )
             attributes["timestamp_path"] = timestamp_path
         else:
@@ -438,8 +566,57 @@ class ValueContainer:
             scaleoffset=scaleoffset,
             max_chunk_bytes=max_chunk_bytes,
             attributes=attributes,
+            writer=writer,
+            compression=compression,
+            length=resume_lengths.get(path),
         )
 
+    @classmethod
+    def get_dtype_and_scaleoffset(cls, value_type, float_scaleoffset=None, dtype=None,
+                                  single_precision=False):
+        """Return the numpy dtype and HDF scaleoffset to use for a value type.
+
+        Parameters
+        ----------
+        value_type : Type
+        float_scaleoffset : int | None
+            Number of decimal digits to keep for floats. The scale-offset
+            filter is lossy for floats, so it is only applied if set.
+        dtype : str | None
+            Overrides the default dtype, such as "float32" or "int16".
+        single_precision : bool
+            If True and dtype is None, store floats as float32 and complex
+            numbers as complex64.
+
+        Returns
+        -------
+        tuple
+            dtype, scaleoffset
+
+        Raises
+        ------
+        InvalidConfiguration
+            Raised if dtype would drop the imaginary component of complex values.
+
+        """
+        if dtype is None:
+            if single_precision:
+                dtype = cls._SINGLE_PRECISION_TYPE_MAPPING.get(value_type)
+            if dtype is None:
+                dtype = cls._TYPE_MAPPING.get(value_type)
+            assert dtype is not None
+        dtype = np.dtype(dtype)
+        if value_type == complex and dtype.kind != "c":
+            raise InvalidConfiguration(f"complex values cannot be stored as {dtype}")
+
+        scaleoffset = None
+        if dtype.kind == "f":
+            scaleoffset = float_scaleoffset
+        elif dtype.kind in ("i", "u"):
+            # Lossless for integers.
+            scaleoffset = 0
+        return dtype, scaleoffset
+
     @staticmethod
     def timestamp_path(path):
         return path + "Timestamp"
@@ -453,7 +630,18 @@ class ValueContainer:
         timestamp : float | None
 
         """
-        self._dataset.write_value(value.value)
+        self.append_row(value.value, timestamp=timestamp)
+
+    def append_row(self, row, timestamp=None):
+        """Append values that are already in column order.
+
+        Parameters
+        ----------
+        row : np.ndarray | list | float | complex
+        timestamp : float | None
+
+        """
+        self._dataset.write_value(row)
         if self._timestamps is not None:
             assert timestamp is not None
             self._timestamps.write_value(timestamp)
@@ -464,15 +652,217 @@ class ValueContainer:
         if self._timestamps is not None:
             self._timestamps.flush_data()
 
-    def max_num_bytes(self):
+    @property
+    def dataset_buffers(self):
+        """Return the DatasetBuffers of the container.
+
+        Returns
+        -------
+        list
+
+        """
+        if self._timestamps is None:
+            return [self._dataset]
+        return [self._dataset, self._timestamps]
+
+    def get_dataset_lengths(self):
+        """Return the number of flushed rows of each dataset by path.
+
+        Returns
+        -------
+        dict
+
+        """
+        return {x.path: x.length for x in self.dataset_buffers}
+
+    def max_num_bytes(self, full_precision=False):
         """Return the maximum number of bytes the container could hold.
 
+        Parameters
+        ----------
+        full_precision : bool
+            If True, return the number of bytes required with the default
+            64-bit dtypes.
+
+        Returns
+        -------
+        int
+
+        """
+        return _get_max_num_bytes(self._dataset, self._default_dtype, full_precision)
+
+
+class ElementClassValueContainer:
+    """Container for one property of all elements of a class. Values for all
+    elements are stored as contiguous column ranges in a single dataset.
+
+    """
+    def __init__(self, names, values, hdf_store, path, max_size, max_chunk_bytes=None,
+                 writer=None, compression=None, float_scaleoffset=None, dtype=None,
+                 single_precision=False, resume_lengths=None):
+        """Constructs ElementClassValueContainer.
+
+        Parameters
+        ----------
+        names : list
+            list of element names
+        values : list
+            list of ValueStorageBase, one per element, read at the first time
+            point. Defines the columns and element order of the dataset.
+        hdf_store : h5py.File
+        path : str
+        max_size : int
+        max_chunk_bytes : int | None
+        writer : DatasetWriterThread | None
+        compression : CompressionOptions | None
+        float_scaleoffset : int | None
+        dtype : str | None
+        single_precision : bool
+        resume_lengths : dict | None
+            Lengths of datasets written by an interrupted simulation by path.
+            If path is included, the dataset is continued.
+
+        """
+        if resume_lengths is None:
+            resume_lengths = {}
+        group_name = os.path.dirname(path)
+        basename = os.path.basename(path)
+        try:
+            if path not in resume_lengths and basename in hdf_store[group_name].keys():
+                raise InvalidParameter(f"duplicate dataset name {basename}")
+        except KeyError:
+            pass
+
+        assert len(names) == len(values)
+        columns = []
+        column_ranges = []
+        value_type = None
+        for value in values:
+            value_columns = value.make_columns()
+            column_ranges.append((len(columns), len(value_columns)))
+            columns += value_columns
+            # Complex takes precedence so that mixed classes don't lose data.
+            if value_type is None or value.value_type == complex:
+                value_type = value.value_type
+
+        dtype, scaleoffset = ValueContainer.get_dtype_and_scaleoffset(
+            value_type, float_scaleoffset, dtype=dtype, single_precision=single_precision
+        )
+        self._default_dtype = ValueContainer._TYPE_MAPPING[value_type]
+        self._columns = columns
+        self._num_columns = len(columns)
+        self._column_ranges = column_ranges
+        self._row = np.empty(self._num_columns, dtype=dtype)
+        self._dataset = DatasetBuffer(
+            hdf_store,
+            path,
+            max_size,
+            dtype,
+            columns,
+            scaleoffset=scaleoffset,
+            max_chunk_bytes=max_chunk_bytes,
+            attributes={"type": DatasetPropertyType.ELEMENT_CLASS_PROPERTY.value},
+            writer=writer,
+            compression=compression,
+            length=resume_lengths.get(path),
+            store_columns=False,
+        )
+        if path not in resume_lengths:
+            write_class_metadata(hdf_store, path, columns, names, column_ranges)
+
+    def append(self, values):
+        """Append one row of values to the container.
+
+        Parameters
+        ----------
+        values : list
+            list of ValueStorageBase in the same order as the constructor
+
+        Returns
+        -------
+        np.ndarray
+            The appended row. It is overwritten by the next call.
+
+        """
+        for (start, length), value in zip(self._column_ranges, values):
+            # Scalars are broadcast. Labeled values are lists even if they have
+            # one column.
+            self._row[start:start + length] = value.value
+
+        self.append_row(self._row)
+        return self._row
+
+    def append_row(self, row):
+        """Append one row of values that is already in column order.
+
+        Parameters
+        ----------
+        row : np.ndarray
+
+        """
+        if self._num_columns == 1:
+            self._dataset.write_value(row[0])
+        else:
+            self._dataset.write_value(row)
+
+    @property
+    def columns(self):
+        """Return the column names of the dataset.
+
+        Returns
+        -------
+        list
+
+        """
+        return self._columns
+
+    def flush_data(self):
+        """Flush any outstanding data to disk."""
+        self._dataset.flush_data()
+
+    @property
+    def dataset_buffers(self):
+        """Return the DatasetBuffers of the container.
+
+        Returns
+        -------
+        list
+
+        """
+        return [self._dataset]
+
+    def get_dataset_lengths(self):
+        """Return the number of flushed rows of the dataset by path.
+
+        Returns
+        -------
+        dict
+
+        """
+        return {self._dataset.path: self._dataset.length}
+
+    def max_num_bytes(self, full_precision=False):
+        """Return the maximum number of bytes the container could hold.
+
+        Parameters
+        ----------
+        full_precision : bool
+            If True, return the number of bytes required with the default
+            64-bit dtypes.
+
         Returns
         -------
         int
 
         """
-        return self._dataset.max_num_bytes()
+        return _get_max_num_bytes(self._dataset, self._default_dtype, full_precision)
+
+
+def _get_max_num_bytes(dataset, default_dtype, full_precision):
+    num_bytes = dataset.max_num_bytes()
+    if full_precision:
+        num_bytes = num_bytes * np.dtype(default_dtype).itemsize / dataset.dtype.itemsize
+    return num_bytes
 
 
 def get_dataset_property_type(dataset):
@@ -495,3 +885,98 @@ def get_timestamp_path(dataset):
 
     """
     return dataset.attrs["timestamp_path"]
+
+
+def get_class_dataset_path(path):
+    """Return the path of the class dataset if path is one of its metadata
+    datasets.
+
+    Parameters
+    ----------
+    path : str
+
+    Returns
+    -------
+    str | None
+
+    """
+    for suffix in CLASS_METADATA_SUFFIXES:
+        if path.endswith(suffix):
+            return path[:-len(suffix)]
+    return None
+
+
+def write_class_metadata(hdf_store, path, columns, names, column_ranges):
+    """Write the metadata datasets of a class dataset.
+
+    Parameters
+    ----------
+    hdf_store : h5py.File | h5py.Group
+    path : str
+        Path of the class dataset
+    columns : list
+    names : list
+        Element names
+    column_ranges : list
+        (start column, number of columns) of each element
+
+    """
+    _write_strings(hdf_store, path + CLASS_COLUMNS_SUFFIX, columns)
+    _write_strings(hdf_store, path + CLASS_NAMES_SUFFIX, names)
+    ranges = np.array(column_ranges, dtype=np.int64).reshape(-1, 2)
+    dataset = hdf_store.create_dataset(
+        path + CLASS_COLUMN_RANGES_SUFFIX, shape=ranges.shape, dtype=ranges.dtype
+    )
+    if len(ranges) > 0:
+        dataset[:] = ranges
+
+
+def get_class_columns(group, name):
+    """Return the column names of a class dataset.
+
+    Parameters
+    ----------
+    group : h5py.Group
+    name : str
+        Path of the class dataset relative to group
+
+    Returns
+    -------
+    list
+
+    """
+    return _read_strings(group[name + CLASS_COLUMNS_SUFFIX])
+
+
+def get_element_column_ranges(group, name):
+    """Return the column range of each element in a class dataset.
+
+    Parameters
+    ----------
+    group : h5py.Group
+    name : str
+        Path of the class dataset relative to group
+
+    Returns
+    -------
+    dict
+        Maps element name to a tuple of (start column, number of columns).
+
+    """
+    names = _read_strings(group[name + CLASS_NAMES_SUFFIX])
+    ranges = group[name + CLASS_COLUMN_RANGES_SUFFIX][:]
+    return {
+        name: (int(start), int(length)) for name, (start, length) in zip(names, ranges)
+    }
+
+
+def _write_strings(hdf_store, path, values):
+    # Fixed-length byte strings are supported by all storage backends.
+    data = np.array([x.encode("utf-8") for x in values], dtype=bytes)
+    dataset = hdf_store.create_dataset(path, shape=data.shape, dtype=data.dtype)
+    if len(data) > 0:
+        dataset[:] = data
+
+
+def _read_strings(dataset):
+    return [x.decode("utf-8") for x in dataset[:]]
@@ -7,7 +7,8 @@ import zipfile
 import pytest
 
 from PyDSS.common import PROJECT_TAR, PROJECT_ZIP
-from PyDSS.pydss_fs_interface import STORE_FILENAME
+from PyDSS.pydss_fs_interface import STORE_FILENAME, MEMMAP_STORE_DIRNAME, \
+    SCENARIO_STORES_DIRNAME
 from PyDSS.pydss_project import PyDssProject
 from PyDSS.utils.utils import dump_data
 
@@ -55,6 +56,10 @@ def cleanup_project():
         store_filename = os.path.join(project_path, STORE_FILENAME)
         if os.path.exists(store_filename):
             os.remove(store_filename)
+        for dirname in (MEMMAP_STORE_DIRNAME, SCENARIO_STORES_DIRNAME):
+            store_dirname = os.path.join(project_path, dirname)
+            if os.path.exists(store_dirname):
+                shutil.rmtree(store_dirname)
 
         scenario_config_file = os.path.join(
             project_path, "Scenarios", "scenario1", "simulation-run.toml"
@@ -0,0 +1,94 @@
+from types import SimpleNamespace
+
+from PyDSS.modes.adaptive_stepper import AdaptiveStepper
+
+
+class FakeCollection:
+
+    def __init__(self, items):
+        self.items = items
+        self.position = 0
+
+    def First(self):
+        self.position = 0
+        return 1 if self.items else 0
+
+    def Next(self):
+        self.position += 1
+        return self.position + 1 if self.position < len(self.items) else 0
+
+    def __getattr__(self, name):
+        return lambda: self.items[self.position][name]
+
+
+class FakeSolver:
+
+    def __init__(self):
+        self.hour = 1.0
+        self.skipped = 0
+        self.solves = []
+
+    def GetStepResolutionSeconds(self):
+        return 900.0
+
+    def GetOpenDSSTime(self):
+        return self.hour
+
+    def SkipStep(self):
+        self.skipped += 1
+
+    def IncStep(self):
+        self.hour += 0.25 * (self.skipped + 1)
+        self.skipped = 0
+        self.solves.append(self.hour)
+
+
+def _make_stepper(pmult, taps, max_skipped=3):
+    shapes = [
+        {"Name": "used", "Npts": len(pmult), "PMult": pmult, "QMult": [0.0], "HrInterval": 1.0},
+        {"Name": "unused", "Npts": 2, "PMult": [0.0, 1.0], "QMult": [0.0], "HrInterval": 1.0},
+    ]
+    loads = FakeCollection([{}])
+    dss = SimpleNamespace(
+        Circuit=SimpleNamespace(SetActiveClass=lambda x: setattr(loads, "items", [{}] if x == "Load" else [])),
+        ActiveClass=loads,
+        Properties=SimpleNamespace(Value=lambda x: "Used" if x == "yearly" else ""),
+        LoadShape=FakeCollection(shapes),
+        RegControls=FakeCollection(taps),
+        Capacitors=FakeCollection([]),
+    )
+    solver = FakeSolver()
+    return AdaptiveStepper(dss, solver, 0.01, max_skipped, 2), solver
+
+
+def test_adaptive_stepper_skips_flat_profiles():
+    pmult = [0.5] * 6 + [0.8] * 18
+    stepper, solver = _make_stepper(pmult, [])
+    assert stepper.get_profile_change(1.0, 2.0) == 0.0
+    assert stepper.get_profile_change(5.0, 5.25) > 0.01
+
+    skipped = [stepper.advance(True) for _ in range(8)]
+    # At most three consecutive steps are skipped, and a solve covers them.
+    assert skipped == [True, True, True, False, True, True, True, False]
+    assert solver.solves == [2.0, 3.0]
+
+    # Controllers that acted prevent skipping.
+    assert not stepper.advance(False)
+    assert stepper.total_skipped_steps == 6
+
+    # Steps are solved at full resolution around the profile change at hour 6.
+    decisions = []
+    while solver.hour < 8.0:
+        hour = solver.hour
+        decisions.append((hour, stepper.advance(True)))
+    assert all(not x for hour, x in decisions if 4.0 <= hour <= 6.75)
+    assert any(x for hour, x in decisions if hour >= 7.0)
+
+
+def test_adaptive_stepper_holds_full_resolution_after_events():
+    taps = [{"TapNumber": 0}]
+    stepper, solver = _make_stepper([1.0] * 24, taps)
+    assert not stepper.advance(False)
+    taps[0]["TapNumber"] = 1
+    assert not stepper.advance(False)
+    assert [stepper.advance(True) for _ in range(3)] == [False, False, True]
@@ -0,0 +1,177 @@
+import cmath
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from PyDSS.bulk_value_reader import BulkValueReader
+from PyDSS.dssBus import dssBus
+from PyDSS.dssElement import dssElement
+from PyDSS.value_storage import ValueByLabel, ValueByNumber
+
+
+class FakeCircuit:
+    """Buses with missing phases and lines whose class iteration order
+    differs from the order of AllElementNames."""
+
+    def __init__(self):
+        # Node voltages in volts by bus and node, in OpenDSS node order
+        self.buses = {
+            "b1": {1: cmath.rect(7100, 0.0), 2: cmath.rect(7150, -2.1), 3: cmath.rect(7050, 2.1)},
+            "b2": {2: cmath.rect(7000, -2.2)},
+            "b3": {3: cmath.rect(6950, 2.0), 1: cmath.rect(6900, -0.1)},
+        }
+        self.base_voltage = 7200.0
+        self.elements = {
+            "Vsource.source": {"losses": [0.0, 0.0]},
+            "Line.l2": {"currents": [1.0, 2.0, -1.0, -2.0], "losses": [150.0, 40.0]},
+            "Load.ld1": {"currents": [5.0, 1.0, -5.0, -1.0], "losses": [0.0, 0.0]},
+            "Line.l1": {"currents": [float(x) for x in range(12)], "losses": [900.0, 300.0]},
+            "Line.l3": {"currents": [float(-x) for x in range(8)], "losses": [420.0, 75.0]},
+        }
+        self.class_order = {
+            "Line": ["Line.l3", "Line.l1", "Line.l2"],
+            "Load": ["Load.ld1"],
+        }
+        self.active_bus = None
+        self.active_element = None
+        self.active_class = None
+        self.position = 0
+
+    def make_dss(self):
+        return SimpleNamespace(
+            Circuit=SimpleNamespace(
+                AllNodeNames=lambda: [f"{x}.{y}" for x, nodes in self.buses.items() for y in nodes],
+                AllBusVolts=lambda: self._flatten(self._node_voltages()),
+                AllBusMagPu=lambda: [abs(x) / self.base_voltage for x in self._node_voltages()],
+                AllBusVmag=lambda: [abs(x) for x in self._node_voltages()],
+                AllElementNames=lambda: list(self.elements),
+                # OpenDSS reports these in kW.
+                AllElementLosses=lambda: [
+                    x / 1000 for elem in self.elements.values() for x in elem["losses"]
+                ],
+                SetActiveBus=lambda x: setattr(self, "active_bus", x),
+                SetActiveElement=lambda x: setattr(self, "active_element", x),
+                SetActiveClass=lambda x: setattr(self, "active_class", x),
+            ),
+            Bus=SimpleNamespace(
+                Nodes=lambda: list(self.buses[self.active_bus]),
+                Voltages=lambda: self._flatten(self.buses[self.active_bus].values()),
+                puVmagAngle=lambda: self._mag_angle(self.base_voltage),
+                VMagAngle=lambda: self._mag_angle(1.0),
+            ),
+            ActiveClass=SimpleNamespace(First=self._first, Next=self._next),
+            CktElement=SimpleNamespace(
+                Name=lambda: self.active_element,
+                Currents=lambda: self.elements[self.active_element]["currents"],
+                Losses=lambda: self.elements[self.active_element]["losses"],
+            ),
+        )
+
+    def _node_voltages(self):
+        return [x for nodes in self.buses.values() for x in nodes.values()]
+
+    @staticmethod
+    def _flatten(values):
+        return [y for x in values for y in (x.real, x.imag)]
+
+    def _mag_angle(self, base):
+        values = []
+        for voltage in self.buses[self.active_bus].values():
+            values += [abs(voltage) / base, np.degrees(cmath.phase(voltage))]
+        return values
+
+    def _first(self):
+        self.position = 0
+        self.active_element = self.class_order[self.active_class][0]
+        return 1
+
+    def _next(self):
+        self.position += 1
+        names = self.class_order[self.active_class]
+        if self.position >= len(names):
+            return 0
+        self.active_element = names[self.position]
+        return self.position + 1
+
+
+def _flatten_values(values):
+    expected = []
+    for value in values:
+        if isinstance(value.value, list):
+            expected += value.value
+        else:
+            expected.append(value.value)
+    return expected
+
+
+def _read_buses(dss, prop, names):
+    info = dssBus.VARIABLE_OUTPUTS_BY_LABEL[prop]
+    values = []
+    for name in names:
+        dss.Circuit.SetActiveBus(name)
+        raw_value = getattr(dss.Bus, prop)()
+        values.append(ValueByLabel(name, prop, raw_value, [dss.Bus.Nodes()], info["is_complex"], info["units"]))
+    return values
+
+
+@pytest.mark.parametrize("prop", ["puVmagAngle", "VMagAngle", "Voltages"])
+def test_bulk_value_reader__buses(prop):
+    circuit = FakeCircuit()
+    dss = circuit.make_dss()
+    # Storage order differs from the node order and b2 only has phase B.
+    names = ["b3", "b2", "b1"]
+    reader = BulkValueReader(dss)
+    index = reader.create_index("Buses", prop, names, _read_buses(dss, prop, names))
+    assert index is not None
+
+    circuit.buses["b3"][1] = cmath.rect(6800, -0.2)
+    reader.clear_cache()
+    expected = _flatten_values(_read_buses(dss, prop, names))
+    assert reader.read("Buses", prop)[index] == pytest.approx(expected)
+
+
+def _read_elements(dss, prop, names, nodes):
+    values = []
+    for name in names:
+        dss.Circuit.SetActiveElement(name)
+        raw_value = getattr(dss.CktElement, prop)()
+        if prop == "Losses":
+            values.append(ValueByNumber(name, prop, complex(*raw_value)))
+        else:
+            info = dssElement.VARIABLE_OUTPUTS_BY_LABEL[prop]
+            values.append(ValueByLabel(name, prop, raw_value, nodes[name], info["is_complex"], info["units"]))
+    return values
+
+
+LINE_NODES = {
+    "Line.l1": [[1, 2, 3], [1, 2, 3]],
+    "Line.l2": [[2], [2]],
+    "Line.l3": [[1, 3], [1, 3]],
+}
+
+
+@pytest.mark.parametrize("prop", ["Currents", "Losses"])
+def test_bulk_value_reader__elements(prop):
+    circuit = FakeCircuit()
+    dss = circuit.make_dss()
+    names = ["Line.l1", "Line.l2", "Line.l3"]
+    reader = BulkValueReader(dss)
+    index = reader.create_index("Lines", prop, names, _read_elements(dss, prop, names, LINE_NODES))
+    assert index is not None
+
+    circuit.elements["Line.l1"]["currents"][4] = 20.0
+    circuit.elements["Line.l3"]["losses"] = [430.0, 80.0]
+    reader.clear_cache()
+    expected = _flatten_values(_read_elements(dss, prop, names, LINE_NODES))
+    assert reader.read("Lines", prop)[index] == pytest.approx(expected)
+
+
+def test_bulk_value_reader__mismatch():
+    dss = FakeCircuit().make_dss()
+    # Only the phase conductor of the load is stored, but the class arrays
+    # include the neutral, so the element is read individually.
+    names = ["Load.ld1"]
+    values = _read_elements(dss, "Currents", names, {"Load.ld1": [[1]]})
+    assert len(values[0].value) == 1
+    assert BulkValueReader(dss).create_index("Loads", "Currents", names, values) is None
@@ -0,0 +1,98 @@
+import datetime
+import logging
+
+import numpy as np
+import pytest
+
+from PyDSS.checkpoint import (
+    get_object_state, load_checkpoint, remove_checkpoint, save_checkpoint, set_object_state,
+)
+from PyDSS.modes.QSTS import QSTS
+
+
+class Controller:
+
+    def __init__(self, solver):
+        self.__solver = solver
+        self.__TrippedStartTime = datetime.datetime(2020, 1, 1)
+        self.EnergyCounter = [0, 1, 2]
+        self.setpoints = np.zeros(3)
+        self.update = [self.Update]
+
+    def Update(self):
+        self.EnergyCounter.append(len(self.EnergyCounter))
+
+
+def test_object_state():
+    controller = Controller(object())
+    state = get_object_state(controller)
+    assert sorted(state) == ["EnergyCounter", "_Controller__TrippedStartTime", "setpoints"]
+
+    controller.Update()
+    controller.setpoints[0] = 1.0
+    set_object_state(controller, state)
+    assert controller.EnergyCounter == [0, 1, 2]
+    assert controller.setpoints.tolist() == [0.0, 0.0, 0.0]
+    controller.Update()
+    assert state["EnergyCounter"] == [0, 1, 2]
+
+
+def test_save_checkpoint(tmp_path):
+    filename = str(tmp_path / "checkpoint.pkl")
+    assert load_checkpoint(filename) is None
+    save_checkpoint(filename, {"step": 4, "complete": False})
+    save_checkpoint(filename, {"step": 8, "complete": False})
+    assert load_checkpoint(filename) == {"step": 8, "complete": False}
+    assert [x.name for x in tmp_path.iterdir()] == ["checkpoint.pkl"]
+    remove_checkpoint(filename)
+    remove_checkpoint(filename)
+    assert load_checkpoint(filename) is None
+
+
+CIRCUIT = """Clear
+New Circuit.c basekv=12.47 bus1=src pu=1.0
+New Loadshape.ls npts=24 interval=1 mult=[0.3 0.3 0.3 0.4 0.5 0.6 0.7 0.8 0.9 1 1 0.9 0.8 0.8 0.9 1 1.1 1.2 1.1 1 0.8 0.6 0.5 0.4]
+New Line.l1 bus1=src bus2=b1 length=3 units=km
+New Load.ld bus1=b1 kW=3000 kvar=1000 kV=12.47 yearly=ls
+Set voltagebases=[12.47]
+Calcvoltagebases"""
+
+SETTINGS = {
+    "Project": {
+        "Start Year": 2020,
+        "Start Day": 2,
+        "Date offset": 0,
+        "Start Time (min)": 90.0,
+        "End Day": 2,
+        "End Time (min)": 600.0,
+        "Step resolution (sec)": 900.0,
+        "Max Control Iterations": 10,
+        "Simulation Type": "QSTS",
+    },
+}
+
+
+def _create_solver(dss):
+    for command in CIRCUIT.split("\n"):
+        dss.utils.run_command(command)
+    solver = QSTS(dss, SETTINGS, logging.getLogger(__name__))
+    solver.reSolve()
+    return solver
+
+
+def test_qsts_go_to_step():
+    dss = pytest.importorskip("opendssdirect")
+    solver = _create_solver(dss)
+    for _ in range(7):
+        solver.IncStep()
+    expected = (solver.GetDateTime(), dss.Solution.DblHour(), dss.Circuit.AllBusMagPu())
+    solver.IncStep()
+    expected_next = dss.Circuit.AllBusMagPu()
+
+    solver = _create_solver(dss)
+    solver.GoToStep(7)
+    assert solver.GetDateTime() == expected[0]
+    assert dss.Solution.DblHour() == expected[1]
+    assert dss.Circuit.AllBusMagPu() == pytest.approx(expected[2], abs=1e-6)
+    solver.IncStep()
+    assert dss.Circuit.AllBusMagPu() == pytest.approx(expected_next, abs=1e-6)
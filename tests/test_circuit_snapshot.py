@@ -0,0 +1,60 @@
+import pickle
+from types import SimpleNamespace
+
+import pytest
+
+from PyDSS.circuit_snapshot import CircuitSnapshot
+from PyDSS.exceptions import InvalidConfiguration
+
+
+class FakeCircuit:
+
+    def __init__(self, elements):
+        self.elements = elements
+        self.active = None
+        self.commands = []
+
+    def make_dss(self):
+        return SimpleNamespace(
+            Circuit=SimpleNamespace(
+                AllElementNames=lambda: list(self.elements),
+                SetActiveElement=self._set_active,
+            ),
+            Element=SimpleNamespace(AllPropertyNames=lambda: list(self.elements[self.active])),
+            Properties=SimpleNamespace(Value=lambda x: self.elements[self.active][x]),
+            utils=SimpleNamespace(run_command=self.commands.append),
+        )
+
+    def _set_active(self, name):
+        self.active = name
+
+
+def test_circuit_snapshot():
+    circuit = FakeCircuit({
+        "Capacitor.cap1": {"kvar": "600", "states": "[1]", "like": ""},
+        "Transformer.reg1": {"tap": "1.0", "like": ""},
+    })
+    snapshot = CircuitSnapshot(circuit.make_dss())
+    assert snapshot.restore() == 0
+    assert circuit.commands == []
+
+    circuit.elements["Capacitor.cap1"]["states"] = "[0]"
+    circuit.elements["Transformer.reg1"]["tap"] = "1.0125"
+    assert snapshot.restore() == 2
+    assert circuit.commands == [
+        "Edit Capacitor.cap1 states=[1]\nEdit Transformer.reg1 tap=1.0"
+    ]
+
+    circuit.elements["Load.load1"] = {"kW": "1"}
+    with pytest.raises(InvalidConfiguration):
+        snapshot.restore()
+
+
+def test_circuit_snapshot_pickle():
+    circuit = FakeCircuit({"Transformer.reg1": {"tap": "1.0125"}})
+    snapshot = pickle.loads(pickle.dumps(CircuitSnapshot(circuit.make_dss())))
+
+    circuit.elements["Transformer.reg1"]["tap"] = "1.0"
+    snapshot.attach(circuit.make_dss())
+    assert snapshot.restore() == 1
+    assert circuit.commands == ["Edit Transformer.reg1 tap=1.0125"]
@@ -0,0 +1,88 @@
+from types import SimpleNamespace
+
+from PyDSS.pyControllers.ControllerActiveSet import ControllerActiveSet
+
+
+class FakeCircuit:
+
+    def __init__(self):
+        self.elements = {"pvsystem.pv1": ["b1.1"], "pvsystem.pv2": ["b2.1"]}
+        self.voltages = [1.0, 1.0]
+        self.active = None
+
+    def make_dss(self):
+        return SimpleNamespace(
+            Circuit=SimpleNamespace(
+                AllNodeNames=lambda: ["b1.1", "b2.1"],
+                AllBusMagPu=lambda: list(self.voltages),
+                SetActiveElement=lambda x: setattr(self, "active", x.lower()),
+                SetActiveBus=lambda x: None,
+            ),
+            CktElement=SimpleNamespace(
+                Name=lambda: self.active if self.active in self.elements else "",
+                BusNames=lambda: self.elements[self.active],
+            ),
+            Bus=SimpleNamespace(Nodes=lambda: [1]),
+        )
+
+
+def _run_iteration(active_set, iteration, errors):
+    active = active_set.get_active_controllers(iteration)
+    for name, _ in active:
+        active_set.set_error(name, errors[name])
+    return [x[0] for x in active], active_set.record_iteration(0, iteration, len(active))
+
+
+def test_controller_active_set():
+    circuit = FakeCircuit()
+    controllers = {
+        "Controller.PVSystem.pv1": object(),
+        "Controller.PVSystem.pv2": object(),
+        "Controller.pyContFleet_PVSystem": object(),
+    }
+    active_set = ControllerActiveSet(controllers, circuit.make_dss(), 0.001, 0.0001)
+    errors = {"Controller.PVSystem.pv1": 0.1, "Controller.PVSystem.pv2": 0.0,
+              "Controller.pyContFleet_PVSystem": 0.0}
+
+    active, max_error = _run_iteration(active_set, 0, errors)
+    assert active == list(controllers)
+    assert max_error == 0.1
+
+    # Converged controllers without a controlled element are always updated.
+    errors["Controller.PVSystem.pv1"] = 0.0
+    active, max_error = _run_iteration(active_set, 1, errors)
+    assert active == ["Controller.PVSystem.pv1", "Controller.pyContFleet_PVSystem"]
+    assert max_error == 0.0
+
+    # pv2 converged, but the voltage at its bus changed.
+    circuit.voltages[1] = 1.01
+    active, _ = _run_iteration(active_set, 2, errors)
+    assert active == ["Controller.PVSystem.pv2", "Controller.pyContFleet_PVSystem"]
+
+    assert [x["Active controllers"] for x in active_set.statistics] == [3, 2, 2]
+    active_set.clear_statistics()
+    assert active_set.statistics == []
+
+
+def test_controller_active_set__error_at_tolerance():
+    circuit = FakeCircuit()
+    controllers = {"Controller.PVSystem.pv1": object(), "Controller.PVSystem.pv2": object()}
+    active_set = ControllerActiveSet(controllers, circuit.make_dss(), 0.001, 0.0001)
+    errors = {"Controller.PVSystem.pv1": 0.001, "Controller.PVSystem.pv2": 0.0}
+
+    # An error equal to the tolerance has not converged, so the controller
+    # stays active.
+    _, max_error = _run_iteration(active_set, 0, errors)
+    assert not active_set.has_converged(max_error)
+    active, _ = _run_iteration(active_set, 1, errors)
+    assert active == ["Controller.PVSystem.pv1"]
+
+
+def test_controller_active_set_disabled():
+    circuit = FakeCircuit()
+    controllers = {"Controller.PVSystem.pv1": object(), "Controller.PVSystem.pv2": object()}
+    active_set = ControllerActiveSet(controllers, circuit.make_dss(), 0.001, 0.0001, enabled=False)
+    errors = dict.fromkeys(controllers, 0.0)
+    for i in range(3):
+        active, _ = _run_iteration(active_set, i, errors)
+        assert active == list(controllers)
@@ -0,0 +1,36 @@
+
+import pytest
+
+from PyDSS.current_results import CurrentResults
+
+
+def test_current_results():
+    results = CurrentResults()
+    bus_columns = ["bus1__A1 [pu]", "bus1__B1 [pu]"]
+    line_columns = ["Line.one__Losses"]
+    results.add(bus_columns, [1.0, 1.01])
+    results.add(line_columns, (2 + 3j,))
+    assert len(results) == 3
+    assert list(results) == bus_columns + line_columns
+    assert results["bus1__B1 [pu]"] == 1.01
+    assert "Line.one__Losses" in results
+    assert dict(results) == {
+        "bus1__A1 [pu]": 1.0,
+        "bus1__B1 [pu]": 1.01,
+        "Line.one__Losses": 2 + 3j,
+    }
+
+    # The next time point reuses the column lists.
+    results.clear()
+    assert len(results) == 0
+    results.add(bus_columns, [0.99, 1.02])
+    results.add(line_columns, (4 + 5j,))
+    assert results["bus1__A1 [pu]"] == 0.99
+    assert results["Line.one__Losses"] == 4 + 5j
+
+    # A dataset without a value at this time point.
+    results.clear()
+    results.add(line_columns, (6 + 7j,))
+    assert results["Line.one__Losses"] == 6 + 7j
+    with pytest.raises(KeyError):
+        results["bus1__A1 [pu]"]
@@ -122,6 +122,77 @@ def test_export_moving_averages(cleanup_project):
         df1_index += window_size
 
 
+def test_export_per_class_storage_layout(cleanup_project):
+    # Data stored in per-class datasets must match per-element datasets.
+    path = CUSTOM_EXPORTS_PROJECT_PATH
+    sim_file = SIMULATION_SETTINGS_FILENAME
+    PyDssProject.run_project(path, simulation_file=sim_file)
+    df1 = PyDssResults(path).scenarios[0].get_full_dataframe("Buses", "puVmagAngle")
+    df1_t9 = _get_dataframe(path, "Buses", "puVmagAngle", "t9")
+
+    options = {"Exports": {"Export Storage Layout": "PerClass"}}
+    PyDssProject.run_project(path, options=options, simulation_file=sim_file)
+    results = PyDssResults(path)
+    scenario = results.scenarios[0]
+    group = results.hdf_store["Exports"]["scenario1"]["Buses"]
+    assert "puVmagAngle" in group
+    assert "t9" not in group
+
+    df2 = scenario.get_full_dataframe("Buses", "puVmagAngle")
+    assert len(df2) == 96
+    # Element groups are listed alphabetically; class columns are in circuit order.
+    assert sorted(df2.columns) == sorted(df1.columns)
+    assert df1.equals(df2[df1.columns])
+    assert "t9" in scenario.list_element_names("Buses")
+    assert "puVmagAngle" in scenario.list_element_properties("Buses", element_name="t9")
+    df2_t9 = _get_dataframe(path, "Buses", "puVmagAngle", "t9")
+    assert df1_t9.equals(df2_t9)
+
+    # Filtered and aggregated properties keep the per-element layout.
+    df = scenario.get_dataframe("Buses", "DistanceAvg", "t9")
+    assert len(df) == int(96 / 5)
+    normal_amps_sum = scenario.get_element_property_number("Lines", "NormalAmpsSum", "Line.pvl_110")
+    assert normal_amps_sum == 96 * 65.0
+
+
+def test_export_bulk_value_capture(cleanup_project):
+    # Values read from whole-circuit arrays must match values read by element.
+    path = CUSTOM_EXPORTS_PROJECT_PATH
+    sim_file = SIMULATION_SETTINGS_FILENAME
+    options = {"Exports": {"Export Storage Layout": "PerClass"}}
+    PyDssProject.run_project(path, options=options, simulation_file=sim_file)
+    scenario = PyDssResults(path).scenarios[0]
+    df1 = scenario.get_full_dataframe("Buses", "puVmagAngle")
+
+    options["Exports"]["Bulk Value Capture"] = True
+    PyDssProject.run_project(path, options=options, simulation_file=sim_file)
+    scenario = PyDssResults(path).scenarios[0]
+    df2 = scenario.get_full_dataframe("Buses", "puVmagAngle")
+    assert len(df2) == 96
+    assert list(df1.columns) == list(df2.columns)
+    for column in df1.columns:
+        assert (df1[column] - df2[column]).abs().max() < 1e-3
+
+
+def test_export_memmap_storage_backend(cleanup_project):
+    path = CUSTOM_EXPORTS_PROJECT_PATH
+    sim_file = SIMULATION_SETTINGS_FILENAME
+    PyDssProject.run_project(path, simulation_file=sim_file)
+    df1 = PyDssResults(path).scenarios[0].get_full_dataframe("Buses", "puVmagAngle")
+
+    options = {"Exports": {"Storage Backend": "NumPyMemmap"}}
+    PyDssProject.run_project(path, options=options, simulation_file=sim_file)
+    assert os.path.isdir(os.path.join(path, "store_memmap"))
+    assert not os.path.exists(os.path.join(path, "store.h5"))
+    scenario = PyDssResults(path).scenarios[0]
+    df2 = scenario.get_full_dataframe("Buses", "puVmagAngle")
+    assert sorted(df1.columns) == sorted(df2.columns)
+    assert len(df2) == 96
+    df = scenario.get_dataframe("Buses", "DistanceAvg", "t9")
+    assert len(df) == int(96 / 5)
+    scenario.get_element_property_number("Lines", "NormalAmpsSum", "Line.pvl_110")
+
+
 def _get_dataframe(path, elem_class, prop, name):
     results = PyDssResults(path)
     assert len(results.scenarios) == 1
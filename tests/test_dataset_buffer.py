@@ -1,12 +1,20 @@
 
 import os
+import shutil
 import tempfile
 
 import h5py
 import numpy as np
 import pandas as pd
+import pytest
 
+from PyDSS.compression import CompressionCodec, CompressionOptions
 from PyDSS.dataset_buffer import DatasetBuffer
+from PyDSS.dataset_writer import DatasetWriterThread
+from PyDSS.exceptions import InvalidConfiguration, InvalidParameter
+from PyDSS.storage_backends import StorageBackend, open_store, is_dataset, \
+    is_group
+from PyDSS.value_storage import DatasetPropertyType, ValueByNumber, ValueContainer
 
 
 def test_dataset_buffer__compute_chunk_count():
@@ -28,6 +36,19 @@ def test_dataset_buffer__compute_chunk_count():
     ) == 341
 
 
+def test_dataset_buffer__chunk_size_limits():
+    # A row wider than the chunk size still gets one row per chunk.
+    assert DatasetBuffer.compute_chunk_count(
+        num_columns=10000,
+        max_size=96,
+        dtype=np.float,
+        max_chunk_bytes=32 * 1024,
+    ) == 1
+    assert DatasetBuffer.clamp_chunk_bytes(1) == 16 * 1024
+    assert DatasetBuffer.clamp_chunk_bytes(100 * 1024) == 100 * 1024
+    assert DatasetBuffer.clamp_chunk_bytes(10 * 1024 * 1024) == 1024 * 1024
+
+
 def test_dataset_buffer__max_num_bytes():
     filename = os.path.join(tempfile.gettempdir(), "store.h5")
     try:
@@ -54,6 +75,7 @@ def test_dataset_buffer__write_value():
             assert dataset._buf_index == 2000 - dataset._chunk_size
             dataset.flush_data()
             assert dataset._buf_index == 0
+            assert dataset.flush_statistics[0] == 2
 
         with h5py.File(filename, "r") as store:
             data = store["data"][:]
@@ -70,3 +92,175 @@ def test_dataset_buffer__write_value():
     finally:
         if os.path.exists(filename):
             os.remove(filename)
+
+
+def test_dataset_buffer__write_value_background_writer():
+    filename = os.path.join(tempfile.gettempdir(), "store.h5")
+    try:
+        with h5py.File(filename, "w") as store:
+            columns = ("1", "2", "3", "4")
+            max_size = 5000
+            writer = DatasetWriterThread(max_queue_size=2)
+            dataset = DatasetBuffer(store, "data", max_size, np.float, columns, writer=writer)
+            for i in range(max_size):
+                dataset.write_value(np.ones(4) * i)
+            dataset.flush_data()
+            writer.shutdown()
+            assert not writer.is_alive
+
+        with h5py.File(filename, "r") as store:
+            assert store["data"].attrs["length"] == max_size
+            df = DatasetBuffer.to_dataframe(store["data"])
+            assert len(df) == max_size
+            for i in (0, 1023, 1024, max_size - 1):
+                assert df.iloc[i, 3] == float(i)
+    finally:
+        if os.path.exists(filename):
+            os.remove(filename)
+
+
+def test_dataset_buffer__memmap_backend():
+    path = os.path.join(tempfile.gettempdir(), "store_memmap")
+    try:
+        with open_store(path, StorageBackend.NUMPY_MEMMAP, mode="w") as store:
+            store.attrs["version"] = "1.0.1"
+            columns = ("1", "2")
+            max_size = 100
+            dataset = DatasetBuffer(
+                store, "Exports/scenario1/data", max_size, np.complex, columns
+            )
+            for i in range(max_size):
+                dataset.write_value(np.ones(2) * complex(i, 1))
+            dataset.flush_data()
+
+        with open_store(path, StorageBackend.NUMPY_MEMMAP, mode="r") as store:
+            assert store.attrs["version"] == "1.0.1"
+            assert is_group(store["Exports"]["scenario1"])
+            assert is_dataset(store["Exports/scenario1/data"])
+            assert list(store["Exports"]["scenario1"].keys()) == ["data"]
+            df = DatasetBuffer.to_dataframe(store["Exports/scenario1/data"])
+            assert list(df.columns) == list(columns)
+            assert len(df) == max_size
+            assert df.iloc[10, 1] == complex(10, 1)
+    finally:
+        if os.path.exists(path):
+            shutil.rmtree(path)
+
+
+def test_dataset_buffer__memmap_attributes(tmp_path):
+    path = str(tmp_path / "store_memmap")
+    attrs_filename = os.path.join(path, "Exports", "scenario1", "data.attrs.json")
+    with open_store(path, StorageBackend.NUMPY_MEMMAP, mode="w") as store:
+        dataset = DatasetBuffer(store, "Exports/scenario1/data", 100, np.float, ("1", "2"))
+        for _ in range(10):
+            dataset.write_value(np.ones(2))
+            dataset.flush_data()
+        # Dataset attributes are written when the store is closed.
+        assert not os.path.exists(attrs_filename)
+        assert store["Exports/scenario1/data"].attrs["length"] == 10
+
+    assert sorted(os.listdir(os.path.dirname(attrs_filename))) == ["data.attrs.json", "data.npy"]
+    with open_store(path, StorageBackend.NUMPY_MEMMAP, mode="r") as store:
+        assert store["Exports/scenario1/data"].attrs["length"] == 10
+        assert list(store["Exports/scenario1"].keys()) == ["data"]
+
+
+def test_dataset_buffer__compression_options():
+    filename = os.path.join(tempfile.gettempdir(), "store.h5")
+    try:
+        with h5py.File(filename, "w") as store:
+            for codec in (CompressionCodec.NONE, CompressionCodec.LZF, CompressionCodec.GZIP):
+                compression = CompressionOptions(codec=codec, level=6, shuffle=False)
+                dataset = DatasetBuffer(
+                    store, codec.value, 10, np.float, ("1",), compression=compression
+                )
+                for i in range(10):
+                    dataset.write_value(i + 0.123456789)
+                dataset.flush_data()
+
+        with h5py.File(filename, "r") as store:
+            assert store["none"].compression is None
+            assert store["lzf"].compression == "lzf"
+            assert store["gzip"].compression == "gzip"
+            assert store["gzip"].compression_opts == 6
+            assert not store["gzip"].shuffle
+            # Floats are stored at full precision unless scale-offset is requested.
+            assert store["gzip"][3] == 3.123456789
+    finally:
+        if os.path.exists(filename):
+            os.remove(filename)
+
+
+def test_value_container__compact_dtypes():
+    filename = os.path.join(tempfile.gettempdir(), "store.h5")
+    try:
+        with h5py.File(filename, "w") as store:
+            value = ValueByNumber("Line.one", "LoadingPercent", 1.5)
+            container = ValueContainer(
+                value, store, "single", 10, DatasetPropertyType.ELEMENT_PROPERTY,
+                single_precision=True,
+            )
+            container.append(value)
+            container.flush_data()
+            assert container.max_num_bytes() == 40
+            assert container.max_num_bytes(full_precision=True) == 80
+
+            container = ValueContainer(
+                value, store, "int16", 10, DatasetPropertyType.ELEMENT_PROPERTY,
+                dtype="int16",
+            )
+            assert container.max_num_bytes(full_precision=True) == 80
+
+            value = ValueByNumber("Line.one", "Losses", complex(1, 2))
+            with pytest.raises(InvalidConfiguration):
+                ValueContainer(
+                    value, store, "complex", 10, DatasetPropertyType.ELEMENT_PROPERTY,
+                    dtype="float32",
+                )
+            container = ValueContainer(
+                value, store, "complex", 10, DatasetPropertyType.ELEMENT_PROPERTY,
+                single_precision=True,
+            )
+            assert container.max_num_bytes() == 80
+
+        with h5py.File(filename, "r") as store:
+            assert store["single"].dtype == np.float32
+            assert store["single"][0] == 1.5
+            assert store["int16"].dtype == np.int16
+            assert store["complex"].dtype == np.complex64
+    finally:
+        if os.path.exists(filename):
+            os.remove(filename)
+
+
+def test_value_container__resume(tmp_path):
+    filename = tmp_path / "store.h5"
+    value = ValueByNumber("Line.one", "Losses", 1.0)
+    with h5py.File(filename, "w") as store:
+        container = ValueContainer(
+            value, store, "Exports/s1/Lines/one/Losses", 10, DatasetPropertyType.ELEMENT_PROPERTY,
+            store_timestamp=True,
+        )
+        for i in range(5):
+            container.append_row(float(i), timestamp=float(i))
+        container.flush_data()
+        lengths = container.get_dataset_lengths()
+        assert lengths == {"Exports/s1/Lines/one/Losses": 5, "Exports/s1/Lines/one/LossesTimestamp": 5}
+
+    # Rows written after the checkpoint are overwritten.
+    lengths = {x: 3 for x in lengths}
+    with h5py.File(filename, "a") as store:
+        with pytest.raises(InvalidParameter):
+            ValueContainer(value, store, "Exports/s1/Lines/one/Losses", 10, DatasetPropertyType.ELEMENT_PROPERTY)
+        container = ValueContainer(
+            value, store, "Exports/s1/Lines/one/Losses", 10, DatasetPropertyType.ELEMENT_PROPERTY,
+            store_timestamp=True, resume_lengths=lengths,
+        )
+        container.append_row(10.0, timestamp=10.0)
+        container.flush_data()
+
+    with h5py.File(filename, "r") as store:
+        dataset = store["Exports/s1/Lines/one/Losses"]
+        assert dataset.attrs["length"] == 4
+        assert DatasetBuffer.to_dataframe(dataset).iloc[:, 0].tolist() == [0.0, 1.0, 2.0, 10.0]
+        assert store["Exports/s1/Lines/one/LossesTimestamp"][3] == 10.0
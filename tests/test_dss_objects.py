@@ -0,0 +1,69 @@
+from types import SimpleNamespace
+
+from PyDSS.dssBus import dssBus
+from PyDSS.dssCircuit import dssCircuit
+from PyDSS.dssElement import dssElement
+from PyDSS.dssObjectBase import (
+    get_active_object_cache, get_value_cache, invalidate_active_objects, invalidate_solution
+)
+from PyDSS.dssTransformer import dssTransformer
+
+
+def test_dss_objects_have_no_instance_dict():
+    # A __dict__ would be created if any class in the hierarchy lacked __slots__.
+    for cls in (dssBus, dssCircuit, dssElement, dssTransformer):
+        assert cls.__dictoffset__ == 0, cls.__name__
+
+
+def _make_elements(dss, names, reads):
+    elements = []
+    for name in names:
+        # Bypass the constructor, which reads the circuit.
+        element = dssElement.__new__(dssElement)
+        element._Name = name.split(".")[1]
+        element._FullName = name
+        element._dssInstance = dss
+        element._Variables = {"kW": lambda name=name: reads.append(name) or 1.0}
+        element._ActiveObjects = get_active_object_cache(dss)
+        element._Values = get_value_cache(dss)
+        elements.append(element)
+    return elements
+
+
+def _make_dss(activated):
+    return SimpleNamespace(
+        Circuit=SimpleNamespace(SetActiveElement=activated.append),
+        CktElement=SimpleNamespace(Name=lambda: activated[-1]),
+        Element=SimpleNamespace(Name=lambda: activated[-1]),
+    )
+
+
+def test_active_object_cache():
+    activated = []
+    dss = _make_dss(activated)
+    one, two = _make_elements(dss, ("Load.one", "Load.two"), [])
+    one.SetActiveObject()
+    one.SetActiveObject()
+    assert activated == ["Load.one"]
+    two.SetActiveObject()
+    one.SetActiveObject()
+    assert activated == ["Load.one", "Load.two", "Load.one"]
+    invalidate_active_objects(dss)
+    one.SetActiveObject()
+    assert activated == ["Load.one", "Load.two", "Load.one", "Load.one"]
+
+
+def test_value_cache():
+    activated = []
+    reads = []
+    dss = _make_dss(activated)
+    one, two = _make_elements(dss, ("Load.one", "Load.two"), reads)
+    assert one.GetVariable("kW") == 1.0
+    assert two.GetVariable("kW") == 1.0
+    assert one.GetVariable("kW") == 1.0
+    assert reads == ["Load.one", "Load.two"]
+    assert activated == ["Load.one", "Load.two"]
+
+    invalidate_solution(dss)
+    assert one.GetVariable("kW") == 1.0
+    assert reads == ["Load.one", "Load.two", "Load.one"]
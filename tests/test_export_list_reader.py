@@ -118,3 +118,26 @@ def test_export_list_reader__window_size():
     )
     assert prop.window_size == 75
     assert prop.moving_average_store_interval == 50
+
+
+def test_export_list_reader__scale_offset():
+    export_prop = ExportListProperty("Buses", {"property": "puVmagAngle"})
+    assert export_prop.scale_offset is None
+    export_prop = ExportListProperty("Buses", {"property": "puVmagAngle", "scale_offset": 3})
+    assert export_prop.scale_offset == 3
+    assert export_prop.serialize()["scale_offset"] == 3
+
+    with pytest.raises(InvalidConfiguration):
+        ExportListProperty("Buses", {"property": "puVmagAngle", "scale_offset": -1})
+
+
+def test_export_list_reader__dtype():
+    export_prop = ExportListProperty("Buses", {"property": "puVmagAngle"})
+    assert export_prop.dtype is None
+    assert "dtype" not in export_prop.serialize()
+    export_prop = ExportListProperty("Buses", {"property": "puVmagAngle", "dtype": "float32"})
+    assert export_prop.dtype == "float32"
+    assert export_prop.serialize()["dtype"] == "float32"
+
+    with pytest.raises(InvalidConfiguration):
+        ExportListProperty("Buses", {"property": "puVmagAngle", "dtype": "float16"})
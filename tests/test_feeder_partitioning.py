@@ -0,0 +1,157 @@
+import h5py
+import numpy as np
+import pytest
+
+from PyDSS.feeder_partitioning import (
+    BOUNDARY_LOAD, BoundaryCoordinator, FeederPartition, find_feeder_partitions, read_boundary_voltage,
+)
+from PyDSS.exceptions import InvalidParameter
+from PyDSS.storage_backends import merge_hdf_stores
+from PyDSS.value_storage import get_class_columns, get_element_column_ranges, write_class_metadata
+
+
+CIRCUIT = """Clear
+New Circuit.sub basekv=115 bus1=src pu=1.02 MVAsc3=2000 MVAsc1=2000
+New Transformer.subxf phases=3 windings=2 buses=[src, sb] conns=[delta wye] kvs=[115 12.47] kvas=[20000 20000] XHL=8
+New RegControl.ltc transformer=subxf winding=2 vreg=122 band=2 ptratio=60
+New Capacitor.subcap bus1=sb kvar=600 kv=12.47
+New Line.f1a bus1=sb bus2=f1_1 length=1 units=km
+New Line.f1b bus1=f1_1 bus2=f1_2 length=1 units=km
+New Load.l1 bus1=f1_2 kW=3000 kvar=1000 kV=12.47
+New PVSystem.pv1 bus1=f1_2 kVA=500 Pmpp=500 kV=12.47 irradiance=1
+New EnergyMeter.m1 element=Line.f1a
+New Line.f2a bus1=sb bus2=f2_1 length=1 units=km
+New Transformer.t2 phases=1 buses=[f2_1.1 f2_lv.1.2] kvs=[7.2 0.24] kvas=[50 50]
+New Load.l2 bus1=f2_lv.1.2 phases=1 kW=30 kV=0.24
+New Capacitor.c2 bus1=f2_1 kvar=300 kv=12.47
+New CapControl.cc2 capacitor=c2 element=Line.f2a type=voltage ON=120 OFF=125 ptratio=60
+New Line.f3a bus1=sb bus2=f3_1 length=2 units=km
+New Load.l3 bus1=f3_1 kW=1000 kvar=200 kV=12.47
+Set voltagebases=[115 12.47 0.24]
+Calcvoltagebases
+Solve"""
+
+
+class Solver:
+
+    def __init__(self, dss):
+        self.dss = dss
+
+    def reSolve(self):
+        self.dss.Solution.SolveNoControl()
+
+
+@pytest.fixture
+def dss():
+    dss = pytest.importorskip("opendssdirect")
+    for command in CIRCUIT.split("\n"):
+        dss.utils.run_command(command)
+    return dss
+
+
+def _read_voltages(dss):
+    return dict(zip(dss.Circuit.AllNodeNames(), dss.Circuit.AllBusMagPu()))
+
+
+def test_find_feeder_partitions(dss):
+    partitions = find_feeder_partitions(dss, 2)
+    assert partitions.split_bus == "sb"
+    assert partitions.base_kv == pytest.approx(12.47, rel=1e-3)
+    assert sorted(partitions.upstream) == ["Capacitor.subcap", "RegControl.ltc", "Transformer.subxf", "Vsource.source"]
+    # The smallest feeder is added to the smallest partition.
+    assert sorted(partitions.partitions[0]) == [
+        "EnergyMeter.m1", "Line.f1a", "Line.f1b", "Line.f3a", "Load.l1", "Load.l3", "PVSystem.pv1",
+    ]
+    assert sorted(partitions.partitions[1]) == ["CapControl.cc2", "Capacitor.c2", "Line.f2a", "Load.l2", "Transformer.t2"]
+    assert find_feeder_partitions(dss, 4).num_partitions == 3
+    assert "Vsource.source" not in partitions.get_disabled_elements(0)
+    assert "Line.f1a" in partitions.get_disabled_elements()
+
+
+def test_feeder_partitions_match_circuit(dss):
+    expected = _read_voltages(dss)
+    partitions = find_feeder_partitions(dss, 2, split_bus="SB")
+    voltage = list(read_boundary_voltage(dss, "sb")) + [0.0]
+
+    powers = [0.0] * 4
+    for index in range(partitions.num_partitions):
+        for command in CIRCUIT.split("\n"):
+            dss.utils.run_command(command)
+        partition = FeederPartition(partitions, index, powers, voltage, None)
+        partition.isolate(dss)
+        dss.Solution.SolveNoControl()
+        kw, kvar = dss.Circuit.TotalPower()[:2]
+        powers[2 * index], powers[2 * index + 1] = -kw, -kvar
+        actual = _read_voltages(dss)
+        assert "src.1" not in actual
+        # The equivalent source is balanced; the split bus voltages are slightly unbalanced.
+        for node, value in actual.items():
+            assert value == pytest.approx(expected[node], abs=1e-3), node
+
+    # The upstream circuit with the boundary load has the same split bus voltage.
+    for command in CIRCUIT.split("\n"):
+        dss.utils.run_command(command)
+    coordinator = BoundaryCoordinator(dss, Solver(dss), partitions, powers, voltage, None, 1e-4, 10)
+    coordinator.isolate()
+    dss.Loads.Name(BOUNDARY_LOAD)
+    dss.Loads.kW(powers[0] + powers[2])
+    dss.Loads.kvar(powers[1] + powers[3])
+    dss.Solution.SolveNoControl()
+    pu, angle = read_boundary_voltage(dss, "sb")
+    assert pu == pytest.approx(voltage[0], abs=1e-3)
+    assert angle == pytest.approx(voltage[1], abs=0.05)
+
+
+def test_feeder_partition_bus_names(dss):
+    partitions = find_feeder_partitions(dss, 2)
+    for index, expected in enumerate((["sb", "f1_1", "f1_2", "f3_1"], ["sb", "f2_1", "f2_lv"])):
+        for command in CIRCUIT.split("\n"):
+            dss.utils.run_command(command)
+        partition = FeederPartition(partitions, index, [0.0] * 4, [1.0, 0.0, 0.0], None)
+        partition.isolate(dss)
+        # The registries are created from the bus names before the first solve.
+        names = partition.filter_bus_names(dss.Circuit.AllBusNames())
+        assert sorted(names) == sorted(expected)
+        dss.Solution.SolveNoControl()
+        assert sorted(dss.Circuit.AllBusNames()) == sorted(expected)
+
+
+def _write_store(filename, loads):
+    with h5py.File(filename, "w") as store:
+        store["Exports/s1/Timestamp"] = np.arange(3.0)
+        store["Exports/s1/Timestamp"].attrs["columns"] = ["Timestamp"]
+        for name in loads:
+            store[f"Exports/s1/Loads/{name}/Powers"] = np.ones(3)
+            store[f"Exports/s1/Loads/{name}/Powers"].attrs["columns"] = [f"{name}__Powers"]
+        # The split bus is exported by every partition.
+        buses = {"sb": 1.0, **{f"bus_{x}": float(x[1:]) for x in loads}}
+        dataset = store.create_dataset("Exports/s1/Buses/puVmagAngle", data=np.array([list(buses.values())] * 3))
+        dataset.attrs["columns"] = [f"{x}__pu" for x in buses]
+        path = "Exports/s1/Buses/Distance"
+        store.create_dataset(path, data=np.array([list(buses.values())] * 3))
+        write_class_metadata(store, path, [f"{x}__Distance" for x in buses], list(buses), [(i, 1) for i in range(len(buses))])
+
+
+def test_merge_hdf_stores(tmp_path):
+    filenames = [str(tmp_path / "p0.h5"), str(tmp_path / "p1.h5")]
+    _write_store(filenames[0], ["l2"])
+    _write_store(filenames[1], ["l3", "l4"])
+
+    with h5py.File(tmp_path / "store.h5", "w") as store:
+        merge_hdf_stores(store, filenames)
+    with h5py.File(tmp_path / "store.h5", "r") as store:
+        assert list(store["Exports/s1/Loads"]) == ["l2", "l3", "l4"]
+        assert isinstance(store.get("Exports/s1/Loads/l3/Powers", getlink=True), h5py.ExternalLink)
+        assert store["Exports/s1/Timestamp"][1] == 1.0
+        dataset = store["Exports/s1/Buses/puVmagAngle"]
+        assert list(dataset.attrs["columns"]) == ["sb__pu", "bus_l2__pu", "bus_l3__pu", "bus_l4__pu"]
+        assert dataset[0].tolist() == [1.0, 2.0, 3.0, 4.0]
+        group = store["Exports/s1/Buses"]
+        assert get_element_column_ranges(group, "Distance") == {
+            "sb": (0, 1), "bus_l2": (1, 1), "bus_l3": (2, 1), "bus_l4": (3, 1),
+        }
+        assert get_class_columns(group, "Distance")[3] == "bus_l4__Distance"
+        assert group["Distance"][0].tolist() == [1.0, 2.0, 3.0, 4.0]
+
+        with pytest.raises(InvalidParameter):
+            merge_hdf_stores(store, filenames[:1])
@@ -0,0 +1,63 @@
+import os
+from types import SimpleNamespace
+
+import toml
+
+from PyDSS.Extensions.MonteCarlo import MonteCarloSim
+
+
+class FakeElement:
+
+    def __init__(self, kva):
+        self.params = {"kVA": kva}
+
+    def GetParameter(self, Param):
+        return self.params[Param]
+
+
+def _make_sim(tmp_path, seed, elements, commands):
+    mc_dir = tmp_path / "scenario1" / "Monte_Carlo"
+    os.makedirs(mc_dir)
+    mc_settings = {
+        "PV_kVA": {
+            "Class": "PVSystems",
+            "Property": "kVA",
+            "Distribution": "norm",
+            "Parameters": "[10,0.1]",
+            "useWildCard": False,
+            "Wildcard": "",
+            "isList": False,
+            "ListLength": 0,
+            "isInteger": False,
+        },
+    }
+    with open(mc_dir / "MonteCarloSettings.toml", "w") as f_out:
+        toml.dump(mc_settings, f_out)
+
+    settings = {
+        "Logging": {"Pre-configured logging": True},
+        "MonteCarlo": {"Random Seed": seed},
+        "Project": {"Active Scenario": "scenario1"},
+    }
+    dss = SimpleNamespace(utils=SimpleNamespace(run_command=commands.append))
+    return MonteCarloSim(settings, {"Import": str(tmp_path)}, {}, {"PVSystems": elements}, dss)
+
+
+def test_monte_carlo_samples_are_reproducible(tmp_path):
+    elements = {"PVSystem.pv1": FakeElement(5.0), "PVSystem.pv2": FakeElement(6.0)}
+    commands = []
+    sim = _make_sim(tmp_path, 7, elements, commands)
+    sim.Create_Scenario(0)
+    sim.Create_Scenario(1)
+    sim.Create_Scenario(0)
+
+    # Each scenario applies its edits with one command.
+    assert len(commands) == 3
+    sample0, sample1, sample0_again = [x.split("\n") for x in commands]
+    assert sample0 == sample0_again
+    assert sample0 != sample1
+    assert [x.split("=")[0] for x in sample0] == \
+        ["Edit PVSystem.pv1 kVA", "Edit PVSystem.pv2 kVA"]
+
+    sim.Restore_Baseline()
+    assert commands[-1] == "Edit PVSystem.pv1 kVA=5.0\nEdit PVSystem.pv2 kVA=6.0"
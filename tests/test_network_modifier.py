@@ -0,0 +1,39 @@
+from types import SimpleNamespace
+
+from PyDSS.NetworkModifier import ParameterBatch
+
+
+class FakeLoads:
+
+    def __init__(self):
+        self.name = None
+        self.values = {}
+
+    def Name(self, name):
+        self.name = name
+
+    def kW(self, value):
+        self.values[self.name] = value
+
+
+def test_parameter_batch():
+    commands = []
+    loads = FakeLoads()
+    dss = SimpleNamespace(Loads=loads, utils=SimpleNamespace(run_command=commands.append))
+    batch = ParameterBatch(dss)
+    batch.add("Load.load1", "kW", 1.0)
+    batch.add("Load.load2", "kW", "2.5")
+    batch.add("Load.load1", "kW", 3.0)
+    batch.add("Load.load2", "kvar", 1.0)
+    batch.add("Load.load2", "kW", "[1 2]")
+    batch.add("PVSystem.pv1", "Pmpp", 10.0)
+    assert len(batch) == 4
+
+    assert batch.apply() == 4
+    assert len(batch) == 0
+    # The last edit of a parameter wins.
+    assert loads.values == {"load1": 3.0}
+    # Setters that don't exist and non-numeric values are sent as one command.
+    assert commands == [
+        "Edit Load.load2 kW=[1 2]\nEdit Load.load2 kvar=1.0\nEdit PVSystem.pv1 Pmpp=10.0"
+    ]
@@ -0,0 +1,27 @@
+from PyDSS.object_registry import LazyObjectRegistry
+
+
+def test_lazy_object_registry():
+    created = []
+
+    def factory(name):
+        created.append(name)
+        return name.upper()
+
+    registry = LazyObjectRegistry(factory, ["Load.a", "Load.b", "Line.c"])
+    loads = registry.view(["Load.a", "Load.b"])
+    assert len(registry) == 3
+    assert list(loads) == ["Load.a", "Load.b"]
+    assert "Line.c" in registry
+    assert "Line.c" not in loads
+    assert registry.num_created == 0
+
+    assert loads["Load.b"] == "LOAD.B"
+    assert registry["Load.b"] == "LOAD.B"
+    assert created == ["Load.b"]
+    assert registry.num_created == 1
+
+    loads["Load.d"] = "added"
+    assert registry["Load.d"] == "added"
+    assert dict(loads.items()) == {"Load.a": "LOAD.A", "Load.b": "LOAD.B", "Load.d": "added"}
+    assert created == ["Load.b", "Load.a"]
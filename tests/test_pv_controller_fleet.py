@@ -0,0 +1,190 @@
+import copy
+from types import SimpleNamespace
+
+import pytest
+
+from PyDSS.pyControllers.Controllers.PvController import PvController
+from PyDSS.pyControllers.PvControllerFleet import create_pv_controller_fleets
+
+
+SETTINGS = {
+    "Control1": "None",
+    "Control2": "VVar",
+    "Control3": "None",
+    "pf": 1,
+    "pfMin": 0.8,
+    "pfMax": 1,
+    "Pmin": 0,
+    "Pmax": 1,
+    "uMin": 0.94,
+    "uDbMin": 0.97,
+    "uDbMax": 1.03,
+    "uMax": 1.06,
+    "QlimPU": 0.44,
+    "PFlim": 0.9,
+    "Enable PF limit": False,
+    "uMinC": 1.06,
+    "uMaxC": 1.1,
+    "PminVW": 10,
+    "VWtype": "Rated Power",
+    "%UCutoff": 1.05,
+    "%PCutin": 10,
+    "%PCutout": 10,
+    "Efficiency": 100,
+    "Priority": "Var",
+    "DampCoef": 0.8,
+}
+
+
+class FakeCircuit:
+    """Three single-phase PVSystems on buses with different voltages."""
+
+    def __init__(self):
+        self.pvs = {
+            "pvsystem.pv1": {"bus": "b1", "P": -8.0, "Q": 0.0, "voltage": 0.95},
+            "pvsystem.pv2": {"bus": "b2", "P": -8.0, "Q": 1.0, "voltage": 1.0},
+            "pvsystem.pv3": {"bus": "b3", "P": -8.0, "Q": -1.0, "voltage": 1.08},
+            "pvsystem.pv4": {"bus": "b3", "P": -0.5, "Q": 0.0, "voltage": 1.08},
+        }
+        for pv in self.pvs.values():
+            pv.update({"kv": 0.24, "kVA": 10.0, "Pmpp": 10.0, "kVARlimit": 5.0, "pf": 1.0, "pctPmpp": 100.0})
+        self.names = list(self.pvs)
+        self.position = 0
+        self.active_bus = None
+
+    def make_dss(self):
+        return SimpleNamespace(
+            PVsystems=SimpleNamespace(
+                First=self._first,
+                Next=self._next,
+                Name=self._name,
+                pf=lambda value=None: self._property("pf", value),
+                pctPmpp=lambda value=None: self._property("pctPmpp", value),
+            ),
+            CktElement=SimpleNamespace(
+                Powers=lambda: [self._active["P"], self._active["Q"]],
+                BusNames=lambda: [self._active["bus"] + ".1"],
+            ),
+            Circuit=SimpleNamespace(
+                AllNodeNames=lambda: ["b1.1", "b2.1", "b3.1"],
+                AllBusMagPu=self._bus_voltages,
+                SetActiveBus=lambda x: setattr(self, "active_bus", x),
+            ),
+            Bus=SimpleNamespace(Nodes=lambda: [1]),
+            utils=SimpleNamespace(run_command=self._run_command),
+        )
+
+    @property
+    def _active(self):
+        return self.pvs[self.names[self.position]]
+
+    def _first(self):
+        self.position = 0
+        return 1
+
+    def _next(self):
+        self.position += 1
+        if self.position == len(self.names):
+            return 0
+        return self.position + 1
+
+    def _name(self, value=None):
+        if value is None:
+            return self.names[self.position].split(".")[1]
+        self.position = self.names.index("pvsystem." + value.lower())
+
+    def _property(self, name, value):
+        if value is None:
+            return self._active[name]
+        self._active[name] = value
+
+    def _bus_voltages(self):
+        voltages = {x["bus"]: x["voltage"] for x in self.pvs.values()}
+        return [voltages["b1"], voltages["b2"], voltages["b3"]]
+
+    def _run_command(self, command):
+        for line in command.split("\n"):
+            _, name, assignment = line.split(" ")
+            param, value = assignment.split("=")
+            self.pvs[name.lower()][param] = float(value)
+
+
+class FakeBus:
+
+    def __init__(self, pv):
+        self.pv = pv
+
+    def GetVariable(self, VarName):
+        assert VarName == "puVmagAngle"
+        return [self.pv["voltage"], 0.0]
+
+
+class FakePvElement:
+
+    def __init__(self, name, pv):
+        self.name = name
+        self.pv = pv
+        self.sBus = [FakeBus(pv)]
+
+    def GetInfo(self):
+        return self.name.split(".")
+
+    def GetParameter(self, Param):
+        return self.pv[Param]
+
+    def SetParameter(self, Param, Value):
+        self.pv[Param] = float(Value)
+        return self.pv[Param]
+
+    def GetVariable(self, VarName):
+        assert VarName == "Powers"
+        return [self.pv["P"], self.pv["Q"]]
+
+
+def _make_elements(circuit):
+    return {
+        "PVSystem." + x.split(".")[1]: FakePvElement("PVSystem." + x.split(".")[1], pv)
+        for x, pv in circuit.pvs.items()
+    }
+
+
+@pytest.mark.parametrize("control", ["VVar", "VW", "Cutoff"])
+def test_pv_controller_fleet_matches_pv_controllers(control):
+    settings = dict(SETTINGS, Control2=control)
+    expected = FakeCircuit()
+    elements = _make_elements(expected)
+    controllers = [PvController(x, settings, None, elements, None) for x in elements.values()]
+    expected_errors = [x.Update(1, 0, False) for x in controllers]
+
+    actual = FakeCircuit()
+    elements = _make_elements(actual)
+    fleets = create_pv_controller_fleets(
+        {x: copy.deepcopy(settings) for x in elements}, elements, actual.make_dss(), None, 0.0
+    )
+    assert len(fleets) == 1
+    error = fleets[0].Update(1, 0, False)
+
+    assert error == pytest.approx(max(expected_errors))
+    for name in expected.names:
+        for param in ("pf", "pctPmpp"):
+            assert actual.pvs[name][param] == pytest.approx(expected.pvs[name][param]), (name, param)
+
+
+def test_pv_controller_fleet_skips_unchanged_setpoints():
+    circuit = FakeCircuit()
+    elements = _make_elements(circuit)
+    dss = circuit.make_dss()
+    commands = []
+    run_command = dss.utils.run_command
+    dss.utils.run_command = lambda x: commands.append(x) or run_command(x)
+    fleet, = create_pv_controller_fleets(
+        {x: dict(SETTINGS, Control2="Cutoff") for x in elements}, elements, dss, None, 1e-4
+    )
+    assert fleet.Update(1, 0, False) > 0
+    written = {x: dict(y) for x, y in circuit.pvs.items()}
+
+    # pv3 and pv4 are tripped again, but their setpoints have not changed.
+    circuit.pvs["pvsystem.pv3"]["pctPmpp"] = 50.0
+    assert fleet.Update(1, 0, False) == 0
+    assert circuit.pvs["pvsystem.pv3"]["pctPmpp"] == 50.0
+    assert {x: y["pf"] for x, y in circuit.pvs.items()} == {x: y["pf"] for x, y in written.items()}
@@ -37,3 +37,17 @@ def test_pv_reports(cleanup_project):
 
     pv_curtailment = results.read_report("PV Curtailment")
     assert isinstance(pv_curtailment, pd.DataFrame)
+
+
+def test_pv_reports_parallel_scenarios(cleanup_project):
+    PyDssProject.run_project(
+        PV_REPORTS_PROJECT_PATH,
+        simulation_file=SIMULATION_SETTINGS_FILENAME,
+        num_workers=2,
+    )
+    assert os.path.exists(os.path.join(PV_REPORTS_PROJECT_PATH, "store_scenarios", "pf1.h5"))
+    results = PyDssResults(PV_REPORTS_PROJECT_PATH)
+    assert sorted(x.name for x in results.scenarios) == ["control_mode", "pf1"]
+
+    pv_clipping = results.read_report("PV Clipping")
+    assert len(pv_clipping["pv_systems"]) == 5
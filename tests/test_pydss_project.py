@@ -5,6 +5,7 @@ import re
 import shutil
 import tempfile
 
+import h5py
 import pandas as pd
 import pytest
 
@@ -186,3 +187,80 @@ def run_test_project_by_property(tar_project, zip_project):
     assert isinstance(df, pd.DataFrame)
 
     cap_changes = scenario.read_capacitor_changes()
+
+
+def _create_circuit_project(path, scenario_names=(SCENARIO_NAME,), commands=()):
+    from tests.test_feeder_partitioning import CIRCUIT
+    scenarios = [PyDssScenario(x) for x in scenario_names]
+    project = PyDssProject.create_project(str(path), "circuit", scenarios)
+    with open(os.path.join(project.dss_files_path, "Master.dss"), "w") as f_out:
+        for command in CIRCUIT.split("\n") + list(commands):
+            if command not in ("Clear", "Solve"):
+                f_out.write(command + "\n")
+    return project
+
+
+def test_run_project_feeder_partitioning(tmp_path):
+    project = _create_circuit_project(tmp_path)
+    options = {
+        "Project": {"Feeder Partitioning": True, "End Time (min)": 59.0},
+        "Exports": {"Result Container": "ResultData", "Export Elements": False, "Export Event Log": False},
+    }
+    PyDssProject.run_project(project.project_path, options=options)
+    results = PyDssResults(project.project_path)
+    scenario = results.scenarios[0]
+    # Each worker only exports the buses of its feeders.
+    names = scenario.list_element_names("Buses", "puVmagAngle")
+    assert sorted(names) == ["f1_1", "f1_2", "f2_1", "f2_lv", "f3_1", "sb"]
+    for name in names:
+        df = scenario.get_dataframe("Buses", "puVmagAngle", name)
+        assert len(df) == 4
+        assert (df.iloc[:, 0] > 0.9).all()
+
+
+def _run_monte_carlo_samples(project, samples, filename):
+    from PyDSS.pyDSS import instance
+    inst = instance()
+    settings = inst.update_scenario_settings(project.simulation_config)
+    settings["Project"]["Active Scenario"] = SCENARIO_NAME
+    dss = inst.create_dss_instance(settings)
+    path = "Exports/{}_MC{}/Buses/f1_2/puVmagAngle"
+    with h5py.File(filename, "w") as store:
+        project.hdf_store = store
+        for sample in samples:
+            dss.RunMCsample(project, project.get_scenario(SCENARIO_NAME), sample)
+        project.hdf_store = None
+        return {x: store[path.format(SCENARIO_NAME, x)][0].tolist() for x in samples}
+
+
+def test_monte_carlo_first_step_is_independent_of_sample_order(tmp_path):
+    path = _create_circuit_project(tmp_path).project_path
+    options = {
+        "Logging": {"Pre-configured logging": True},
+        "Project": {"End Time (min)": 59.0},
+        "Exports": {"Result Container": "ResultData", "Export Elements": False, "Export Event Log": False},
+    }
+    project = PyDssProject.load_project(path, options=options)
+    # Samples replace the kVA of the PV system.
+    forward = _run_monte_carlo_samples(project, [0, 1], tmp_path / "forward.h5")
+    backward = _run_monte_carlo_samples(project, [1, 0], tmp_path / "backward.h5")
+    for sample in (0, 1):
+        assert forward[sample] == pytest.approx(backward[sample], abs=1e-9)
+
+
+def test_run_project_reuse_compiled_circuit(tmp_path):
+    commands = [
+        "New Loadshape.ls1 npts=4 sinterval=900 mult=[1.0 0.8 0.6 0.4]",
+        "Edit Load.l1 yearly=ls1",
+    ]
+    project = _create_circuit_project(tmp_path, ("scenario1", "scenario2"), commands)
+    options = {
+        "Project": {"Reuse Compiled Circuit": True, "End Time (min)": 59.0},
+        "Exports": {"Result Container": "ResultData", "Export Elements": False, "Export Event Log": False},
+    }
+    PyDssProject.run_project(project.project_path, options=options)
+    results = PyDssResults(project.project_path)
+    # The second scenario starts from the circuit of the first one.
+    compiled, reused = (x.get_dataframe("Buses", "puVmagAngle", "f1_2") for x in results.scenarios)
+    assert reused.iloc[0].values == pytest.approx(compiled.iloc[0].values, abs=1e-9)
+    assert reused.values == pytest.approx(compiled.values, abs=1e-9)
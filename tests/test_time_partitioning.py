@@ -0,0 +1,105 @@
+import h5py
+import numpy as np
+import pytest
+
+from PyDSS.exceptions import InvalidParameter
+from PyDSS.storage_backends import concatenate_hdf_stores
+from PyDSS.time_partitioning import get_time_partitions
+from PyDSS.value_storage import get_class_columns, write_class_metadata
+
+
+def _make_settings():
+    return {
+        "Project": {
+            "Start Day": 2,
+            "Start Time (min)": 60.0,
+            "End Day": 4,
+            "End Time (min)": 60.0,
+            "Step resolution (sec)": 900.0,
+        },
+    }
+
+
+def test_get_time_partitions():
+    settings = _make_settings()
+    # Two days of 15-minute steps
+    partitions = get_time_partitions(settings, 192, 3, 120.0)
+    assert [x.num_steps for x in partitions] == [64, 72, 72]
+    assert [x.warmup_steps for x in partitions] == [0, 8, 8]
+    assert settings == _make_settings()
+
+    first, second, third = (x.settings["Project"] for x in partitions)
+    assert (first["Start Day"], first["Start Time (min)"]) == (2, 60.0)
+    assert (first["End Day"], first["End Time (min)"]) == (2, 1020.0)
+    # 64 steps after the start less two hours of warm-up
+    assert (second["Start Day"], second["Start Time (min)"]) == (2, 900.0)
+    assert (second["End Day"], second["End Time (min)"]) == (3, 540.0)
+    assert (third["End Day"], third["End Time (min)"]) == (4, 60.0)
+
+    # The warm-up does not start before the simulation.
+    partitions = get_time_partitions(settings, 4, 8, 120.0)
+    assert [(x.warmup_steps, x.num_steps) for x in partitions] == [(0, 1), (1, 2), (2, 3), (3, 4)]
+
+
+def _write_store(filename, start, length):
+    with h5py.File(filename, "w") as store:
+        dataset = store.create_dataset("Exports/s1/Timestamp", data=np.arange(start, start + length + 2.0))
+        dataset.attrs["columns"] = ["Timestamp"]
+        dataset.attrs["length"] = length
+        dataset = store.create_dataset("Exports/s1/Loads/l1/Powers", data=np.ones((length, 2)) * start)
+        dataset.attrs["columns"] = ["l1__P", "l1__Q"]
+        dataset = store.create_dataset("Exports/s1/Loads/l1/SumPowers", data=np.array([start]))
+        dataset.attrs["type"] = "number"
+        dataset = store.create_dataset("Exports/s1/Loads/kW", data=np.ones((length, 2)) * start)
+        dataset.attrs["length"] = length
+        write_class_metadata(store, "Exports/s1/Loads/kW", ["l1__kW", "l2__kW"], ["l1", "l2"], [(0, 1), (1, 1)])
+
+
+def test_concatenate_hdf_stores(tmp_path):
+    filenames = [str(tmp_path / "t0.h5"), str(tmp_path / "t1.h5")]
+    _write_store(filenames[0], 0.0, 3)
+    _write_store(filenames[1], 3.0, 2)
+
+    with h5py.File(tmp_path / "store.h5", "w") as store:
+        concatenate_hdf_stores(store, filenames)
+        timestamps = store["Exports/s1/Timestamp"]
+        assert timestamps[:].tolist() == [0.0, 1.0, 2.0, 3.0, 4.0]
+        assert timestamps.attrs["length"] == 5
+        assert list(timestamps.attrs["columns"]) == ["Timestamp"]
+        assert store["Exports/s1/Loads/l1/Powers"][:, 0].tolist() == [0.0, 0.0, 0.0, 3.0, 3.0]
+        assert store["Exports/s1/Loads/l1/SumPowers"][:].tolist() == [3.0]
+        assert store["Exports/s1/Loads/kW"][:, 1].tolist() == [0.0, 0.0, 0.0, 3.0, 3.0]
+        assert get_class_columns(store, "Exports/s1/Loads/kW") == ["l1__kW", "l2__kW"]
+
+        with pytest.raises(InvalidParameter):
+            concatenate_hdf_stores(store, filenames)
+
+
+def _write_filtered(filename, timestamps):
+    with h5py.File(filename, "a") as store:
+        # Filtered datasets are created when the first value passes the limits.
+        length = len(timestamps)
+        path = "Exports/s1/Lines/ln1/Currents"
+        dataset = store.create_dataset(path, data=np.ones((length + 3, 1)) * timestamps[0])
+        dataset.attrs["length"] = length
+        dataset.attrs["timestamp_path"] = path + "Timestamp"
+        dataset = store.create_dataset(path + "Timestamp", data=np.array(timestamps + [0.0] * 3))
+        dataset.attrs["length"] = length
+
+
+def test_concatenate_hdf_stores__missing_datasets(tmp_path):
+    filenames = [str(tmp_path / f"t{i}.h5") for i in range(3)]
+    for i, filename in enumerate(filenames):
+        _write_store(filename, 2.0 * i, 2)
+    _write_filtered(filenames[1], [2.0, 3.0])
+    _write_filtered(filenames[2], [5.0])
+
+    with h5py.File(tmp_path / "store.h5", "w") as store:
+        concatenate_hdf_stores(store, filenames)
+        path = "Exports/s1/Lines/ln1/Currents"
+        assert store[path][:, 0].tolist() == [2.0, 2.0, 5.0]
+        assert store[path].attrs["length"] == 3
+        assert store[path].attrs["timestamp_path"] == path + "Timestamp"
+        assert store[path + "Timestamp"][:].tolist() == [2.0, 3.0, 5.0]
+        assert store[path + "Timestamp"].attrs["length"] == 3
+        assert store["Exports/s1/Timestamp"][:].tolist() == [0.0, 1.0, 2.0, 3.0, 4.0, 5.0]
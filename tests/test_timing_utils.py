@@ -0,0 +1,70 @@
+import json
+import logging
+
+import pandas as pd
+
+from PyDSS.utils.timing_utils import NULL_TIMER, ProgressReporter, TimingStats
+
+
+def test_timing_stats(tmp_path):
+    timing = TimingStats(trace=True)
+    for step in range(3):
+        with timing.timer("RunStep"):
+            with timing.timer("IncStep"):
+                pass
+            if step > 0:
+                timing.add("HDF flush", 0.5, count=2)
+        timing.end_step(step)
+
+    summary = timing.get_summary()
+    assert list(summary["phases"])[0] == "HDF flush"
+    assert summary["phases"]["HDF flush"]["count"] == 4
+    assert summary["phases"]["HDF flush"]["average_seconds"] == 0.25
+    assert summary["phases"]["RunStep"]["count"] == 3
+    assert summary["phases"]["RunStep"]["total_seconds"] >= summary["phases"]["IncStep"]["total_seconds"]
+
+    filenames = timing.export(str(tmp_path), "scenario1")
+    assert [x.split("/")[-1] for x in filenames] == [
+        "scenario1_timing.json", "scenario1_timing.csv", "scenario1_timing_trace.csv",
+    ]
+    with open(filenames[0]) as f_in:
+        assert json.load(f_in)["phases"]["IncStep"]["count"] == 3
+    df = pd.read_csv(filenames[1], index_col="phase")
+    assert df.loc["HDF flush", "count"] == 4
+    df = pd.read_csv(filenames[2])
+    assert list(df.columns) == ["Step", "HDF flush", "IncStep", "RunStep"]
+    assert df["HDF flush"].tolist() == [0.0, 0.5, 0.5]
+
+
+def test_timing_stats_without_trace(tmp_path):
+    timing = TimingStats()
+    timing.end_step(0)
+    with NULL_TIMER:
+        pass
+    assert timing.get_summary()["phases"] == {}
+    assert len(timing.export(str(tmp_path), "scenario1")) == 2
+
+
+def test_progress_reporter(caplog):
+    caplog.set_level(logging.INFO)
+    progress = ProgressReporter(100, 25.0, 0.0)
+    for step in range(1, 101):
+        progress.update(step)
+    messages = [x.getMessage() for x in caplog.records]
+    assert len(messages) == 4
+    assert messages[0].startswith("Completed 25 of 100 time steps (25.0%)")
+    assert "steps/s, ETA 0:00:00" in messages[-1]
+
+    # Resumed simulations report at the same steps.
+    caplog.clear()
+    progress = ProgressReporter(100, 25.0, 0.0, start_step=60)
+    for step in range(61, 101):
+        progress.update(step)
+    assert [x.getMessage().split(" of ")[0] for x in caplog.records] == ["Completed 75", "Completed 100"]
+
+    caplog.clear()
+    progress = ProgressReporter(100, 0.0, 1e-9)
+    progress.update(1)
+    progress = ProgressReporter(100, 0.0, 0.0)
+    progress.update(100)
+    assert len(caplog.records) == 1
@@ -0,0 +1,102 @@
+
+import h5py
+import numpy as np
+import pytest
+
+from PyDSS.dataset_buffer import DatasetBuffer
+from PyDSS.storage_backends import StorageBackend, open_store
+from PyDSS.value_storage import ElementClassValueContainer, ValueByLabel, ValueByNumber, \
+    ValueSchema, get_class_columns, get_element_column_ranges
+
+
+def test_value_schema__complex():
+    nodes = [[1, 2], [1, 2]]
+    raw_value = [float(x) for x in range(8)]
+    schema = ValueSchema("Line.one", "Currents", nodes, True, ["[Amps]"], len(raw_value))
+    assert schema.columns == [
+        "Line.one__A1 [Amps]",
+        "Line.one__B1 [Amps]",
+        "Line.one__A2 [Amps]",
+        "Line.one__B2 [Amps]",
+    ]
+    assert schema.matches(raw_value)
+    assert not schema.matches(raw_value[:4])
+    assert np.array_equal(schema.to_array(raw_value), [0 + 1j, 2 + 3j, 4 + 5j, 6 + 7j])
+
+    value = ValueByLabel("Line.one", "Currents", raw_value, nodes, True, ["[Amps]"])
+    assert value.make_columns() == schema.columns
+    assert value.value == [0 + 1j, 2 + 3j, 4 + 5j, 6 + 7j]
+    assert value.value_type == complex
+
+
+def test_value_schema__mag_angle():
+    nodes = [[1, 2, 3]]
+    raw_value = [1.0, 0.0, 1.01, -120.0, 0.99, 120.0]
+    units = ["[pu]", "[Deg]"]
+    schema = ValueSchema("bus1", "puVmagAngle", nodes, False, units, len(raw_value))
+    assert schema.columns[:2] == ["bus1__A1__mag [pu]", "bus1__A1__ang [Deg]"]
+    assert np.array_equal(schema.to_array(raw_value), raw_value)
+
+    value = schema.make_value(raw_value)
+    assert value.make_columns() == schema.columns
+    assert value.value == raw_value
+    assert value.value_type == float
+
+
+def test_element_class_value_container(tmp_path):
+    nodes = [[1, 2]]
+    units = ["[Amps]"]
+    names = ["Line.one", "Line.two", "Line.three"]
+    # Elements with different numbers of columns and a mix of real and complex values
+    values = [
+        ValueByLabel("Line.one", "Currents", [1.0, 2.0, 3.0, 4.0], nodes, True, units),
+        ValueByLabel("Line.two", "Currents", [5.0, 6.0, 7.0, 8.0], [[1]], True, units),
+        ValueByNumber("Line.three", "Currents", 9.0),
+    ]
+    filename = tmp_path / "store.h5"
+    path = "Exports/s1/Lines/Currents"
+    with h5py.File(filename, "w") as store:
+        container = ElementClassValueContainer(names, values, store, path, 10)
+        assert container.columns == [
+            "Line.one__A1 [Amps]", "Line.one__B1 [Amps]", "Line.two__A1 [Amps]", "Line.three__Currents",
+        ]
+        row = container.append(values)
+        assert row.tolist() == [1 + 2j, 3 + 4j, 5 + 6j, 9 + 0j]
+        values[2].set_value(10.0)
+        container.append(values)
+        container.flush_data()
+
+    with h5py.File(filename, "r") as store:
+        group = store["Exports/s1/Lines"]
+        assert "columns" not in group["Currents"].attrs
+        assert get_element_column_ranges(group, "Currents") == {
+            "Line.one": (0, 2), "Line.two": (2, 1), "Line.three": (3, 1),
+        }
+        columns = get_class_columns(group, "Currents")
+        df = DatasetBuffer.to_dataframe(group["Currents"], column_range=(0, 2), columns=columns)
+        assert df.columns.tolist() == ["Line.one__A1 [Amps]", "Line.one__B1 [Amps]"]
+        assert df.iloc[:, 1].tolist() == [3 + 4j, 3 + 4j]
+        df = DatasetBuffer.to_dataframe(group["Currents"], columns=columns)
+        assert df["Line.three__Currents"].tolist() == [9.0, 10.0]
+
+
+@pytest.mark.parametrize("backend", list(StorageBackend))
+def test_element_class_value_container__wide(tmp_path, backend):
+    # The column names exceed the 64 KiB limit of HDF5 attributes.
+    names = [f"Load.load_{i}" for i in range(6000)]
+    values = [ValueByNumber(x, "kW", float(i)) for i, x in enumerate(names)]
+    path = "Exports/s1/Loads/kW"
+    store_path = str(tmp_path / "store")
+    with open_store(store_path, backend, mode="w") as store:
+        container = ElementClassValueContainer(names, values, store, path, 10)
+        container.append(values)
+        container.flush_data()
+
+    with open_store(store_path, backend, mode="r") as store:
+        group = store["Exports/s1/Loads"]
+        column_ranges = get_element_column_ranges(group, "kW")
+        assert column_ranges["Load.load_5999"] == (5999, 1)
+        columns = get_class_columns(group, "kW")
+        df = DatasetBuffer.to_dataframe(group["kW"], column_range=column_ranges["Load.load_5999"], columns=columns)
+        assert df.columns.tolist() == ["Load.load_5999__kW"]
+        assert df.iloc[0, 0] == 5999.0